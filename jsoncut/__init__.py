@@ -33,14 +33,32 @@ wildcard
     A symobol used in keys to indicate all elements of an array.
 """
 
-from . import core
-from . import exceptions
-from . import highlighter
-from . import inspector
-from . import sequencer
-from . import tokenizer
-from . import treecrawler
+import importlib
 
-from .core import arraycounts, cut, inspectkeys, keynums, listkeys
+# the modules are imported on first use, so the thin client (see client)
+# starts without importing the dependencies
+SUBMODULES = ('aggregator', 'batch', 'checkpoint', 'columnar', 'compressor',
+              'core', 'dedupe', 'exceptions', 'follow', 'highlighter',
+              'indexer', 'inspector', 'joiner', 'limits', 'memstats',
+              'parallel', 'passthrough', 'scanner', 'schemacache', 'sequencer',
+              'sketches', 'sorter', 'spec', 'streamer', 'tokenizer',
+              'treecrawler')
+CORE_FUNCTIONS = ('arraycounts', 'columns', 'cut', 'inspectkeys', 'keynums',
+                  'listkeys')
 
 __version__ = '0.8'
+
+
+def __getattr__(name):
+    """Import a submodule, or a function of core, when it's first used."""
+    if name in SUBMODULES:
+        return importlib.import_module('.' + name, __name__)
+    if name in CORE_FUNCTIONS:
+        return getattr(importlib.import_module('.core', __name__), name)
+    raise AttributeError('module {!r} has no attribute {!r}'.format(
+        __name__, name))
+
+
+def __dir__():
+    """List the submodules & core functions, imported or not."""
+    return sorted(set(globals()) | set(SUBMODULES) | set(CORE_FUNCTIONS))
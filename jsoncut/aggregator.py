@@ -0,0 +1,194 @@
+"""Aggregate records by group in a single pass.
+
+Each group holds one small accumulator per aggregate, so the memory
+used is proportional to the number of groups, not the number of records.
+
+aggregate:
+    FUNCTION:KEYPATH; where the function is count, sum, min, max, mean
+    or first. count doesn't need a key path; with one it only counts
+    the records where the key is found & isn't null.
+
+The records may be given as (input record, output record) pairs; see
+sorter.lookup_pair. Groups & aggregates can then use fields the output
+records don't have.
+
+Examples:
+    >>> records = [{'s': 'a', 'n': 1}, {'s': 'b', 'n': 5}, {'s': 'a'},
+    ...            {'s': 'a', 'n': 3}]
+    >>> aggregates = parse_aggregates(['count', 'mean:n', 'max:n'])
+    >>> list(group_records(records, [('s',)], aggregates))
+    ... # doctest: +NORMALIZE_WHITESPACE
+    [{'s': 'a', 'count': 3, 'mean(n)': 2.0, 'max(n)': 3},
+     {'s': 'b', 'count': 1, 'mean(n)': 5.0, 'max(n)': 5}]
+"""
+import json
+
+from . import exceptions as exc
+from .sorter import MISSING, lookup, lookup_pair, rank
+from .tokenizer import parse_key_name
+
+DEFAULT_AGGREGATES = ('count',)
+
+
+class Count(object):
+    """Count the records; or the values found if there's a key path."""
+
+    __slots__ = ('value',)
+
+    def __init__(self):
+        self.value = 0
+
+    def add(self, value):
+        if value is not None:
+            self.value += 1
+
+    def result(self):
+        return self.value
+
+
+class Sum(object):
+    """Sum the numbers."""
+
+    __slots__ = ('value',)
+
+    def __init__(self):
+        self.value = 0
+
+    def add(self, value):
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            self.value += value
+
+    def result(self):
+        return self.value
+
+
+class Mean(object):
+    """Average the numbers; null if there are none."""
+
+    __slots__ = ('total', 'count')
+
+    def __init__(self):
+        self.total = self.count = 0
+
+    def add(self, value):
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            self.total += value
+            self.count += 1
+
+    def result(self):
+        return self.total / self.count if self.count else None
+
+
+class Min(object):
+    """Smallest value; values of different types are ordered by type."""
+
+    __slots__ = ('value', 'key')
+
+    def __init__(self):
+        self.value = self.key = None
+
+    def add(self, value):
+        if value is not None:
+            key = rank(value)
+            if self.key is None or self.better(key):
+                self.value, self.key = value, key
+
+    def better(self, key):
+        return key < self.key
+
+    def result(self):
+        return self.value
+
+
+class Max(Min):
+    """Largest value; values of different types are ordered by type."""
+
+    __slots__ = ()
+
+    def better(self, key):
+        return key > self.key
+
+
+class First(object):
+    """The first value found; may be null."""
+
+    __slots__ = ('value', 'found')
+
+    def __init__(self):
+        self.value, self.found = None, False
+
+    def add(self, value):
+        if not self.found:
+            self.value, self.found = value, True
+
+    def result(self):
+        return self.value
+
+
+FUNCTIONS = {'count': Count, 'sum': Sum, 'mean': Mean, 'min': Min,
+             'max': Max, 'first': First}
+
+
+def parse_aggregates(specs):
+    """Parse FUNCTION:KEYPATH aggregates.
+
+    Returns:
+        List[tuple]: (output name, accumulator class, keylist) tuples;
+        the keylist is None for count without a key path.
+
+    Raises:
+        InvalidAggregate
+    """
+    aggregates = []
+    for spec in specs or DEFAULT_AGGREGATES:
+        function, _, keypath = spec.partition(':')
+        if function not in FUNCTIONS or not (keypath or function == 'count'):
+            raise exc.InvalidAggregate(spec)
+        name = '{}({})'.format(function, keypath) if keypath else function
+        keylist = parse_key_name(keypath) if keypath else None
+        aggregates.append((name, FUNCTIONS[function], keylist))
+    return aggregates
+
+
+def group_key(values):
+    """Return the key of a group as JSON text; a missing value is null.
+
+    JSON text keeps apart the values Python takes as equal, e.g. true,
+    1 & 1.0.
+    """
+    return json.dumps([None if i is MISSING else i for i in values],
+                      sort_keys=True)
+
+
+def group_records(records, keylists, aggregates, pairs=False):
+    """Aggregate records by the values of the key paths.
+
+    Args:
+        records (iter): JSON records; or record pairs, see module docs.
+        keylists (List[tuple]): key paths to group by.
+        aggregates (list): see parse_aggregates.
+        pairs (bool): the records are (input, output) record pairs.
+
+    Yields:
+        dict: one record per group, in order of first appearance; the
+        group key paths & the aggregate names are its keys.
+    """
+    find = lookup_pair if pairs else lookup
+    groups = {}
+    for record in records:
+        values = [find(record, i) for i in keylists]
+        key = group_key(values)
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = (values, [i[1]() for i in aggregates])
+        for (_, _, keylist), accumulator in zip(aggregates, group[1]):
+            value = record if keylist is None else find(record, keylist)
+            if value is not MISSING:
+                accumulator.add(value)
+    names = ['.'.join(i) for i in keylists]
+    for values, accumulators in groups.values():
+        result = {k: None if v is MISSING else v
+                  for k, v in zip(names, values)}
+        for (name, _, _), accumulator in zip(aggregates, accumulators):
+            result[name] = accumulator.result()
+        yield result
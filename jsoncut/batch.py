@@ -0,0 +1,113 @@
+"""Resumable cuts of very large record streams.
+
+A batch run cuts the records of a root array or JSON lines file one at
+a time and writes the results to an output file. Every so many records
+the output is flushed to disk, then a checkpoint is saved with:
+
+input_offset:
+    byte offset of the input following the last record output.
+
+records:
+    number of records output.
+
+output_offset:
+    size of the output file.
+
+If the run is interrupted, resuming truncates the output file to
+output_offset and continues reading the input from input_offset; the
+final output is identical to that of an uninterrupted run. The
+checkpoint is removed once the run completes.
+"""
+import io
+import json
+import os
+from itertools import islice
+
+from . import checkpoint
+from . import core
+from . import exceptions as exc
+from .highlighter import format_json, format_json_array
+from .streamer import RecordReader
+
+CHECKPOINT_EVERY = 10000
+ENCODING = 'utf-8'
+
+
+def job_id(input_path, options, lines, compact):
+    """Identify a run; a checkpoint is only resumed by the same run."""
+    return json.dumps([os.path.abspath(input_path), options, lines,
+                       compact], sort_keys=True)
+
+
+def run(input_path, output_path, options, checkpoint_path, resume=False,
+        skip=0, head=None, lines=False, compact=False,
+        every=CHECKPOINT_EVERY):
+    """Cut the records of a file; save checkpoints along the way.
+
+    Args:
+        input_path (str): JSON array or JSON lines file.
+        output_path (str): output file; a JSON array or JSON lines.
+        options (dict): core.cut keyword arguments applied to each record.
+        checkpoint_path (str): checkpoint file.
+        resume (bool): continue from the checkpoint, if there's one.
+        skip (int): number of leading records to discard.
+        head (int): maximum number of records to output.
+        lines (bool): output JSON lines instead of an array.
+        compact (bool): compact array output.
+        every (int): number of records between checkpoints.
+
+    Returns:
+        int: number of records output.
+
+    Raises:
+        CheckpointMismatch: the checkpoint belongs to a different run.
+    """
+    def counted(results):
+        nonlocal records
+        for result in results:
+            records += 1
+            yield result
+
+    job = job_id(input_path, options, lines, compact)
+    state = checkpoint.load(checkpoint_path) if resume else None
+    if state and state.get('job') != job:
+        raise exc.CheckpointMismatch(checkpoint_path)
+    state = state or {'records': 0, 'input_offset': 0, 'output_offset': 0,
+                      'is_array': None}
+    records = saved = state['records']
+    if records:
+        skip = 0
+    if head is not None:
+        head = max(head - records, 0)
+    with open(input_path, 'rb') as raw, \
+            open(output_path, 'r+b' if records else 'wb') as out:
+        raw.seek(state['input_offset'])
+        out.truncate(state['output_offset'])
+        out.seek(state['output_offset'])
+        reader = RecordReader(
+            io.TextIOWrapper(raw, encoding=ENCODING),
+            is_array=state['is_array'], offset=state['input_offset'],
+            encoding=ENCODING)
+        stop = None if head is None else skip + head
+        results = counted(core.cut(i, **options)
+                          for i in islice(reader, skip, stop))
+        if lines:
+            chunks = (format_json(i, True, None) + '\n' for i in results)
+        else:
+            chunks = format_json_array(results, compact, 2, records > 0)
+        for chunk in chunks:
+            out.write(chunk.encode(ENCODING))
+            if records - saved >= every:
+                out.flush()
+                os.fsync(out.fileno())
+                checkpoint.save(checkpoint_path, {
+                    'job': job, 'records': records,
+                    'input_offset': reader.tell(),
+                    'output_offset': out.tell(),
+                    'is_array': reader.is_array})
+                saved = records
+        if not lines:
+            out.write(b'\n')
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    return records
@@ -0,0 +1,38 @@
+"""Persist the progress of long-running cuts.
+
+checkpoint:
+    A small JSON file holding the state needed to continue where a
+    previous process stopped (i.e. input byte offsets). It's replaced
+    atomically, so it's either the previous or the new state; never a
+    partially written file.
+
+Examples:
+    >>> import os, tempfile
+    >>> path = os.path.join(tempfile.mkdtemp(), 'cut.ckpt')
+    >>> load(path) is None
+    True
+    >>> save(path, {'offset': 42})
+    >>> load(path)
+    {'offset': 42}
+"""
+import json
+import os
+
+
+def load(path):
+    """Return the saved state; None if there's no checkpoint yet."""
+    try:
+        with open(path) as file_:
+            return json.load(file_)
+    except FileNotFoundError:
+        return None
+
+
+def save(path, state):
+    """Atomically replace the checkpoint with the given state."""
+    temp = '{}.{}.tmp'.format(path, os.getpid())
+    with open(temp, 'w') as file_:
+        json.dump(state, file_)
+        file_.flush()
+        os.fsync(file_.fileno())
+    os.replace(temp, path)
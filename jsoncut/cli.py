@@ -2,17 +2,63 @@
 
 import json
 import sys
+from itertools import islice
 
 import click
 from click import argument, option, version_option
 
+from . import aggregator
+from . import batch
+from . import checkpoint
+from . import compressor
 from . import core
+from . import dedupe
 from . import exceptions as exc
+from . import follow
 from . import highlighter
+from . import indexer
+from . import inspector
+from . import joiner
+from . import limits
+from . import memstats
+from . import parallel
+from . import passthrough
+from . import scanner
+from . import schemacache
+from . import server
+from . import sketches
+from . import sorter
+from . import spec
+from . import tokenizer
+from . import streamer
 from . import treecrawler
 
+SCAN_COUNT_CONFLICTS = ('rootkey', 'getkeys', 'getdefaults', 'delkeys',
+                        'listkeys', 'inspect', 'skip', 'expand',
+                        'max_records', 'max_seconds', 'max_memory')
+SCAN_LIST_CONFLICTS = ('getkeys', 'getdefaults', 'delkeys', 'inspect', 'count',
+                       'skip', 'head', 'expand', 'slice_', 'max_records',
+                       'max_seconds', 'max_memory')
+CHUNK_CONFLICTS = ('listkeys', 'inspect', 'stats', 'count', 'partial',
+                   'max_records', 'max_seconds', 'max_memory')
+SCHEMA_CACHE_CONFLICTS = ('rootkey', 'getkeys', 'getdefaults', 'delkeys',
+                          'count', 'skip', 'head', 'expand', 'slice_',
+                          'follow', 'checkpoint', 'raw', 'join', 'unique_by',
+                          'group_by', 'sort_by')
+SPEC_CONFLICTS = ('rootkey', 'getkeys', 'getdefaults', 'delkeys', 'listkeys',
+                  'inspect', 'count', 'skip', 'head', 'expand', 'slice_',
+                  'follow', 'checkpoint', 'raw', 'join', 'unique_by',
+                  'group_by', 'sort_by', 'output', 'lines', 'index',
+                  'schema_cache')
+LIMITS = ('max_bytes', 'max_depth', 'max_records', 'max_seconds',
+          'max_memory')
 
-def load_json(ctx, filename):
+# key catalogs of input files reused between requests; see server.serve
+key_catalogs = None
+
+
+def input_filename(ctx, filename):
+    """Use STDIN if no filename is given; show usage if it's a TTY."""
     if filename is None:
         if sys.stdin.isatty():
             click.echo(ctx.get_usage())
@@ -20,9 +66,26 @@ def load_json(ctx, filename):
             sys.exit(0)
         else:
             filename = '-'
+    return filename
+
+
+def load_json(ctx, filename, skip=0, head=None, partial=False):
+    filename = input_filename(ctx, filename)
     try:
         with click.open_file(filename) as file_:
-            return json.load(file_)
+            file_ = limits.bounded(file_)
+            if skip or head is not None:
+                return streamer.read_records(file_, skip, head)
+            data = json.load(file_)
+        if filename == '-':
+            limits.check_data(data)
+        return data
+    except exc.LimitExceeded as e:
+        return limit_exceeded(e, partial)
+    except RecursionError:
+        click.echo(exc.default_error_mesg_fmt(RecursionError(
+            'the JSON is nested too deeply')), err=True)
+        sys.exit(1)
     except EnvironmentError as e:
         if not sys.stdin.isatty():
             sys.stdin.read()
@@ -33,6 +96,219 @@ def load_json(ctx, filename):
         sys.exit(1)
 
 
+def scans_root(kwds):
+    """Return True unless --root uses key numbers, slices or indexes < 0."""
+    if not kwds['rootkey']:
+        return True
+    tokens = tokenizer.parse_csv(kwds['rootkey'], kwds['quotechar'])
+    return len(tokens) == 1 and \
+        not tokenizer.NUMBER_RANGE_RE.match(tokens[0]) and \
+        all(i.isdigit() or not tokenizer.SLICE_RE.match(i)
+            for i in tokenizer.parse_key_name(tokens[0]))
+
+
+def load_root(ctx, kwds):
+    """Load only the --root value; the siblings along the path are skipped.
+
+    Returns:
+        obj: a skeleton of the document holding the root value (see
+            passthrough.root_skeleton); None if the whole document must
+            be loaded, e.g. for key numbers, STDIN or errors to report.
+    """
+    filename = input_filename(ctx, kwds['jsonfile'])
+    tokens = tokenizer.parse_csv(kwds['rootkey'], kwds['quotechar'])
+    if filename == '-' or kwds['expand'] or len(tokens) != 1 or \
+            tokenizer.NUMBER_RANGE_RE.match(tokens[0]):
+        return None
+    keylist = tokenizer.parse_key_name(tokens[0])
+    try:
+        with scanner.open_buffer(filename) as buf:
+            return passthrough.root_skeleton(buf, keylist)
+    except (EnvironmentError, ValueError):
+        return None
+
+
+def root_positions(kwds, index):
+    """Return the positions of the records selected from the index.
+
+    The records are selected by a --root equal to the index's root (or
+    followed by a slice) and --skip/--head.
+
+    Returns:
+        range: None unless a part of the records are selected.
+    """
+    tokens = tokenizer.parse_csv(kwds['rootkey'], kwds['quotechar']) \
+        if kwds['rootkey'] else []
+    if len(tokens) > 1 or tokens and \
+            tokenizer.NUMBER_RANGE_RE.match(tokens[0]):
+        return None
+    keylist = tokenizer.parse_key_name(tokens[0]) if tokens else ()
+    positions = range(len(index))
+    if keylist != index.root:
+        key = keylist[-1] if keylist else ''
+        if keylist[:-1] != index.root or ':' not in key or \
+                not tokenizer.SLICE_RE.match(key):
+            return None
+        positions = positions[slice(*(int(i) if i else None
+                                      for i in key.split(':')))]
+    stop = None if kwds['head'] is None else kwds['skip'] + kwds['head']
+    positions = positions[kwds['skip']:stop]
+    return positions if len(positions) < len(index) else None
+
+
+def load_indexed(ctx, kwds):
+    """Decode only the selected records of an indexed file.
+
+    Returns:
+        list: the records (the --root, --skip & --head are applied); None
+            if there's no index or it doesn't help.
+    """
+    if kwds['jsonfile'] is None or kwds['expand'] or kwds['slice_'] or \
+            uses_key_numbers(kwds):
+        return None
+    try:
+        with indexer.open_index(kwds['jsonfile']) as index:
+            positions = index and root_positions(kwds, index)
+            if positions is None:
+                return None
+            return indexer.load_records(kwds['jsonfile'], positions, index)
+    except (EnvironmentError, ValueError):
+        return None
+
+
+def build_index(ctx, kwds):
+    """Write the index sidecar of the input file."""
+    if kwds['jsonfile'] is None or not scans_root(kwds):
+        raise click.UsageError(
+            '--index needs an input file & --root key names', ctx)
+    root = kwds['rootkey'] and tokenizer.parse_keystr(
+        kwds['rootkey'], quotechar=kwds['quotechar'])[0]
+    try:
+        count = indexer.build(kwds['jsonfile'], root or ())
+    except EnvironmentError as e:
+        click.echo(exc.default_error_mesg_fmt(e), err=True)
+        sys.exit(1)
+    except exc.JsonCutError as e:
+        click.echo(e.format_error(), err=True)
+        sys.exit(1)
+    click.echo('{} records: {}'.format(
+        count, indexer.index_path(kwds['jsonfile'])), err=True)
+
+
+def check_input(ctx, filename):
+    """Check the size & nesting depth of the input file; see limits."""
+    try:
+        limits.check_file(input_filename(ctx, filename))
+    except exc.LimitExceeded as e:
+        click.echo(e.format_error(), err=True)
+        sys.exit(1)
+    except EnvironmentError:
+        pass  # reported when it's read
+
+
+def limit_exceeded(e, partial):
+    """Report an exceeded limit; return the records cut before it with
+    --partial, otherwise exit.
+    """
+    click.echo(e.format_error(), err=True)
+    if not partial or e.partial is None:
+        sys.exit(1)
+    return e.partial
+
+
+def load_document(ctx, kwds):
+    """Load the input file; only the root value if --root is used."""
+    check_input(ctx, kwds['jsonfile'])
+    data = load_root(ctx, kwds) if kwds['rootkey'] else None
+    if data is None:
+        data = load_json(ctx, kwds['jsonfile'], *load_range(kwds),
+                         partial=kwds['partial'])
+    return data
+
+
+def scan_counts(ctx, kwds):
+    """Count arrays by scanning the raw bytes; the JSON isn't decoded."""
+    filename = input_filename(ctx, kwds['jsonfile'])
+    try:
+        with scanner.open_buffer(filename) as buf:
+            counts = scanner.array_counts(buf, kwds['depth'])
+    except EnvironmentError as e:
+        click.echo(exc.default_error_mesg_fmt(e), err=True)
+        sys.exit(1)
+    except exc.JsonCutError as e:
+        click.echo(e.format_error(), err=True)
+        sys.exit(1)
+    return inspector.format_array_counts(counts, kwds['nocolor'])
+
+
+def scan_list(ctx, kwds):
+    """--list the keys by scanning the raw bytes; the JSON isn't decoded.
+
+    Returns:
+        Iterable[str]: the numbered keys; None if the document must be
+            loaded, e.g. for STDIN or errors to report.
+    """
+    filename = input_filename(ctx, kwds['jsonfile'])
+    if filename == '-':
+        return None
+    keylist = None
+    if kwds['rootkey']:
+        tokens = tokenizer.parse_csv(kwds['rootkey'], kwds['quotechar'])
+        keylist = tokenizer.parse_key_name(tokens[0])
+    check_input(ctx, filename)
+    try:
+        with scanner.open_buffer(filename) as buf:
+            keys = core.find_raw_keys(buf, keylist, kwds['fullscan'])
+    except (EnvironmentError, ValueError):
+        return None
+    return core.number_keys(keys)
+
+
+def cached_summary(ctx, kwds):
+    """--list or --inspect a JSON lines file; read only the records
+    appended since the last run (see schemacache).
+    """
+    if kwds['inspect']:
+        sketch = sketches.PathSketch() if kwds['stats'] else None
+        summary = schemacache.TypeSummary(sketch)
+    else:
+        summary = schemacache.KeySummary(kwds['fullscan'])
+    try:
+        summary = schemacache.update(kwds['jsonfile'], summary)
+    except (EnvironmentError, json.JSONDecodeError) as e:
+        click.echo(exc.default_error_mesg_fmt(e), err=True)
+        sys.exit(1)
+    if not kwds['inspect']:
+        keys = summary.result()
+        return core.number_keys(keys) if keys else None
+    if kwds['stats']:
+        return inspector.stats_report(summary.root)
+    types = inspector.path_types(summary.root)
+    return inspector.format_result(types, kwds['nocolor']) if types else None
+
+
+def run_spec(ctx, kwds):
+    """Run the queries of the --spec file over one parse of the input."""
+    options = dict(quotechar=kwds['quotechar'], fullpath=kwds['fullpath'],
+                   fullscan=kwds['fullscan'])
+    try:
+        queries = spec.load_spec(kwds['spec'])
+        if spec.is_streamed(queries, kwds['quotechar']):
+            filename = input_filename(ctx, kwds['jsonfile'])
+            check_input(ctx, filename)
+            with click.open_file(filename) as file_:
+                spec.run(queries, file_=limits.bounded(file_), **options)
+        else:
+            data = load_document(ctx, dict(kwds, rootkey=None))
+            spec.run(queries, data=data, **options)
+    except (EnvironmentError, json.JSONDecodeError) as e:
+        click.echo(exc.default_error_mesg_fmt(e), err=True)
+        sys.exit(1)
+    except exc.JsonCutError as e:
+        click.echo(e.format_error(), err=True)
+        sys.exit(1)
+
+
 def click_options(ctx):
     '''
     Build and return a dictionary with the variable name from click
@@ -43,9 +319,9 @@ def click_options(ctx):
     :param ctx: click context object
     :return: dictionary
     '''
-    return {opt.human_readable_name: opt.opts[1]
+    return {opt.human_readable_name: opt.opts[-1]
             for opt in ctx.command.get_params(ctx)
-            if isinstance(opt, click.Option) and len(opt.opts) > 1}
+            if isinstance(opt, click.Option)}
 
 
 def validate_numeric(kwd_value, split_char=','):
@@ -109,7 +385,7 @@ def expand(data, ctx, kwds):
 
     for k, v in kwds.items():
 
-        if k in ['jsonfile', 'expand']:
+        if k in ['jsonfile', 'expand', 'jobs']:
             continue
         if v:
             value = ''
@@ -125,7 +401,9 @@ def expand(data, ctx, kwds):
             else:
                 value = v
 
-            arg = options[k] if value is True else options[k] + ' ' + value
+            arg = options[k]
+            if value is not True:
+                arg += ' ' + str(value)
 
             expanded_args.append(arg)
 
@@ -134,35 +412,398 @@ def expand(data, ctx, kwds):
     return [' '.join(expanded_args)]
 
 
-def cut(data, kwds):
+def load_range(kwds):
+    """Return the (skip, head) records to stream while loading."""
+    if kwds['rootkey']:
+        # records are selected from the root, after loading
+        return 0, None
+    return kwds['skip'], kwds['head']
+
+
+def cut_options(kwds):
+    """Convert the command-line options to core.cut keyword arguments."""
     kwds_copy = kwds.copy()
     for key in ('getkeys', 'delkeys'):
         kwds_copy[key] = ','.join(kwds_copy[key])
-    for key in ('compact', 'jsonfile', 'nocolor', 'expand'):
+    for key in ('compact', 'jsonfile', 'nocolor', 'expand', 'jobs', 'lines',
+                'unordered', 'follow', 'checkpoint', 'output', 'resume',
+                'serve', 'sort_by', 'reverse', 'sort_memory', 'group_by',
+                'aggregates', 'unique_by', 'bloom_error', 'bloom_memory',
+                'join', 'join_get', 'raw', 'index', 'mem_stats',
+                'schema_cache', 'partial', 'spec') + LIMITS:
         del kwds_copy[key]
+    if not kwds['rootkey']:
+        # records were already selected while streaming the input
+        kwds_copy.update(skip=0, head=None)
+    return kwds_copy
+
+
+def cut(data, kwds):
+    options = cut_options(kwds)
     try:
-        return core.cut(data, **kwds_copy)
+        if key_catalogs is not None and \
+                (kwds['getkeys'] or kwds['getdefaults'] or kwds['delkeys']):
+            options['keys'] = key_catalogs.get(kwds['jsonfile'], kwds,
+                                               options, data)
+        if kwds['count'] or kwds['listkeys'] or kwds['inspect']:
+            limits.check_records(data)
+        return core.cut(data, **options)
+    except exc.LimitExceeded as e:
+        return limit_exceeded(e, kwds['partial'])
     except exc.JsonCutError as e:
         click.echo(e.format_error(), err=True)
         sys.exit(1)
 
 
-def output(ctx, output, compact, is_json):
+def uses_key_numbers(kwds):
+    """Return True if key numbers are used to get or delete keys."""
+    keystrs = kwds['getkeys'] + kwds['delkeys'] + \
+        tuple(i[0] for i in kwds['getdefaults'])
+    return any(tokenizer.NUMBER_RANGE_RE.match(token) for keystr in keystrs
+               for token in tokenizer.parse_csv(keystr, kwds['quotechar']))
+
+
+def iter_records(ctx, kwds):
+    """Yield the (input record, output record) pairs of the input file.
+
+    Without --root the records of a root array or JSON lines file are
+    read & cut one at a time, so they're never all held in memory;
+    unless key numbers are used, which refer to the whole document.
+    Otherwise the records are the elements of the root array.
+    """
+    options = cut_options(kwds)
+    try:
+        if kwds['rootkey'] or kwds['slice_'] or uses_key_numbers(kwds):
+            data = load_indexed(ctx, kwds)
+            if data is None:
+                data = load_document(ctx, kwds)
+            else:
+                options.update(rootkey=None, skip=0, head=None)
+            root = core.select_root(
+                data, options.pop('rootkey'), kwds['quotechar'],
+                kwds['fullscan'], options.pop('skip'), options.pop('head'))
+            if kwds['slice_'] or not isinstance(root, list):
+                yield root, core.cut(root, **options)
+                return
+            options['keys'] = core.key_catalog(root, kwds['fullscan'])
+            for record in root:
+                yield record, core.cut(record, **options)
+            return
+        filename = input_filename(ctx, kwds['jsonfile'])
+        check_input(ctx, filename)
+        stop = None if kwds['head'] is None else kwds['skip'] + kwds['head']
+        with click.open_file(filename) as file_:
+            records = streamer.RecordReader(limits.bounded(file_))
+            for record in islice(records, kwds['skip'], stop):
+                yield record, core.cut(record, **options)
+    except (EnvironmentError, json.JSONDecodeError) as e:
+        click.echo(exc.default_error_mesg_fmt(e), err=True)
+        sys.exit(1)
+    except exc.LimitExceeded as e:
+        # with --partial the records output so far are the results
+        click.echo(e.format_error(), err=True)
+        if not kwds['partial']:
+            sys.exit(1)
+    except exc.JsonCutError as e:
+        click.echo(e.format_error(), err=True)
+        sys.exit(1)
+
+
+def join_index(ctx, kwds):
+    """Load the --join lookup file into a hash index."""
+    filename, _, keylist = joiner.parse_join(kwds['join'])
+    getkeys = ','.join(kwds['join_get'])
+    try:
+        with click.open_file(filename) as file_:
+            return joiner.build_index(file_, keylist, getkeys,
+                                      kwds['quotechar'])
+    except (EnvironmentError, json.JSONDecodeError) as e:
+        click.echo(exc.default_error_mesg_fmt(e), err=True)
+        sys.exit(1)
+
+
+def stream_results(ctx, kwds):
+    """Yield the (input record, output record) pairs of the input file,
+    joined with the --join lookup file; see iter_records.
+    """
+    pairs = iter_records(ctx, kwds)
+    if not kwds['join']:
+        return pairs
+    index = join_index(ctx, kwds)
+    return joiner.join_records(pairs, index,
+                               joiner.parse_join(kwds['join'])[1])
+
+
+def raw_get(ctx, kwds):
+    """Output the --get values copied from the input bytes; JSON lines.
+
+    Records whose values can't all be found by name or index are
+    decoded & cut instead, which reports the usual errors.
+    """
+    options = cut_options(kwds)
+    options.update(rootkey=None, skip=0, head=None)
+
+    def fallback(record):
+        result = core.cut(json.loads(record.decode()), **options)
+        return highlighter.format_json(result, True, None).encode()
+
+    filename = input_filename(ctx, kwds['jsonfile'])
+    keylists = [i for keystr in kwds['getkeys'] for i in
+                tokenizer.parse_keystr(keystr, quotechar=kwds['quotechar'])]
+    root = kwds['rootkey'] and tokenizer.parse_keystr(
+        kwds['rootkey'], quotechar=kwds['quotechar'])[0]
+    try:
+        with scanner.open_buffer(filename) as buf:
+            for record in passthrough.raw_get(
+                    buf, keylists, kwds['fullpath'], kwds['skip'],
+                    kwds['head'], fallback, root):
+                click.echo(record, file=ctx.obj)
+    except (EnvironmentError, json.JSONDecodeError) as e:
+        click.echo(exc.default_error_mesg_fmt(e), err=True)
+        sys.exit(1)
+    except exc.JsonCutError as e:
+        click.echo(e.format_error(), err=True)
+        sys.exit(1)
+    except KeyboardInterrupt:
+        sys.exit(0)
+
+
+def keypaths(kwds, name):
+    """Parse the comma-separated key paths of an option."""
+    return [tokenizer.parse_key_name(i) for i in
+            tokenizer.parse_csv(kwds[name], kwds['quotechar'])]
+
+
+def lookup_keypaths(kwds):
+    """Return the key paths post_process may find in the input records."""
+    keylists = []
+    if kwds['unique_by']:
+        keylists += keypaths(kwds, 'unique_by')
+    if kwds['group_by']:
+        # the groups are sorted by their own fields
+        return keylists + keypaths(kwds, 'group_by') + [
+            i for _, _, i in aggregator.parse_aggregates(kwds['aggregates'])
+            if i is not None]
+    if kwds['sort_by']:
+        keylists += keypaths(kwds, 'sort_by')
+    return keylists
+
+
+def post_process(kwds, records, pairs=False):
+    """Deduplicate, group and/or sort the output records.
+
+    Args:
+        records (iter): the output records; or (input record, output
+            record) pairs, whose key paths are found in the output
+            record, else in the input record (e.g. a --unique-by,
+            --group-by or --sort-by key that --get doesn't select).
+        pairs (bool): the records are pairs.
+    """
+    if kwds['unique_by']:
+        records = dedupe.unique_records(
+            records, keypaths(kwds, 'unique_by'),
+            kwds['bloom_memory'] << 20, kwds['bloom_error'], pairs)
+    if kwds['group_by']:
+        records = aggregator.group_records(
+            records, keypaths(kwds, 'group_by'),
+            aggregator.parse_aggregates(kwds['aggregates']), pairs)
+        pairs = False
+    if kwds['sort_by']:
+        records = sorter.sort_records(
+            records, keypaths(kwds, 'sort_by'), kwds['reverse'],
+            kwds['sort_memory'] << 20, pairs=pairs)
+        pairs = False
+    if pairs:
+        records = (result for _, result in records)
+    return records
+
+
+def echo_json(ctx, text):
+    if ctx.color and ctx.obj is None and sys.stdout.isatty():
+        text = highlighter.highlight_json(text)
+    click.echo(text, nl=False, file=ctx.obj)
+
+
+def output(ctx, output, compact, is_json, lines=False):
     try:
         if not is_json:
             for key in output:
-                click.echo(key)
+                click.echo(key, file=ctx.obj)
+        elif lines:
+            records = output if isinstance(output, list) else [output]
+            with memstats.phase('serialize'):
+                for record in records:
+                    click.echo(highlighter.format_json(record, True, None),
+                               file=ctx.obj)
         elif output:
-            output = highlighter.format_json(output, compact, 2)
-            if ctx.color and sys.stdout.isatty():
-                output = highlighter.highlight_json(output)
-            click.echo(output)
+            with memstats.phase('serialize'):
+                output = highlighter.format_json(output, compact, 2)
+            if ctx.color and ctx.obj is None and sys.stdout.isatty():
+                with memstats.phase('highlight'):
+                    output = highlighter.highlight_json(output)
+            click.echo(output, file=ctx.obj)
+    except KeyboardInterrupt:
+        sys.exit(0)
+
+
+def output_records(ctx, records, kwds):
+    """Output JSON records as they arrive; an array or JSON lines."""
+    try:
+        if kwds['lines']:
+            for record in records:
+                click.echo(highlighter.format_json(record, True, None),
+                           file=ctx.obj)
+        else:
+            for text in highlighter.format_json_array(records,
+                                                      kwds['compact'], 2):
+                echo_json(ctx, text)
+            click.echo(file=ctx.obj)
     except KeyboardInterrupt:
         sys.exit(0)
 
 
+def output_files(ctx, results, kwds, is_json, pairs=False):
+    """Output the results of multiple files as they arrive.
+
+    JSON results are concatenated into a single array (or JSON lines);
+    each text result is preceded by a '==> filename <==' header. Errors
+    are reported on STDERR, after which the exit status is 1. The results
+    are lists of record pairs if pairs is True; see post_process.
+    """
+    failed = []
+
+    def records():
+        for result in results:
+            if result.error:
+                failed.append(result.filename)
+                click.echo('{}: {}'.format(result.filename, result.error),
+                           err=True)
+            elif not is_json:
+                yield '==> {} <=='.format(result.filename)
+                yield from result.value
+            elif isinstance(result.value, list):
+                yield from result.value
+            else:
+                yield result.value
+
+    if is_json:
+        output_records(ctx, post_process(kwds, records(), pairs), kwds)
+    else:
+        output(ctx, records(), False, False)
+    if failed:
+        sys.exit(1)
+
+
+def cut_files(ctx, filenames, kwds, is_json):
+    """Cut multiple files in a pool of worker processes."""
+    if kwds['expand']:
+        raise click.UsageError('--expand works with a single file only', ctx)
+    skip, head = load_range(kwds)
+    keylists = lookup_keypaths(kwds) if is_json else None
+    results = parallel.cut_files(
+        filenames, cut_options(kwds), skip, head, is_json,
+        jobs=kwds['jobs'] or None, ordered=not kwds['unordered'],
+        keylists=keylists)
+    output_files(ctx, results, kwds, is_json, bool(keylists))
+
+
+def cut_chunks(ctx, kwds):
+    """Cut the records of a single file in chunks by worker processes.
+
+    Returns:
+        bool: False if the file isn't split; i.e. it's not a root array,
+            a --root array or JSON lines, or the options need the whole
+            document (e.g. key numbers, --inspect or the limits of the
+            run, which the workers don't share).
+    """
+    if kwds['jsonfile'] is None or kwds['expand'] or kwds['slice_'] or \
+            kwds['raw'] or kwds['skip'] or kwds['head'] is not None or \
+            any(kwds[i] for i in CHUNK_CONFLICTS) or \
+            not scans_root(kwds) or uses_key_numbers(kwds):
+        return False
+    root = kwds['rootkey'] and tokenizer.parse_keystr(
+        kwds['rootkey'], quotechar=kwds['quotechar'])[0]
+    try:
+        split = parallel.split_chunks(kwds['jsonfile'], root or (),
+                                      kwds['jobs'] or None)
+    except (EnvironmentError, ValueError):
+        return False  # reported by the regular load
+    if split is None:
+        return False
+    chunks, lines = split
+    options = dict(cut_options(kwds), rootkey=None, keys=[])
+    results = []
+    for result in parallel.cut_chunks(kwds['jsonfile'], chunks, options,
+                                      lines, kwds['jobs'] or None):
+        if result.error:
+            click.echo(result.error, err=True)
+            sys.exit(1)
+        results.extend(result.value)
+    output(ctx, results, kwds['compact'], True, kwds['lines'])
+    return True
+
+
+def follow_file(ctx, kwds):
+    """Cut each record appended to a JSON lines file; output JSON lines.
+
+    The position is saved to the checkpoint file after each batch of
+    records is output; a restarted process continues from there.
+    """
+    filename = kwds['jsonfile']
+    if filename in (None, '-') or kwds['expand']:
+        raise click.UsageError('--follow requires an input file', ctx)
+    state = checkpoint.load(kwds['checkpoint']) if kwds['checkpoint'] \
+        else None
+    follower = follow.Follower.resume(filename, state)
+    options = cut_options(kwds)
+    try:
+        for lines in follower:
+            for line, _ in lines:
+                try:
+                    record = core.cut(json.loads(line.decode()), **options)
+                except (ValueError, exc.JsonCutError) as e:
+                    click.echo(exc.default_error_mesg_fmt(e), err=True)
+                    continue
+                click.echo(highlighter.format_json(record, True, None),
+                           file=ctx.obj)
+            (ctx.obj or sys.stdout).flush()
+            if kwds['checkpoint']:
+                checkpoint.save(kwds['checkpoint'], follower.state())
+    except KeyboardInterrupt:
+        sys.exit(0)
+    finally:
+        follower.close()
+
+
+def batch_run(ctx, kwds, is_json):
+    """Cut the records of a file one at a time; resumable.
+
+    The results are written to the output file, which is truncated to
+    the last consistent checkpoint when resuming.
+    """
+    if not (kwds['output'] and kwds['jsonfile'] not in (None, '-')):
+        raise click.UsageError(
+            '--checkpoint requires an input file & --output', ctx)
+    if kwds['rootkey'] or kwds['expand'] or not is_json:
+        raise click.UsageError(
+            '--checkpoint cuts root array or JSON lines records only', ctx)
+    if compressor.compressor(kwds['output']):
+        raise click.UsageError(
+            "--checkpoint can't resume a compressed --output", ctx)
+    try:
+        batch.run(kwds['jsonfile'], kwds['output'], cut_options(kwds),
+                  kwds['checkpoint'], kwds['resume'], kwds['skip'],
+                  kwds['head'], kwds['lines'], kwds['compact'])
+    except exc.JsonCutError as e:
+        click.echo(e.format_error(), err=True)
+        sys.exit(1)
+    except (EnvironmentError, ValueError) as e:
+        click.echo(exc.default_error_mesg_fmt(e), err=True)
+        sys.exit(1)
+
+
 @click.command()
-@argument('jsonfile', type=click.Path(readable=True), required=False)
+@argument('jsonfiles', nargs=-1, type=click.Path())
 @option('-r', '--root', 'rootkey', help='Set the root of the JSON document')
 @option('-g', '--get', 'getkeys', multiple=True,
         help='Get JSON key-values and/or elements')
@@ -175,8 +816,13 @@ def output(ctx, output, compact, is_json):
         help='Numbered JSON keys list')
 @option('-i', '--inspect', is_flag=True,
         help='Inspect JSON document; all keys, indexes & types')
+@option('--stats', is_flag=True,
+        help=('Used with --inspect; report distinct counts, null & missing '
+              'rates, top values & histograms as JSON'))
 @option('-c', '--count', is_flag=True,
         help='Count elements in top-level JSON arrays')
+@option('--depth', type=click.IntRange(min=0), default=1,
+        help='Used with --count; count arrays nested up to this level')
 @option('-f', '--fullscan', is_flag=True, help='Deep inspections')
 @option('-p', '--fullpath', is_flag=True, help='Preserve full path for names')
 @option('-q', '--quotechar', default='"', help='Set quoting char for keys')
@@ -185,18 +831,221 @@ def output(ctx, output, compact, is_json):
 @option('-s', '--slice', 'slice_', is_flag=True, help='Disable sequencer')
 @option('-e', '--expand', is_flag=True,
         help='Expand key numbers to key names')
+@option('--head', type=click.IntRange(min=0),
+        help='Read only the first N records of a root array or JSON lines')
+@option('--skip', type=click.IntRange(min=0), default=0,
+        help='Skip the first M records of a root array or JSON lines')
+@option('-j', '--jobs', type=click.IntRange(min=0),
+        help=('Worker processes for multiple files, or for the chunks of '
+              'the records of a single file; 0 for one per CPU'))
+@option('--lines', is_flag=True,
+        help='Output JSON lines; one compact record per line')
+@option('--unordered', is_flag=True,
+        help='Output the results of multiple files as they complete')
+@option('-F', '--follow', is_flag=True,
+        help='Output the cut of each record appended to a JSON lines file')
+@option('--checkpoint', type=click.Path(dir_okay=False),
+        help=('Save the position in this file; used with --follow, or with '
+              '--output to cut the records of a file resumably'))
+@option('--resume', is_flag=True,
+        help='Used with --checkpoint; continue an interrupted run')
+@option('-o', '--output', type=click.Path(dir_okay=False),
+        help=('Write the output to a file instead of STDOUT; compressed if '
+              'it ends with .gz, .bz2 or .xz'))
+@option('--max-bytes', type=click.IntRange(min=0),
+        help='Stop if the input is larger than this many bytes')
+@option('--max-depth', type=click.IntRange(min=0),
+        help='Stop if arrays & objects are nested deeper than this')
+@option('--max-records', type=click.IntRange(min=0),
+        help='Stop if there are more records than this')
+@option('--max-seconds', type=click.FloatRange(min=0),
+        help='Stop if cutting the records takes longer than this')
+@option('--max-memory', type=click.IntRange(min=1),
+        help=('Stop if the resident memory grows over this many megabytes '
+              'while cutting the records'))
+@option('--partial', is_flag=True,
+        help='Output the records cut before a --max-* limit was exceeded')
+@option('--mem-stats', is_flag=True,
+        help=('Report the peak memory of each phase & the live object '
+              'counts as JSON on STDERR'))
+@option('--spec', type=click.Path(exists=True, dir_okay=False),
+        help=('JSON file of named queries (root, get, getdefault, del & '
+              'output); the input is parsed once & each result is written '
+              'to its own output'))
+@option('--schema-cache', is_flag=True,
+        help=('Used with --list or --inspect of a JSON lines file; keep the '
+              'summary in FILE.jcs & read only the records appended since '
+              'the last run'))
+@option('--index', is_flag=True,
+        help=('Write FILE.jcx, an index of the offsets of the records of '
+              'the root array (or --root) & exit; --head, --skip & --root '
+              'slices then decode only the selected records'))
+@option('--raw', is_flag=True,
+        help=('Used with --get; copy the selected values from the input '
+              'bytes without decoding them; outputs JSON lines'))
+@option('--join',
+        help=('FILE:KEYPATH=KEYPATH; merge the fields of the matching record '
+              'of a lookup file into each output record'))
+@option('--join-get', multiple=True,
+        help='Used with --join; the fields of the lookup records to merge')
+@option('--unique-by',
+        help='Drop output records repeating the values of these key paths')
+@option('--bloom-error', type=click.FloatRange(0, 0.5),
+        help=('Used with --unique-by; remember the keys in a Bloom filter '
+              'with this false positive rate instead of an exact set'))
+@option('--bloom-memory', type=click.IntRange(min=1), default=64,
+        help='Used with --bloom-error; megabytes of the Bloom filter')
+@option('--group-by',
+        help='Aggregate the output records by the values of these key paths')
+@option('-a', '--agg', 'aggregates', multiple=True,
+        help=('Used with --group-by; FUNCTION:KEYPATH where FUNCTION is '
+              'count, sum, min, max, mean or first (default: count)'))
+@option('--sort-by', help='Sort the output records by these key paths')
+@option('--reverse', is_flag=True,
+        help='Used with --sort-by; sort in descending order')
+@option('--sort-memory', type=click.IntRange(min=1), default=256,
+        help=('Used with --sort-by; megabytes of records to sort in memory '
+              'before spilling sorted runs to temporary files'))
+@option('--serve', is_flag=True,
+        help=('Serve requests from the jsoncut-client command on a Unix '
+              'socket ($JSONCUT_SOCKET)'))
 @version_option(version='0.6', prog_name='JSON Cut')
 @click.pass_context
 def main(ctx, **kwds):
-    """Quickly select or filter out properties in a JSON document."""
+    """Quickly select or filter out properties in JSON documents.
+
+    JSONFILES may be glob patterns ('**' matches any directories); the
+    files are processed in parallel and the results are concatenated.
+    """
     ctx.color = False if kwds['nocolor'] else True
-    data = load_json(ctx, kwds['jsonfile'])
-    results = cut(data, kwds)
+    if kwds['serve']:
+        try:
+            server.serve()
+        except KeyboardInterrupt:
+            pass
+        except EnvironmentError as e:
+            click.echo(exc.default_error_mesg_fmt(e), err=True)
+            sys.exit(1)
+        return
+    if kwds['mem_stats']:
+        memstats.start()
+        ctx.call_on_close(lambda: click.echo(
+            json.dumps(memstats.stop()), err=True))
+    budgets = {i: kwds[i] for i in LIMITS if kwds[i] is not None}
+    if budgets:
+        if 'max_memory' in budgets:
+            budgets['max_memory'] <<= 20
+        limits.start(**budgets)
+        ctx.call_on_close(limits.stop)
+    filenames, multiple = parallel.expand_paths(kwds.pop('jsonfiles'))
+    inspect = kwds['inspect'] and not kwds['stats']
+    is_json = not (kwds['listkeys'] or inspect or kwds['count'])
+    if kwds['resume'] and not kwds['checkpoint']:
+        raise click.UsageError('--resume requires --checkpoint', ctx)
+    if multiple and (kwds['follow'] or kwds['checkpoint']):
+        raise click.UsageError(
+            '--follow & --checkpoint require a single file', ctx)
+    records_pass = kwds['join'] or kwds['unique_by'] or kwds['group_by'] \
+        or kwds['sort_by']
+    if records_pass and (kwds['follow'] or kwds['checkpoint'] or
+                         kwds['expand'] or not is_json):
+        raise click.UsageError(
+            '--join, --unique-by, --group-by & --sort-by work with JSON '
+            'output; not with --follow, --checkpoint or --expand', ctx)
+    if kwds['raw'] and (multiple or records_pass or kwds['follow'] or
+                        kwds['checkpoint'] or kwds['delkeys'] or
+                        kwds['getdefaults'] or kwds['slice_'] or
+                        kwds['expand'] or
+                        not kwds['getkeys'] or not is_json or
+                        uses_key_numbers(kwds) or not scans_root(kwds)):
+        raise click.UsageError(
+            '--raw works with --get & --root key names of a single file '
+            'only', ctx)
+    if kwds['schema_cache'] and (
+            len(filenames) != 1 or
+            not (kwds['listkeys'] or kwds['inspect']) or
+            any(kwds[i] for i in SCHEMA_CACHE_CONFLICTS)):
+        raise click.UsageError(
+            '--schema-cache works with --list or --inspect of a single '
+            'file only', ctx)
+    if kwds['spec'] and (len(filenames) > 1 or
+                         any(kwds[i] for i in SPEC_CONFLICTS)):
+        raise click.UsageError(
+            '--spec works with a single input file; the queries are given '
+            'by the spec', ctx)
+    if kwds['join'] and multiple:
+        raise click.UsageError('--join works with a single file only', ctx)
+    try:
+        aggregator.parse_aggregates(kwds['aggregates'])
+    except exc.JsonCutError as e:
+        raise click.BadParameter(str(e), ctx, param_hint='--agg')
+    try:
+        if kwds['join']:
+            joiner.parse_join(kwds['join'])
+    except exc.JsonCutError as e:
+        raise click.BadParameter(str(e), ctx, param_hint='--join')
+    kwds['jsonfile'] = filenames[0] if filenames and not multiple else None
+    if kwds['index']:
+        build_index(ctx, kwds)
+        return
+    if kwds['checkpoint'] and not kwds['follow']:
+        batch_run(ctx, kwds, is_json)
+        return
+    if kwds['output']:
+        ctx.obj = compressor.open_output(kwds['output'])
+        ctx.call_on_close(ctx.obj.close)
+    if multiple:
+        cut_files(ctx, filenames, kwds, is_json)
+        return
+    if kwds['follow']:
+        follow_file(ctx, kwds)
+        return
+    if kwds['spec']:
+        run_spec(ctx, kwds)
+        return
+    if kwds['schema_cache']:
+        results = cached_summary(ctx, kwds)
+        if results:
+            output(ctx, results, kwds['compact'], is_json)
+        return
+    if kwds['count'] and kwds['head'] is None and \
+            not any(kwds[i] for i in SCAN_COUNT_CONFLICTS):
+        results = scan_counts(ctx, kwds)
+        if results:
+            output(ctx, results, False, False)
+        return
+    if kwds['listkeys'] and scans_root(kwds) and \
+            not any(kwds[i] for i in SCAN_LIST_CONFLICTS):
+        results = scan_list(ctx, kwds)
+        if results is not None:
+            output(ctx, results, kwds['compact'], is_json)
+            return
+    if kwds['jobs'] not in (None, 1) and is_json and not records_pass and \
+            cut_chunks(ctx, kwds):
+        return
+    if kwds['raw']:
+        raw_get(ctx, kwds)
+        return
+    if records_pass:
+        output_records(ctx, post_process(kwds, stream_results(ctx, kwds),
+                                         pairs=True), kwds)
+        if limits.exceeded():
+            sys.exit(1)
+        return
+    with memstats.phase('load', objects=True):
+        records = load_indexed(ctx, kwds)
+        data = load_document(ctx, kwds) if records is None else None
+    if records is None:
+        results = cut(data, kwds)
+    else:
+        # the records aren't the file's document; its key catalog differs
+        results = cut(records, dict(kwds, rootkey=None, jsonfile=None))
     if results:
-        is_json = not (kwds['listkeys'] or kwds['inspect'] or kwds['count'])
-        output(ctx, results, kwds['compact'], is_json)
+        output(ctx, results, kwds['compact'], is_json, kwds['lines'])
         if kwds['expand']:
             output(ctx, expand(data, ctx, kwds), False, False)
+    if limits.exceeded():
+        sys.exit(1)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,109 @@
+"""Thin client for a warm jsoncut process (jsoncut --serve).
+
+Starting Python & importing jsoncut's dependencies takes much longer
+than cutting a small document. This module only imports the standard
+library (the jsoncut package imports its modules on first use); it
+forwards the arguments & STDIN to a jsoncut server listening on a Unix
+socket and writes back its STDOUT, STDERR & exit status. If no server is
+listening jsoncut is run in this process instead.
+
+Protocol:
+    request: a JSON header line (argv, cwd & whether STDIN/STDOUT are
+        terminals), followed by the bytes of STDIN; the client shuts
+        down its side of the socket for writing at the end of STDIN.
+    response: frames; a channel byte, the 4-byte big-endian payload
+        length & the payload. The channels are STDOUT, STDERR & EXIT;
+        the exit frame ends the response.
+"""
+import json
+import os
+import socket
+import struct
+import sys
+import threading
+
+SOCKET_ENV = 'JSONCUT_SOCKET'
+FRAME = struct.Struct('>cI')
+STDOUT, STDERR, EXIT = b'o', b'e', b'x'
+CHUNK_SIZE = 1 << 16
+
+
+def socket_path():
+    """Return $JSONCUT_SOCKET, or the per-user default socket path."""
+    path = os.environ.get(SOCKET_ENV)
+    if path:
+        return path
+    directory = os.environ.get('XDG_RUNTIME_DIR') or '/tmp'
+    return os.path.join(directory, 'jsoncut-{}.sock'.format(os.getuid()))
+
+
+def send_stdin(sock, stdin):
+    """Forward STDIN until it ends; the server may not read all of it."""
+    try:
+        for chunk in iter(lambda: stdin.read1(CHUNK_SIZE), b''):
+            sock.sendall(chunk)
+        sock.shutdown(socket.SHUT_WR)
+    except OSError:
+        pass
+
+
+def read_frames(file_):
+    """Yield the (channel, payload) frames of a response."""
+    while True:
+        header = file_.read(FRAME.size)
+        if len(header) < FRAME.size:
+            raise ConnectionError('jsoncut server closed the connection')
+        channel, size = FRAME.unpack(header)
+        yield channel, file_.read(size)
+
+
+def request(sock, argv, stdin=None, stdout=None, stderr=None):
+    """Run jsoncut with the arguments on the server.
+
+    Args:
+        sock (socket): socket connected to the server.
+        argv (List[str]): command-line arguments.
+        stdin, stdout, stderr (BinaryIO): default to the sys streams.
+
+    Returns:
+        int: exit status.
+    """
+    stdin = stdin or sys.stdin.buffer
+    stdout = stdout or sys.stdout.buffer
+    stderr = stderr or sys.stderr.buffer
+    header = {'argv': argv, 'cwd': os.getcwd(),
+              'stdin_tty': stdin.isatty(), 'stdout_tty': stdout.isatty()}
+    sock.sendall(json.dumps(header).encode() + b'\n')
+    if header['stdin_tty']:
+        sock.shutdown(socket.SHUT_WR)
+    else:
+        threading.Thread(target=send_stdin, args=(sock, stdin),
+                         daemon=True).start()
+    streams = {STDOUT: stdout, STDERR: stderr}
+    with sock.makefile('rb') as file_:
+        for channel, payload in read_frames(file_):
+            if channel == EXIT:
+                return int(payload)
+            streams[channel].write(payload)
+            streams[channel].flush()
+
+
+def main():
+    """Entry point; falls back to running jsoncut in this process."""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path())
+    except OSError:
+        sock.close()
+        from .cli import main as jsoncut
+        jsoncut(prog_name='jsoncut')
+    with sock:
+        status = request(sock, sys.argv[1:])
+    sys.stdout.flush()
+    sys.stderr.flush()
+    # the STDIN thread may be blocked reading input the server didn't need
+    os._exit(status)
+
+
+if __name__ == '__main__':
+    main()
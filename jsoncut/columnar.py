@@ -0,0 +1,155 @@
+"""Extract numeric fields of the records into typed columns.
+
+The value at each key path is appended straight to a typed array as the
+records are read; no per-record dicts are built. A column holds 64-bit
+integers until a float is found (then 64-bit floats) and a validity mask
+that is false where the key is missing or the value is null.
+
+columns:
+    NumPy arrays (int64 or float64 values & a bool mask) when NumPy is
+    installed; otherwise array.array ('q' or 'd' values & a 'B' mask).
+    Missing values are filled with 0 (integers) or NaN (floats).
+    Booleans are stored as 0 & 1; other values raise ColumnTypeError.
+
+Examples:
+    >>> records = [{'n': 1, 'r': {'x': 0.5}}, {'n': None}, {'n': 4}]
+    >>> columns = extract(records, [('n',), ('r', 'x')])
+    >>> columns['n'].tolist(), columns['r.x'].tolist()
+    ([1, None, 4], [0.5, None, None])
+    >>> columns['n'].summary()
+    {'count': 2, 'missing': 1, 'sum': 5, 'min': 1, 'max': 4, 'mean': 2.5, \
+'std': 1.5}
+"""
+import math
+import statistics
+from array import array
+from itertools import compress
+
+from . import exceptions as exc
+from .sorter import MISSING, lookup
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+INTEGER, FLOAT = 'q', 'd'
+FILL = {INTEGER: 0, FLOAT: math.nan}
+
+
+class ColumnBuilder(object):
+    """Append the values of a column to a typed array."""
+
+    __slots__ = ('name', 'values', 'valid')
+
+    def __init__(self, name):
+        self.name = name
+        self.values = array(INTEGER)
+        self.valid = array('B')
+
+    def append(self, value, n=0):
+        """Append a value (MISSING if not found) of record number n."""
+        if value is MISSING or value is None:
+            self.values.append(FILL[self.values.typecode])
+            self.valid.append(False)
+            return
+        try:
+            self.values.append(value)
+        except (TypeError, OverflowError):
+            if self.values.typecode == FLOAT or \
+                    not isinstance(value, (int, float)):
+                raise exc.ColumnTypeError(self.name, value, n)
+            self.promote()
+            self.values.append(value)
+        self.valid.append(True)
+
+    def promote(self):
+        """Convert the integers to floats; missing values become NaN."""
+        values = array(FLOAT, self.values)
+        for i in compress(range(len(values)), (not i for i in self.valid)):
+            values[i] = math.nan
+        self.values = values
+
+    def column(self):
+        """Return the Column; NumPy arrays share the buffers."""
+        if numpy is None:
+            return Column(self.name, self.values, self.valid)
+        return Column(self.name,
+                      numpy.frombuffer(self.values, self.values.typecode),
+                      numpy.frombuffer(self.valid, bool))
+
+
+class Column(object):
+    """The values of a key path & their validity mask."""
+
+    __slots__ = ('name', 'values', 'valid')
+
+    def __init__(self, name, values, valid):
+        """Initialize the column.
+
+        Args:
+            name (str): the key path name.
+            values (numpy.ndarray or array.array): integers or floats.
+            valid (numpy.ndarray or array.array): true where the value
+                was found & isn't null.
+        """
+        self.name = name
+        self.values = values
+        self.valid = valid
+
+    def __len__(self):
+        return len(self.values)
+
+    def __repr__(self):
+        return 'Column({!r}, {!r})'.format(self.name, self.tolist())
+
+    def tolist(self):
+        """Return the values as a list; None where they're missing."""
+        return [v if ok else None
+                for v, ok in zip(self.values.tolist(), self.valid.tolist())]
+
+    def summary(self):
+        """Return the count, missing, sum, min, max, mean & (population)
+        standard deviation of the valid values; vectorized with NumPy.
+        """
+        if numpy is None:
+            values = list(compress(self.values, self.valid))
+        else:
+            values = self.values[self.valid]
+        count = len(values)
+        stats = {'count': count, 'missing': len(self) - count}
+        if not count:
+            return dict(stats, sum=0, min=None, max=None, mean=None,
+                        std=None)
+        if numpy is None:
+            mean = statistics.fmean(values)
+            return dict(stats, sum=sum(values), min=min(values),
+                        max=max(values), mean=mean,
+                        std=statistics.pstdev(values, mean))
+        return dict(stats, sum=values.sum().item(), min=values.min().item(),
+                    max=values.max().item(), mean=values.mean().item(),
+                    std=values.std().item())
+
+
+def extract(records, keylists, names=None):
+    """Extract the values at the key paths of the records into columns.
+
+    Args:
+        records (Iterable): the records; e.g. the root array.
+        keylists (List[tuple]): key paths of names and/or indexes.
+        names (List[str]): the column names; the dotted key paths if None.
+
+    Returns:
+        dict: Column by name.
+
+    Raises:
+        ColumnTypeError: a value isn't a number, null or missing.
+    """
+    if names is None:
+        names = ['.'.join(i) for i in keylists]
+    builders = [ColumnBuilder(i) for i in names]
+    paths = [(keylist, i.append) for keylist, i in zip(keylists, builders)]
+    for n, record in enumerate(records, 1):
+        for keylist, append in paths:
+            append(lookup(record, keylist), n)
+    return {i.name: i.column() for i in builders}
@@ -0,0 +1,144 @@
+"""Write compressed output; blocks compressed by a pool of threads.
+
+The output text is cut into blocks, each compressed on its own as a
+complete gzip member, bzip2 stream or xz stream. The compressors release
+the GIL, so the blocks are compressed concurrently while the records
+are being cut & serialized. The compressed blocks are written in order;
+concatenated members/streams are a valid .gz, .bz2 or .xz file, read by
+gzip, bzip2, xz & Python's modules as a single stream.
+
+Examples:
+    >>> import gzip, os, tempfile
+    >>> path = os.path.join(tempfile.mkdtemp(), 'out.json.gz')
+    >>> with open_output(path) as file_:
+    ...     _ = file_.write('[1, 2, 3]\\n')
+    >>> gzip.decompress(open(path, 'rb').read())
+    b'[1, 2, 3]\\n'
+"""
+import bz2
+import gzip
+import io
+import lzma
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import click
+
+BLOCK_SIZE = 1 << 20
+ENCODING = 'utf-8'
+
+COMPRESSORS = {
+    '.gz': partial(gzip.compress, compresslevel=6, mtime=0),
+    '.bz2': bz2.compress,
+    '.xz': lzma.compress,
+}
+
+
+def compressor(path):
+    """Return the compress function for the path's suffix; None if it
+    isn't compressed.
+    """
+    return COMPRESSORS.get(os.path.splitext(path)[1].lower())
+
+
+class BlockBuffer(io.RawIOBase):
+    """The binary stream of a BlockWriter; e.g. for click.echo of bytes."""
+
+    def __init__(self, writer):
+        self.writer = writer
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        """Add the encoded text to the writer's block."""
+        return self.writer.write_bytes(data)
+
+
+class BlockWriter(io.TextIOBase):
+    """A text file compressing its blocks on a pool of threads.
+
+    At most two blocks per thread are pending, so the memory used is
+    bounded no matter how fast the text is written.
+
+    Attributes:
+        buffer (BlockBuffer): the binary stream; encoded text written to
+            it is added to the same blocks.
+    """
+
+    def __init__(self, path, compress, block_size=BLOCK_SIZE, threads=None):
+        """Open the output file.
+
+        Args:
+            path (str): the output file.
+            compress (callable): compress a block (bytes) into a complete
+                member or stream.
+            block_size (int): uncompressed bytes per block.
+            threads (int): compressing threads; one per CPU by default.
+        """
+        threads = threads or os.cpu_count() or 1
+        self.file = open(path, 'wb')
+        self.compress = compress
+        self.block_size = block_size
+        self.executor = ThreadPoolExecutor(threads)
+        self.max_pending = 2 * threads
+        self.pending = deque()
+        self._block = bytearray()
+        self.blocks = 0
+        self.buffer = BlockBuffer(self)
+
+    def writable(self):
+        return True
+
+    def write(self, text):
+        """Buffer the text; compress each full block in the background."""
+        self.write_bytes(text.encode(ENCODING))
+        return len(text)
+
+    def write_bytes(self, data):
+        """Buffer encoded text; see write."""
+        self._block += data
+        while len(self._block) >= self.block_size:
+            block = bytes(self._block[:self.block_size])
+            del self._block[:self.block_size]
+            self.submit(block)
+        return len(data)
+
+    def submit(self, block):
+        """Compress a block; write the blocks compressed so far in order."""
+        self.pending.append(self.executor.submit(self.compress, block))
+        self.blocks += 1
+        while self.pending and (len(self.pending) > self.max_pending or
+                                self.pending[0].done()):
+            self.file.write(self.pending.popleft().result())
+
+    def close(self):
+        """Compress the rest of the text & close the file."""
+        if self.closed:
+            return
+        try:
+            if self._block or not self.blocks:
+                self.submit(bytes(self._block))
+                self._block.clear()
+            while self.pending:
+                self.file.write(self.pending.popleft().result())
+        finally:
+            self.executor.shutdown()
+            self.file.close()
+            super(BlockWriter, self).close()
+
+
+def open_output(path, into=None):
+    """Open the --output file; compressed if it ends with .gz, .bz2 or .xz.
+
+    Args:
+        path (str): the output file.
+        into (str): write into this file instead (e.g. a temporary file to
+            be renamed to path); compressed as per path.
+    """
+    compress = compressor(path)
+    if compress is None:
+        return click.open_file(into or path, 'w')
+    return BlockWriter(into or path, compress)
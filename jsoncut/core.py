@@ -18,17 +18,24 @@ JSON Key definition:
         names.0.name.last
         names.2:5
 """
-from copy import deepcopy
+from copy import copy
 from functools import reduce
 from operator import getitem
 
 import click
 
+from . import columnar
 from . import exceptions as exc
-from .inspector import inspect_json, count_arrays
-from .sequencer import Items
-from .tokenizer import SLICE_RE, parse_defaults, parse_keystr
-from .treecrawler import find_keys
+from . import limits
+from . import memstats
+from .inspector import count_arrays, inspect_json, inspect_stats
+from .passthrough import find_spans
+from .scanner import LBRACE, LBRACKET, Scanner
+from .sequencer import Items, is_sequence_and_not_str
+from .tokenizer import (NUMBER_RANGE_RE, SLICE_RE, parse_csv,
+                        parse_defaults, parse_keystr)
+from .treecrawler import (KeyNode, add_raw_keys, find_keys, key_paths,
+                          scan_keys)
 
 
 def get_rootkey(d, *keys):
@@ -143,13 +150,55 @@ def list_keys(d, fullscan=False, fg_nums='yellow'):
         numbered shortcuts as you do with --list for specifying key
         paths in the command-line.
     """
-    keys = find_keys(d, fullscan)
+    return number_keys(find_keys(d, fullscan), fg_nums)
+
+
+def number_keys(keys, fg_nums='yellow'):
+    """Generate the numbered list of the keys; see list_keys."""
     padding = len(str(len(keys)))
     numbers = (str(i).rjust(padding) for i in range(1, len(keys) + 1))
     numbers = (click.style(i, fg=fg_nums) for i in numbers)
     return (n + ' ' + i for n, i in zip(numbers, keys))
 
 
+def find_raw_keys(buf, keylist=None, fullscan=False):
+    """Return a sorted list of keys from raw JSON text; see list_keys.
+
+    The member names are found by scanning the raw bytes; the document
+    isn't decoded. An object is walked by its members (see
+    treecrawler.add_raw_keys), the records of a root array or JSON lines
+    by their strings (see treecrawler.scan_keys). Without fullscan only
+    the first record is scanned; the rest of the text isn't read.
+
+    Args:
+        buf (bytes-like): raw JSON text; a document or JSON lines.
+        keylist (tuple): key path of the root; see passthrough.find_spans.
+        fullscan (bool): scan all of the records.
+
+    Raises:
+        ScanError: the root isn't found or the JSON is malformed.
+    """
+    scanner = Scanner(buf)
+    pos, end = scanner.skip_ws(0), None
+    if keylist:
+        spans = find_spans(scanner, pos, keylist) if pos < len(buf) else None
+        if spans is None:
+            raise exc.ScanError('Root key not found', pos)
+        pos, end = spans[-1]
+    root, char = KeyNode(), scanner.char(pos)
+    if char == LBRACKET and fullscan:
+        scan_keys(buf, pos, end, root)
+    elif char == LBRACKET:
+        pos = scanner.skip_ws(pos + 1)
+        if scanner.char(pos) == LBRACE:
+            add_raw_keys(root, scanner, pos)
+    elif char == LBRACE:
+        pos = scanner.skip_ws(add_raw_keys(root, scanner, pos))
+        if fullscan and not keylist and pos < len(buf):
+            scan_keys(buf, pos, None, root)  # the other JSON lines
+    return sorted(key_paths(root))
+
+
 def get_item(d, key):
     """Try to get item using the key, if fails try as an index or slice.
 
@@ -343,7 +392,7 @@ def get_defaults(d, *defaults, fullpath=False, n=0):
         {'k1.k2': 'item1', 'k3': False}
     """
     try:
-        return {into_key(k, fullpath): select_key(d, *k, default=v)
+        return {into_key(*k, fullpath=fullpath): select_key(d, *k, default=v)
                 for k, v in defaults}
     except exc.KeyTypeError as e:
         kwds = dict(op='getdefaults', data=d, keylists=defaults)
@@ -439,9 +488,246 @@ def del_items(d, *keylists, any=False, n=0):
             raise exc.KeyTypeError(e, **kwds)
 
 
+def copy_path(d, keys):
+    """Copy the containers along a key path; shallow copies.
+
+    The copies replace the originals in d, so deleting from them doesn't
+    change the source data. Stops at a missing key or a slice.
+
+    Example:
+        >>> inner = {'k2': {'k3': 1}}
+        >>> d = {'k1': inner}
+        >>> copy_path(d, ('k1', 'k2'))
+        >>> d['k1'] is inner, d['k1'] == inner
+        (False, True)
+    """
+    for key in keys:
+        try:
+            child = get_item(d, key)
+        except (KeyError, IndexError, TypeError, ValueError):
+            return
+        if ':' in key or not isinstance(child, (dict, list)):
+            return
+        child = copy(child)
+        d[int(key) if isinstance(d, list) else key] = child
+        d = child
+
+
+def check_items(d, *keylists, op='get', n=0):
+    """Raise the error of a get (or del) of a missing key path.
+
+    Args:
+        d (Mapping or Sequence): JSON encodable data (document)
+        *keylists List[str]: JSON Keys (name, index or trailing slice)
+        op (str): the operation checked; shown to user.
+        n (int): Data item number being processed; shown to user in
+            exception handling.
+
+    Raises:
+        KeyNotFound, IndexOutOfRange or KeyTypeError
+
+    Examples:
+        >>> check_items({'k1': {'k2': 1}}, ['k1', 'k2'])
+        >>> try:
+        ...     check_items({'k1': {}}, ['k1', 'k2'], op='del')
+        ... except exc.KeyNotFound:
+        ...     print('not found')
+        not found
+    """
+    for keylist in keylists:
+        try:
+            select_key(d, *keylist, no_default=True)
+        except (exc.KeyNotFound, exc.IndexOutOfRange,
+                exc.KeyTypeError) as e:
+            kwds = dict(op=op, itemnum=n, data=d, keylist=keylist)
+            raise type(e)(e, **kwds)
+
+
+def nested_in(keylist, keylists):
+    """Return True if a key path is nested in one of the key paths."""
+    for i in keylists:
+        if len(i) < len(keylist) and keylist[:len(i)] == i:
+            return True
+    return False
+
+
+class Projection(object):
+    """The get, getdefault & del operations of a cut; planned up front.
+
+    The operations are applied to each record in a single pass; the
+    fields selected by get & getdefault are gathered into a new dict,
+    then the dels are applied to it (without any fields, the dels are
+    applied to a copy of the record). Only the containers along the
+    deleted key paths are copied; the input data is never changed.
+
+    Planning removes the redundant operations:
+        * a field that is deleted isn't selected.
+        * repeated dels & the dels nested in another deleted key path.
+        * with any, the dels of fields that aren't selected.
+    Unless any is set, the key paths of the gets & nested dels planned
+    away are still checked (see check_items), so a mistyped key raises
+    KeyNotFound as it would without planning.
+
+    Examples:
+        >>> projection = Projection([('a',), ('b',)],
+        ...                         dels=[('b',), ('a', 'x')])
+        >>> projection.gets
+        [('a',)]
+        >>> record = {'a': {'x': 1, 'y': 2}, 'b': 3}
+        >>> projection(record)
+        {'a': {'y': 2}}
+        >>> record
+        {'a': {'x': 1, 'y': 2}, 'b': 3}
+    """
+
+    __slots__ = ('gets', 'defaults', 'dels', 'selects', 'fullpath', 'any',
+                 'unselected', 'unchecked')
+
+    def __init__(self, gets=(), defaults=(), dels=(), fullpath=False,
+                 any=False):
+        """Plan the operations.
+
+        Args:
+            gets (List[tuple]): key paths of the fields to select.
+            defaults (List[tuple]): (key path, default value) of the
+                fields to select; the default is used if it's missing.
+            dels (List[tuple]): key paths to delete; from the selected
+                fields if there are any, otherwise from the records.
+            fullpath (bool): name the fields by their full key path.
+            any (bool): ignore missing keys; see get_items & del_items.
+        """
+        dels = list(dict.fromkeys(tuple(i) for i in dels))
+        nested = [i for i in dels if nested_in(i, dels)]
+        dels = [i for i in dels if not nested_in(i, dels)]
+        deleted = {i[0] for i in dels if len(i) == 1}
+        self.selects = bool(gets or defaults)
+        fields = set()
+        self.gets, self.defaults = [], []
+        # the gets (& defaults) of the deleted fields; still checked
+        unselected = ([], [])
+        for keylist in gets:
+            into = into_key(*keylist, fullpath=fullpath)
+            fields.add(into)
+            selected = unselected[0] if into in deleted else self.gets
+            selected.append(tuple(keylist))
+        for keylist, value in defaults:
+            into = into_key(*keylist, fullpath=fullpath)
+            fields.add(into)
+            selected = unselected[1] if into in deleted else self.defaults
+            selected.append((tuple(keylist), value))
+        self.unselected = None if any or not nested and not unselected[0] \
+            else unselected
+        self.unchecked = [] if any else nested
+        if self.selects:
+            # the deleted fields aren't selected, so there's nothing to do
+            dels = [i for i in dels if len(i) > 1 or i[0] not in fields]
+            if any:
+                dels = [i for i in dels if i[0] in fields]
+        self.dels = dels
+        self.fullpath, self.any = fullpath, any
+
+    def __call__(self, record, n=0):
+        """Return the output record (n: record number for errors)."""
+        if self.selects:
+            result = get_items(record, *self.gets, fullpath=self.fullpath,
+                               any=self.any, n=n) if self.gets else {}
+            if self.defaults:
+                result.update(get_defaults(
+                    record, *self.defaults, fullpath=self.fullpath, n=n))
+        elif isinstance(record, (dict, list)):
+            result = copy(record)
+        else:
+            result = record
+        if self.unselected is not None:
+            self.check(record, result, n)
+        if self.dels:
+            for keylist in self.dels:
+                copy_path(result, keylist[:-1])
+            del_items(result, *self.dels, any=self.any, n=n)
+        return result
+
+    def check(self, record, result, n=0):
+        """Check the key paths of the operations planned away."""
+        gets, defaults = self.unselected
+        fields = get_items(record, *gets, fullpath=self.fullpath,
+                           any=False, n=n) if gets else {}
+        if self.unchecked:
+            if defaults:
+                fields.update(get_defaults(
+                    record, *defaults, fullpath=self.fullpath, n=n))
+            # the nested dels apply to all the selected fields
+            fields = dict(result, **fields) if self.selects else result
+            check_items(fields, *self.unchecked, op='del', n=n)
+
+
+def uses_key_numbers(*keystrs, quotechar='"'):
+    """Return True if key numbers (of the key catalog) are used."""
+    return any(NUMBER_RANGE_RE.match(token) for keystr in keystrs if keystr
+               for token in parse_csv(keystr, quotechar))
+
+
+def plan_cut(getkeys=None, getdefaults=(), delkeys=None, keys=None,
+             quotechar='"', fullpath=False, any=False, decoded=False):
+    """Parse the get, getdefault & del keys into a Projection.
+
+    Args:
+        keys (List[str]): the key catalog; needed for key numbers.
+        decoded (bool): the default values are decoded JSON (e.g. from a
+            --spec) rather than Python literals given as text.
+        See cut for the other arguments.
+    """
+    def keylists(keystr):
+        return parse_keystr(keystr, None, quotechar, keys) if keystr else []
+
+    defaults = [(keylist, default if decoded else value)
+                for keystr, default in getdefaults or ()
+                for keylists_, value in [parse_defaults(
+                    keystr, default, quotechar=quotechar, keys=keys)]
+                for keylist in keylists_]
+    return Projection(keylists(getkeys), defaults, keylists(delkeys),
+                      fullpath, any)
+
+
+def project(projection, items):
+    """Return the projections of the records of Items; check the limits.
+
+    Raises:
+        LimitExceeded: holding the records projected so far (a list of
+            records only).
+    """
+    results = []
+    try:
+        for n, d in enumerate(items.items, 1):
+            limits.tick(n)
+            results.append(projection(d, n))
+    except exc.LimitExceeded as e:
+        if not items.is_str_or_not_sequence:
+            e.partial = results
+        raise
+    return results
+
+
+def select_root(data, rootkey=None, quotechar='"', fullscan=False, skip=0,
+                head=None):
+    """Set the root of the document; select a range of root records."""
+    if rootkey:
+        keylist = parse_keystr(rootkey, data, quotechar, None, fullscan)
+        data = get_rootkey(data, *keylist[0])
+
+    if (skip or head is not None) and is_sequence_and_not_str(data):
+        data = data[skip:None if head is None else skip + head]
+    return data
+
+
+def key_catalog(data, fullscan=False, slice_=False):
+    """Return the key paths that key numbers refer to (see list_keys)."""
+    return find_keys([data] if slice_ else data, fullscan)
+
+
 def cut(data, rootkey=None, getkeys=None, getdefaults=None, delkeys=None,
         any=False, listkeys=False, inspect=False, count=False, fullpath=False,
-        fullscan=False, quotechar='"', slice_=False):
+        fullscan=False, quotechar='"', slice_=False, skip=0, head=None,
+        stats=False, depth=1, keys=None):
     """Translate the given user data & parameters into actions.
 
     This function is effectively the hub/core of JSON cut.
@@ -462,7 +748,11 @@ def cut(data, rootkey=None, getkeys=None, getdefaults=None, delkeys=None,
             or index does not exist.
         listkeys (bool): enumerated, sorted list all unique JSON Keys.
         inspect (bool): sorted list of all unique JSON Keys.
-        count (bool):
+        stats (bool): used with inspect; report value statistics (see
+            inspector.inspect_stats) instead of the list of types.
+        count (bool): count the elements of arrays.
+        depth (int): used with count; count the arrays nested up to this
+            level (1 = top-level arrays.)
         flatten (str): flatten specified key numbers (output of --list)
         rows (str): generate flattened row data from specified root key
             number (output of --list), optionally prepend each row with
@@ -471,47 +761,64 @@ def cut(data, rootkey=None, getkeys=None, getdefaults=None, delkeys=None,
         fullscan (bool): don't skip previously visited JSON Keys.
         quotechar (str): the quote character used around JSON Keys.
         slice (bool): when the document root is an array don't iterate
+        skip (int): discard the first records of the root array.
+        head (int): keep at most this many records of the root array.
+        keys (List[str]): key_catalog() of the root, i.e. from a cache;
+            found if not given.
     """
-    if rootkey:
-        keylist = parse_keystr(rootkey, data, quotechar, None, fullscan)
-        data = get_rootkey(data, *keylist[0])
+    data = select_root(data, rootkey, quotechar, fullscan, skip, head)
 
     if getkeys or getdefaults or delkeys:
-        data = Items([data] if slice_ else data)
-        items = deepcopy(data.items) if getkeys and getdefaults else data.items
-        keys = find_keys(data.value, fullscan)
-        full, qchar = fullpath, quotechar
-
-        if getkeys:
-            keylists = parse_keystr(getkeys, data.items, quotechar, keys)
-            data.items = [get_items(d, *keylists, fullpath=full, any=any, n=n)
-                          for n, d in enumerate(data.items, 1)]
-        if getdefaults:
-            print(getdefaults)
-            defaults = getdefaults
-            kwds = dict(data=data, quotechar=qchar, keys=keys, fullscan=full)
-            defaults = [parse_defaults(i[0], j, **kwds) for i, j in defaults]
-            print(defaults)
-            for n, item in enumerate(items, 1):
-                results = get_defaults(item, *defaults, fullpath=full, n=n)
-                data.items[n - 1].update(results)
-        if delkeys:
-            keylists = parse_keystr(delkeys, data.items, quotechar, keys)
-            for item_num, item in enumerate(data.items):
-                del_items(item, *keylists, any=any, n=item_num)
-
+        with memstats.phase('items'):
+            data = Items([data] if slice_ else data)
+        keystrs = [getkeys, delkeys] + [i for i, _ in getdefaults or ()]
+        if keys is None and uses_key_numbers(*keystrs, quotechar=quotechar):
+            with memstats.phase('crawl'):
+                keys = key_catalog(data.value, fullscan)
+        with memstats.phase('cut'):
+            projection = plan_cut(getkeys, getdefaults, delkeys, keys,
+                                  quotechar, fullpath, any)
+            data.items = project(projection, data)
         data = data.value
 
     if inspect:
-        return inspect_json(data)
+        return inspect_stats(data) if stats else inspect_json(data)
     elif listkeys:
         return list_keys(data, fullscan)
     elif count:
-        return count_arrays(data)
+        return count_arrays(data, depth=depth)
     else:
         return data
 
 
+def columns(data, getkeys, rootkey=None, fullpath=False, fullscan=False,
+            quotechar='"', skip=0, head=None):
+    """Extract numeric fields of the root records into typed columns.
+
+    The values are appended straight to typed arrays (see columnar);
+    NumPy arrays when it's installed, otherwise array.array.
+
+    Args:
+        data (obj): a JSON encodable object.
+        getkeys (str): the key paths of the columns (JSON Keys).
+        See cut for the other arguments.
+
+    Returns:
+        dict: columnar.Column by name; its values, validity mask &
+            summary() statistics.
+
+    Example:
+        >>> data = {'rows': [{'id': 1, 'x': {'y': 2.5}}, {'id': 2}]}
+        >>> result = columns(data, 'id, x.y', rootkey='rows')
+        >>> result['y'].tolist(), result['y'].summary()['mean']
+        ([2.5, None], 2.5)
+    """
+    data = select_root(data, rootkey, quotechar, fullscan, skip, head)
+    keylists = parse_keystr(getkeys, data, quotechar, None, fullscan)
+    names = [into_key(*i, fullpath=fullpath) for i in keylists]
+    return columnar.extract(Items(data).items, keylists, names)
+
+
 def listkeys(d):
     return find_keys(d, fullscan=True)
 
@@ -524,5 +831,5 @@ def inspectkeys(d):
     print('\n'.join(inspect_json(d, nocolor=True, array_char='*')))
 
 
-def arraycounts(d):
-    print(count_arrays(d))
+def arraycounts(d, depth=1):
+    print('\n'.join(count_arrays(d, nocolor=True, depth=depth)))
@@ -0,0 +1,64 @@
+"""Drop records with repeated keys while streaming.
+
+By default the keys seen are held in an exact set; memory grows with the
+number of unique keys. A Bloom filter uses a fixed amount of memory, but
+a small fraction of unique records (the false positive rate) are dropped
+as if they were repeats.
+
+Records missing all of the key paths are always kept.
+
+The records may be given as (input record, output record) pairs; see
+sorter.lookup_pair. The first pair of each key is yielded.
+
+Examples:
+    >>> records = [{'id': 1}, {'id': 2}, {'id': 1, 'x': 0}, {'x': 1}]
+    >>> list(unique_records(records, [('id',)]))
+    [{'id': 1}, {'id': 2}, {'x': 1}]
+"""
+import json
+
+from .sketches import BloomFilter
+from .sorter import MISSING, lookup, lookup_pair
+
+
+def record_key(record, keylists, find=lookup):
+    """Return the key of a record as JSON text; None if it's missing.
+
+    Args:
+        find (function): lookup, or lookup_pair for a record pair.
+    """
+    values = [find(record, i) for i in keylists]
+    if all(i is MISSING for i in values):
+        return None
+    values = [None if i is MISSING else i for i in values]
+    return json.dumps(values, sort_keys=True)
+
+
+def unique_records(records, keylists, bloom_size=None, error_rate=None,
+                   pairs=False):
+    """Yield the first record of each key.
+
+    Args:
+        records (iter): JSON records; or record pairs, see module docs.
+        keylists (List[tuple]): key paths that identify a record.
+        bloom_size (int): bytes of the Bloom filter; only used if an
+            error_rate is given.
+        error_rate (float): use a Bloom filter with this target false
+            positive rate instead of an exact set.
+        pairs (bool): the records are (input, output) record pairs.
+    """
+    if error_rate:
+        seen = BloomFilter(bloom_size, error_rate).add
+    else:
+        keys = set()
+
+        def seen(key):
+            found = key in keys
+            keys.add(key)
+            return found
+
+    find = lookup_pair if pairs else lookup
+    for record in records:
+        key = record_key(record, keylists, find)
+        if key is None or not seen(key):
+            yield record
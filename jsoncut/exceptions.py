@@ -68,6 +68,20 @@ class JsonCutError(Exception):
         return default_error_mesg_fmt(self, nocolor)
 
 
+class ScanError(JsonCutError, ValueError):
+    """Malformed JSON found while scanning the raw bytes."""
+
+    def __init__(self, msg, pos):
+        """Initialize ScanError Exception.
+
+        Args:
+            msg (str): description of the problem.
+            pos (int): byte offset where the problem was found.
+        """
+        super(ScanError, self).__init__('{} (byte {})'.format(msg, pos))
+        self.pos = pos
+
+
 class KeyNumberOutOfRange(JsonCutError, ValueError):
     """Invalid Key-Number."""
 
@@ -216,3 +230,101 @@ class KeyNotFound(JsonCutError, KeyError):
                           'using the jsoncut --any option.', 'cyan')
         }
         return color_error_mesg(mesg, kwds, nocolor)
+
+
+class CheckpointMismatch(JsonCutError, ValueError):
+    """The checkpoint was saved by a run with different arguments."""
+
+    def __init__(self, path):
+        """Initialize CheckpointMismatch Exception.
+
+        Args:
+            path (str): the checkpoint file.
+        """
+        super(CheckpointMismatch, self).__init__(
+            '{} was saved by a run with different arguments'.format(path))
+        self.path = path
+
+
+class InvalidAggregate(JsonCutError, ValueError):
+    """Unknown aggregate function or missing key path."""
+
+    def __init__(self, spec):
+        """Initialize InvalidAggregate Exception.
+
+        Args:
+            spec (str): the FUNCTION:KEYPATH aggregate.
+        """
+        super(InvalidAggregate, self).__init__(
+            '{!r}; expected FUNCTION:KEYPATH, where FUNCTION is count, sum, '
+            'min, max, mean or first'.format(spec))
+
+
+class InvalidJoin(JsonCutError, ValueError):
+    """Malformed FILE:KEYPATH=KEYPATH join."""
+
+    def __init__(self, spec):
+        """Initialize InvalidJoin Exception.
+
+        Args:
+            spec (str): the join.
+        """
+        super(InvalidJoin, self).__init__(
+            '{!r}; expected FILE:KEYPATH=KEYPATH'.format(spec))
+
+
+class ColumnTypeError(JsonCutError, TypeError):
+    """A value of a column isn't a number."""
+
+    def __init__(self, name, value, itemnum=0):
+        """Initialize ColumnTypeError Exception.
+
+        Args:
+            name (str): the column name.
+            value (obj): the value.
+            itemnum (int): the record number.
+        """
+        super(ColumnTypeError, self).__init__(
+            'column {!r} of record #{}: {} is not a number'.format(
+                name, itemnum, type(value).__name__))
+        self.name = name
+        self.value = value
+        self.item_number = itemnum
+
+
+class LimitExceeded(JsonCutError, RuntimeError):
+    """A resource limit of the run was exceeded; see limits.
+
+    Attributes:
+        partial (list): the records cut before the limit was exceeded;
+            None if the run wasn't cutting records.
+    """
+
+    def __init__(self, limit, value, maximum):
+        """Initialize LimitExceeded Exception.
+
+        Args:
+            limit (str): the name of the limit; e.g. max_depth.
+            value (obj): the value found.
+            maximum (obj): the limit.
+        """
+        super(LimitExceeded, self).__init__('--{} exceeded: {} > {}'.format(
+            limit.replace('_', '-'), value, maximum))
+        self.limit = limit
+        self.value = value
+        self.maximum = maximum
+        self.partial = None
+
+
+class InvalidSpec(JsonCutError, ValueError):
+    """Malformed --spec file of queries."""
+
+    def __init__(self, path, problem):
+        """Initialize InvalidSpec Exception.
+
+        Args:
+            path (str): the spec file.
+            problem (str): what's wrong with it.
+        """
+        super(InvalidSpec, self).__init__('{}: {}'.format(path, problem))
+        self.path = path
@@ -0,0 +1,148 @@
+"""Tail growing JSON lines (NDJSON) files.
+
+Only complete lines are returned; a partially written line is kept
+until the writer finishes it. The file is read in blocks of BLOCK_SIZE
+bytes & the lines are returned as soon as a block completes some, so
+the memory used doesn't grow with the data appended between polls.
+
+rotation:
+    The file was renamed (e.g. app.log -> app.log.1) and a new file was
+    created in its place; the rest of the old file is read, then the
+    new file is read from the start.
+
+truncation:
+    The file is shorter than what was already read; it's read again
+    from the start.
+
+Examples:
+    >>> import os, tempfile
+    >>> path = os.path.join(tempfile.mkdtemp(), 'app.log')
+    >>> with open(path, 'w') as f:
+    ...     _ = f.write('{"n": 1}\\n{"n": 2}\\n{"n"')
+    >>> follower = Follower(path)
+    >>> follower.poll()
+    [(b'{"n": 1}', 9), (b'{"n": 2}', 18)]
+    >>> with open(path, 'a') as f:
+    ...     _ = f.write(': 3}\\n')
+    >>> follower.poll()
+    [(b'{"n": 3}', 27)]
+"""
+import os
+import time
+
+POLL_INTERVAL = 0.5
+BLOCK_SIZE = 1 << 16
+
+
+class Follower(object):
+    """Read the lines appended to a file.
+
+    Attributes:
+        offset (int): byte offset following the last complete line.
+        inode (int): inode number of the file being read.
+    """
+
+    def __init__(self, filename, offset=0, inode=None):
+        """Initialize the follower.
+
+        Args:
+            filename (str): path of the (growing) file.
+            offset (int): byte offset to start reading from.
+            inode (int): inode number the offset belongs to; if the file
+                has since been replaced it's read from the start.
+        """
+        self.filename = filename
+        self.file = None
+        self.offset = offset
+        self.inode = inode
+        self.pending = []  # the blocks of a partial line
+
+    def state(self):
+        """Return the position as a JSON encodable checkpoint."""
+        return {'filename': self.filename, 'inode': self.inode,
+                'offset': self.offset}
+
+    @classmethod
+    def resume(cls, filename, state=None):
+        """Create a follower from a checkpoint (see state)."""
+        if not state or state.get('filename') != filename:
+            return cls(filename)
+        return cls(filename, state['offset'], state['inode'])
+
+    def open(self):
+        """Open the file; False if it doesn't exist (yet)."""
+        try:
+            file_ = open(self.filename, 'rb')
+        except FileNotFoundError:
+            return False
+        stat = os.fstat(file_.fileno())
+        if stat.st_ino != self.inode or stat.st_size < self.offset:
+            self.offset = 0
+        self.close()
+        self.file, self.inode, self.pending = file_, stat.st_ino, []
+        file_.seek(self.offset)
+        return True
+
+    def close(self):
+        """Close the file being read."""
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def rotated(self):
+        """Return True if the path now refers to a different file."""
+        try:
+            return os.stat(self.filename).st_ino != self.inode
+        except FileNotFoundError:
+            return False
+
+    def read(self):
+        """Return the complete lines and their end offsets; read blocks
+        until one completes a line (or the end of the file).
+        """
+        if os.fstat(self.file.fileno()).st_size < self.offset:
+            # truncated; start over
+            self.offset, self.pending = 0, []
+            self.file.seek(0)
+        result = []
+        while not result:
+            block = self.file.read(BLOCK_SIZE)
+            if not block:
+                break
+            end = block.rfind(b'\n')
+            if end < 0:
+                self.pending.append(block)
+                continue
+            self.pending.append(block[:end])
+            lines = b''.join(self.pending).split(b'\n')
+            self.pending = [block[end + 1:]]
+            offset = self.offset
+            for line in lines:
+                offset += len(line) + 1
+                if line.strip():
+                    result.append((line.rstrip(b'\r'), offset))
+            self.offset = offset
+        return result
+
+    def poll(self):
+        """Return the (line, end offset) pairs appended since last poll.
+
+        Blank lines are skipped but still advance the offset.
+        """
+        if self.file is None and not self.open():
+            return []
+        lines = self.read()
+        if not lines and self.rotated():
+            self.inode = None
+            if self.open():
+                lines = self.read()
+        return lines
+
+    def __iter__(self):
+        """Yield batches of lines forever; sleep while there are none."""
+        while True:
+            lines = self.poll()
+            if lines:
+                yield lines
+            else:
+                time.sleep(POLL_INTERVAL)
@@ -44,6 +44,32 @@ def format_json(d, compact=False, indent=2):
     return json.dumps(d, indent=indent, separators=separators)
 
 
+def format_json_array(items, compact=False, indent=2, started=False):
+    """Format a JSON array one element at a time.
+
+    Joined together, the generated text is the same as format_json()
+    of the list of items; without having to hold the list in memory.
+    If started, the opening bracket & preceding items were already
+    output.
+
+    Examples:
+        >>> ''.join(format_json_array(iter([1, {'k': 2}])))
+        '[\\n  1,\\n  {\\n    "k": 2\\n  }\\n]'
+        >>> ''.join(format_json_array(iter([])))
+        '[]'
+    """
+    if indent is None:
+        newline, separator = '', ',' if compact else ', '
+    else:
+        newline, separator = '\n' + ' ' * indent, ','
+    opening = separator if started else '['
+    for item in items:
+        text = format_json(item, compact, indent)
+        yield opening + newline + text.replace('\n', newline)
+        opening = separator
+    yield '[]' if opening == '[' else newline[:1] + ']'
+
+
 def highlight_json(d, style=STYLE):
     """JSON Syntax highlighter."""
     try:
@@ -0,0 +1,172 @@
+"""Sidecar index of the byte offsets of the records of a JSON file.
+
+index:
+    FILE.jcx holds the (start, end) byte offsets of every element of the
+    root array (or of an array found by a key path, or the values of a
+    JSON lines file) along with the size & modification time of FILE;
+    it's ignored once FILE changes. Records are then decoded by seeking
+    straight to their offsets in a memory map of FILE.
+
+format:
+    a magic line, a JSON header line padded to a multiple of 8 bytes &
+    an array of unsigned 64-bit offsets (native byte order).
+
+Examples:
+    >>> import os, tempfile
+    >>> filename = os.path.join(tempfile.mkdtemp(), 'rows.json')
+    >>> with open(filename, 'w') as file_:
+    ...     _ = file_.write('{"rows": [{"n": 0}, {"n": 1}, {"n": 2}]}')
+    >>> build(filename, ('rows',))
+    3
+    >>> with open_index(filename) as index:
+    ...     index.root, len(index), index.span(1)
+    (('rows',), 3, (20, 28))
+    >>> load_records(filename, range(3)[1:])
+    [{'n': 1}, {'n': 2}]
+"""
+import json
+import mmap
+import os
+from array import array
+from contextlib import contextmanager
+
+from .passthrough import iter_records
+from .scanner import Scanner, open_buffer
+
+SUFFIX = '.jcx'
+MAGIC = b'JSONCUT-INDEX 1\n'
+TYPECODE = 'Q'
+
+
+def index_path(filename):
+    """Return the path of the index sidecar of a file."""
+    return filename + SUFFIX
+
+
+def file_version(filename):
+    """Return the size & modification time that the index belongs to."""
+    stat = os.stat(filename)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def build(filename, root=()):
+    """Scan a file once & write the index of its records' offsets.
+
+    Args:
+        filename (str): JSON file (not STDIN).
+        root (tuple): key path of names and/or indexes of the array.
+
+    Returns:
+        int: the number of records indexed.
+    """
+    offsets = array(TYPECODE)
+    version = file_version(filename)
+    with open_buffer(filename) as buf:
+        for span in iter_records(Scanner(buf), root):
+            offsets.extend(span)
+    header = dict(version, root=list(root), count=len(offsets) // 2)
+    header = json.dumps(header).encode()
+    header += b' ' * (-(len(MAGIC) + len(header) + 1) % 8) + b'\n'
+    path = index_path(filename)
+    temp = path + '.tmp'
+    with open(temp, 'wb') as file_:
+        file_.write(MAGIC + header)
+        offsets.tofile(file_)
+    os.replace(temp, path)
+    return len(offsets) // 2
+
+
+class Index(object):
+    """The offsets of an index sidecar."""
+
+    def __init__(self, header, offsets):
+        """Initialize the index.
+
+        Args:
+            header (dict): size, mtime_ns, root & count.
+            offsets (memoryview): start & end offsets of the records.
+        """
+        self.root = tuple(header['root'])
+        self.count = header['count']
+        self.offsets = offsets
+
+    def __len__(self):
+        return self.count
+
+    def span(self, n):
+        """Return the (start, end) offsets of record n."""
+        return self.offsets[2 * n], self.offsets[2 * n + 1]
+
+
+def read_header(buf):
+    """Return the header of an index & the offset of its payload.
+
+    Returns:
+        tuple: (dict, int); None if the index is malformed, e.g. it was
+            truncated.
+    """
+    if buf[:len(MAGIC)] != MAGIC:
+        return None
+    end = buf.find(b'\n', len(MAGIC)) + 1
+    try:
+        header = json.loads(buf[len(MAGIC):end].decode())
+    except ValueError:
+        return None
+    if not isinstance(header, dict) or \
+            not isinstance(header.get('root'), list) or \
+            type(header.get('count')) is not int:
+        return None
+    size = len(buf) - end
+    itemsize = array(TYPECODE).itemsize
+    if end == 0 or size % itemsize or \
+            size // itemsize != 2 * header['count']:
+        return None
+    return header, end
+
+
+@contextmanager
+def open_index(filename):
+    """Map the index of a file into memory.
+
+    Yields:
+        Index: None if there's no index, it's out of date or malformed.
+    """
+    try:
+        file_ = open(index_path(filename), 'rb')
+    except FileNotFoundError:
+        yield None
+        return
+    with file_:
+        if not os.fstat(file_.fileno()).st_size:
+            yield None  # can't be mapped
+            return
+        with mmap.mmap(file_.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            found = read_header(buf)
+            header, end = found or ({}, 0)
+            current = {k: header.get(k) for k in ('size', 'mtime_ns')}
+            if found is None or current != file_version(filename):
+                yield None
+                return
+            offsets = memoryview(buf)[end:].cast(TYPECODE)
+            try:
+                yield Index(header, offsets)
+            finally:
+                offsets.release()
+
+
+def load_records(filename, positions, index=None):
+    """Decode the records at the given positions of the index.
+
+    Args:
+        filename (str): the indexed file.
+        positions (range): record numbers.
+        index (Index): the file's open index; opened if None.
+
+    Returns:
+        list: the records.
+    """
+    if index is None:
+        with open_index(filename) as index:
+            return load_records(filename, positions, index)
+    with open_buffer(filename) as buf:
+        return [json.loads(buf[slice(*index.span(n))]) for n in positions]
@@ -50,63 +50,164 @@ Examples:
     #.object.k2 :number(val=2)
     #.str       :text(minlen=1, maxlen=4)
 """
-from collections import deque, namedtuple
 from collections.abc import Mapping
+from operator import itemgetter
 
+from .scanner import child_path
 from .sequencer import is_sequence_and_not_str
-from .treecrawler import Node
+from .sketches import PRECISION, TOPK_CAPACITY, PathSketch
 
 import click
 
-MinMax = {i: namedtuple(i, ['min', 'max'])
-          for i in ('Count', 'Keys', 'Len', 'Val')}
-
-
-def set_min_max(type_, key, val, types):
-    """Set Min & Max values for type."""
-    mm = MinMax[key]
-    if type_ not in types:
-        types[type_] = mm(val, val)
-    else:
-        types[type_] = mm(min(types[type_][0], val), max(types[type_][1], val))
-    return types
-
-
-def get_json_type(obj, types):
-    """Determine the JSON value type."""
-    if obj is None:
-        types['null'] = True
-    elif obj is True:
-        types['true'] = True
-    elif obj is False:
-        types['false'] = True
-    elif isinstance(obj, Mapping):
-        return set_min_max('Object', 'Keys', len(obj.keys()), types)
-    elif is_sequence_and_not_str(obj):
-        return set_min_max('Array', 'Count', len(obj), types)
-    elif isinstance(obj, str):
-        return set_min_max('Text', 'Len', len(obj), types)
-    elif isinstance(obj, (float, int)):
-        return set_min_max('Number', 'Val', obj, types)
-    return types
-
-
-def fmt_type(type_):
-    """Format the JSON type."""
-    key, value = type_
-    if key in ('true', 'false', 'null'):
-        return key
+MEASURES = {'object': 'keys', 'array': 'count', 'text': 'len', 'number': 'val'}
+JSON_TYPES = {dict: 'object', list: 'array', str: 'text', int: 'number',
+              float: 'number', type(None): 'null'}
+
+
+def get_json_type(obj):
+    """Determine the JSON value type.
+
+    Examples:
+        >>> [get_json_type(i) for i in ({}, (), 'a', 1, 1.1, None, True)]
+        ['object', 'array', 'text', 'number', 'number', 'null', 'true']
+    """
+    type_ = JSON_TYPES.get(obj.__class__)
+    if type_ is not None:
+        return type_
+    if obj is True or obj is False:
+        return 'true' if obj else 'false'
+    if isinstance(obj, Mapping):
+        return 'object'
+    if is_sequence_and_not_str(obj):
+        return 'array'
+    if isinstance(obj, str):
+        return 'text'
+    if isinstance(obj, (float, int)):
+        return 'number'
+    return None
+
+
+class PathStats(object):
+    """Accumulate the JSON types found at a unique key path.
+
+    The stats for the child key paths are kept in a trie; each unique
+    key path is formatted & allocated once, no matter how many values
+    are found at that path.
+
+    Attributes:
+        path (str): the key path.
+        types (dict): JSON types in the order found; the values are the
+            [min, max] measures (see MEASURES) or None.
+        members (dict): child stats by object member name.
+        items (PathStats): child stats for the array elements.
+        sketch (PathSketch): optional value statistics.
+    """
+
+    __slots__ = ('path', 'types', 'members', 'items', 'sketch')
+
+    def __init__(self, path, sketch=None):
+        """Initialize the stats for a key path."""
+        self.path = path
+        self.types = {}
+        self.members = {}
+        self.items = None
+        self.sketch = sketch
 
-    key, name = key.lower(), value.__class__.__name__.lower()
-    if value.min == value.max:
-        return '{0}({1}={2})'.format(key, name, value.min)
-    return '{0}(min{1}={2[0]}, max{1}={2[1]})'.format(key, name, value)
+    def child(self, path):
+        """Create the stats for a child key path."""
+        sketch = None if self.sketch is None else self.sketch.spawn()
+        return PathStats(path, sketch)
+
+    def add(self, type_, measure=None):
+        """Update the type & min/max measure in place."""
+        minmax = self.types.get(type_)
+        if minmax is None:
+            if type_ not in self.types:
+                self.types[type_] = None if measure is None else [measure] * 2
+        elif measure < minmax[0]:
+            minmax[0] = measure
+        elif measure > minmax[1]:
+            minmax[1] = measure
+
+    def member(self, key):
+        """Return the stats for an object member; create if needed."""
+        child = self.members.get(key)
+        if child is None:
+            child = self.members[key] = self.child(
+                '{}.{}'.format(self.path, key))
+        return child
+
+    def item(self, array_char='#'):
+        """Return the stats for the array elements; create if needed."""
+        if self.items is None:
+            self.items = self.child('{}.{}'.format(self.path, array_char))
+        return self.items
+
+    def add_value(self, obj, array_char='#'):
+        """Crawl through a value, updating the stats for every key path.
+
+        Returns:
+            PathStats: self
+        """
+        stack = [(self, iter((obj,)), False)]
+        while stack:
+            node, values, is_mapping = stack[-1]
+            for obj in values:
+                if is_mapping:
+                    key, obj = obj
+                    stats = node.member(key)
+                else:
+                    stats = node
+                type_ = get_json_type(obj)
+                if stats.sketch is not None:
+                    stats.sketch.add(type_, obj)
+                if type_ == 'object':
+                    stats.add(type_, len(obj))
+                    if obj:
+                        stack.append((stats, iter(obj.items()), True))
+                        break
+                elif type_ == 'array':
+                    stats.add(type_, len(obj))
+                    if obj:
+                        stack.append((stats.item(array_char), iter(obj),
+                                      False))
+                        break
+                elif type_ == 'text':
+                    stats.add(type_, len(obj))
+                elif type_ == 'number':
+                    stats.add(type_, obj)
+                elif type_ is not None:
+                    stats.add(type_)
+            else:
+                stack.pop()
+        return self
+
+    def walk(self):
+        """Generate the stats for all descendant key paths."""
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            stack.extend(node.members.values())
+            if node.items is not None:
+                stack.append(node.items)
+            if node is not self:
+                yield node
+
+
+def fmt_type(type_, minmax=None):
+    """Format the JSON type."""
+    if minmax is None:
+        return type_
+    name = MEASURES[type_]
+    if minmax[0] == minmax[1]:
+        return '{0}({1}={2})'.format(type_, name, minmax[0])
+    return '{0}(min{1}={2[0]}, max{1}={2[1]})'.format(type_, name, minmax)
 
 
 def format_result(keys, nocolor=False, keys_fg='white', types_fg='cyan'):
     """Format & colorize the inspection results."""
     d = dict(keys)
-    fmt_types = [[fmt_type(j) for j in i.items()] for i in d.values()]
+    fmt_types = [[fmt_type(*j) for j in i.items()] for i in d.values()]
     fmt_types = [' | '.join(i) if len(i) > 1 else i[0] for i in fmt_types]
     padding = len(max(d.keys(), key=len))
     fmt_keys = [i.ljust(padding) for i in d.keys()]
@@ -117,39 +218,31 @@ def format_result(keys, nocolor=False, keys_fg='white', types_fg='cyan'):
         yield key + ' :' + val
 
 
-def get_children(parent, visited, types, array_char='#'):
-    """Return a list of child nodes."""
-    path, obj = parent
-    if isinstance(obj, Mapping):
-        children = obj.items()
-    elif is_sequence_and_not_str(obj):
-        children = [(array_char, i) for i in obj]
-    else:
-        return []
-    return [Node('{}.{}'.format(path, k), v) for k, v in children]
-
-
-def key_crawler(d, nodes=None, array_char='#'):
-    """Crawl through keys & indexes."""
-    visited, types = set(), dict()
-    to_crawl = deque([Node('', d)] if nodes is None else nodes)
-    while to_crawl:
-        node = to_crawl.popleft()
-        visited.add(node.path)
-        types[node.path] = get_json_type(node.obj, types.get(node.path, {}))
-        to_crawl.extend(get_children(node, visited, types, array_char))
-    return {i: types[i] for i in visited if i}
+def crawl(d, array_char='#', sketch=None):
+    """Crawl through keys & indexes; return the root PathStats.
+
+    The root-level array itself is not inspected; only its elements.
+    If a PathSketch is given, value statistics are gathered for every
+    key path using the same memory budget.
+    """
+    root = PathStats('', sketch)
+    if is_sequence_and_not_str(d):
+        item = root.item(array_char)
+        for i in d:
+            item.add_value(i, array_char)
+        return root
+    return root.add_value(d, array_char)
+
+
+def path_types(root):
+    """Return a sorted list of keys & types from the root PathStats."""
+    return sorted(((i.path.lstrip('.'), i.types) for i in root.walk()),
+                  key=itemgetter(0))
 
 
 def tree_walker(d, array_char='#'):
-    """Return a sorted list of keys from a JSON document."""
-    seq = is_sequence_and_not_str(d)
-    nodes = None if not seq else get_children(('', d), set(), {}, array_char)
-    return sorted(
-        (k.lstrip('.'), v)
-        for k, v in
-        key_crawler(d, nodes, array_char).items()
-    )
+    """Return a sorted list of keys & types from a JSON document."""
+    return path_types(crawl(d, array_char))
 
 
 def inspect_json(d, nocolor=False, array_char='#'):
@@ -157,6 +250,50 @@ def inspect_json(d, nocolor=False, array_char='#'):
     return format_result(tree_walker(d, array_char), nocolor)
 
 
+def inspect_stats(d, array_char='#', precision=PRECISION,
+                  capacity=TOPK_CAPACITY):
+    """Inspect JSON; report types & value statistics for every key path.
+
+    Statistics are gathered with bounded-memory sketches (see the
+    sketches module); distinct counts are estimates and the counts of
+    the most frequent values may be overestimated.
+
+    Args:
+        d (Mapping or Sequence): JSON encodable data (document)
+        array_char (str): wildcard used for array indexes.
+        precision (int): HyperLogLog precision; 2 ** precision bytes.
+        capacity (int): number of counters kept for the top values.
+
+    Returns:
+        dict: statistics by key path.
+
+    Example:
+        >>> d = [{'k': 'a'}, {'k': None}, {}]
+        >>> inspect_stats(d)['#.k']  # doctest: +NORMALIZE_WHITESPACE
+        {'types': 'text(len=1) | null', 'count': 2, 'null_rate': 0.5,
+         'missing_rate': 0.3333, 'distinct': 1, 'top': [['a', 1]],
+         'lengths': [('[1, 2)', 1)]}
+    """
+    return stats_report(crawl(d, array_char, PathSketch(precision, capacity)))
+
+
+def stats_report(root):
+    """Return the statistics by key path of the root PathStats."""
+    result = {}
+    stack = [(root, None)]
+    while stack:
+        node, expected = stack.pop()
+        objects = node.sketch.objects
+        stack.extend((i, objects) for i in node.members.values())
+        if node.items is not None:
+            stack.append((node.items, None))
+        if node is not root:
+            types = ' | '.join(fmt_type(*i) for i in node.types.items())
+            result[node.path.lstrip('.')] = dict(
+                types=types, **node.sketch.report(expected))
+    return dict(sorted(result.items(), key=itemgetter(0)))
+
+
 def format_counts(d, nocolor=False, keys_fg='cyan', vals_fg='white'):
     """Format & colorize the inspection results."""
     padding = len(max(d.keys(), key=len))
@@ -169,10 +306,43 @@ def format_counts(d, nocolor=False, keys_fg='cyan', vals_fg='white'):
         yield key + ' : ' + str(val)
 
 
-def count_arrays(d, nocolor=False):
-    is_array = is_sequence_and_not_str
-    if is_array(d):
-        return '*: %d' % len(d)
-    if isinstance(d, Mapping):
-        counts = {k: len(v) for k, v in d.items() if is_array(v)}
-        return format_counts(counts, nocolor) if counts else ''
+def array_counts(d, depth=1, array_char='#'):
+    """Count the elements of every array nested up to depth.
+
+    Same as scanner.array_counts, but for decoded JSON data.
+
+    The elements of a root array are at level 1, like the members of a
+    root object.
+
+    Example:
+        >>> array_counts({'a': [[1, 2], [3]], 'b': {'c': []}}, depth=2)
+        {'a': 2, 'a.#': 3, 'b.c': 0}
+        >>> array_counts([[1, 2], [3], {'d': []}])
+        {'': 3, '#': 3}
+    """
+    counts = {}
+
+    def walk(obj, path, level):
+        if is_sequence_and_not_str(obj):
+            counts[path] = counts.get(path, 0) + len(obj)
+            if level < depth:
+                items = child_path(path, array_char)
+                for i in obj:
+                    walk(i, items, level + 1)
+        elif isinstance(obj, Mapping) and level < depth:
+            for key, val in obj.items():
+                walk(val, child_path(path, key), level + 1)
+
+    walk(d, '', 0)
+    return counts
+
+
+def format_array_counts(counts, nocolor=False):
+    """Format the array counts; the root-level array is shown as '*'."""
+    counts = {k or '*': v for k, v in counts.items()}
+    return format_counts(counts, nocolor) if counts else ''
+
+
+def count_arrays(d, nocolor=False, depth=1):
+    """Count the elements of arrays nested up to depth."""
+    return format_array_counts(array_counts(d, depth), nocolor)
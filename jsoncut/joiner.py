@@ -0,0 +1,85 @@
+"""Enrich records with fields from a lookup file; a hash join.
+
+join:
+    FILE:KEYPATH=KEYPATH; the first key path is found in the input
+    records, the second in the records of the lookup file (a root array
+    or JSON lines). E.g. lists.json:list_id=id
+
+The lookup file is read once into a hash index of its (selected) fields;
+the input records are then streamed & probed one at a time, so only the
+lookup side is held in memory. Records without a match are output
+unchanged (a left join), and the fields of a matched lookup record don't
+replace the fields the output record already has.
+
+Examples:
+    >>> index = {'["a"]': {'title': 'List A'}}
+    >>> record, result = {'list_id': 'a', 'n': 1}, {'n': 1}
+    >>> list(join_records([(record, result)], index, ('list_id',)))
+    [({'list_id': 'a', 'n': 1}, {'n': 1, 'title': 'List A'})]
+"""
+from . import core
+from . import exceptions as exc
+from .dedupe import record_key
+from .streamer import RecordReader
+from .tokenizer import parse_key_name
+
+
+def parse_join(spec):
+    """Parse a FILE:KEYPATH=KEYPATH join.
+
+    Returns:
+        tuple: (filename, input keylist, lookup keylist)
+
+    Raises:
+        InvalidJoin
+    """
+    filename, _, keys = spec.rpartition(':')
+    left, _, right = keys.partition('=')
+    if not (filename and left and right):
+        raise exc.InvalidJoin(spec)
+    return filename, parse_key_name(left), parse_key_name(right)
+
+
+def build_index(file_, keylist, getkeys=None, quotechar='"'):
+    """Index the records of the lookup file by the key path.
+
+    Args:
+        file_ (TextIO): root array or JSON lines.
+        keylist (tuple): key path of the lookup records' join key.
+        getkeys (str): fields to select from the lookup records; all of
+            the fields if None.
+        quotechar (str): the quote character used around getkeys.
+
+    Returns:
+        dict: selected fields by key (see dedupe.record_key); the first
+        record of a repeated key is kept.
+    """
+    index = {}
+    for record in RecordReader(file_):
+        key = record_key(record, [keylist])
+        if key is None or key in index:
+            continue
+        if getkeys:
+            record = core.cut(record, getkeys=getkeys, any=True,
+                              quotechar=quotechar)
+        index[key] = record
+    return index
+
+
+def join_records(pairs, index, keylist):
+    """Merge the fields of the matching lookup record into each result.
+
+    Args:
+        pairs (iter): (input record, output record) pairs.
+        index (dict): see build_index.
+        keylist (tuple): key path of the input records' join key.
+
+    Yields:
+        tuple: the (input record, output record) pairs.
+    """
+    for record, result in pairs:
+        fields = index.get(record_key(record, [keylist]))
+        if fields and isinstance(result, dict) and isinstance(fields, dict):
+            for key, value in fields.items():
+                result.setdefault(key, value)
+        yield record, result
@@ -0,0 +1,208 @@
+"""Resource limits of a run; stop before exhausting the machine.
+
+limits:
+    max_bytes: size of the input (bytes; characters of STDIN).
+    max_depth: nesting depth of the arrays & objects; files are scanned
+        before they're decoded.
+    max_records: number of records; the elements of the root array or
+        the values of a JSON lines file.
+    max_seconds: wall time since the start of the run.
+    max_memory: soft ceiling of the resident set size (bytes).
+
+The input limits are checked as the input is read; the time & memory
+limits every CHECK_EVERY records read or cut. A limit that's exceeded
+raises LimitExceeded; while cutting records, it holds the records cut
+so far (see exceptions.LimitExceeded.partial).
+
+Like memstats, the limits are those of the current run; the checks do
+nothing if no limits were started.
+
+Examples:
+    >>> _ = start(max_records=2)
+    >>> for _ in range(3):
+    ...     record()
+    Traceback (most recent call last):
+    ...
+    jsoncut.exceptions.LimitExceeded: --max-records exceeded: 3 > 2
+    >>> stop()
+"""
+import os
+import time
+from collections.abc import Mapping
+
+from . import exceptions as exc
+from .memstats import peak_rss
+from .scanner import max_depth, open_buffer
+from .sequencer import is_sequence_and_not_str
+
+CHECK_EVERY = 1000
+STATM = '/proc/self/statm'
+
+# the limits of the current run; see start
+active = None
+
+
+def resident_memory():
+    """Return the resident set size of the process in bytes.
+
+    Where it can't be read (i.e. not Linux), the peak is used.
+    """
+    try:
+        with open(STATM) as file_:
+            return int(file_.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return peak_rss()
+
+
+def document_depth(obj, limit=None):
+    """Return the deepest nesting level of decoded JSON data.
+
+    Args:
+        obj (obj): JSON encodable data.
+        limit (int): stop as soon as the depth is over limit.
+    """
+    deepest, stack = 0, [(obj, 1)]
+    while stack:
+        obj, depth = stack.pop()
+        if isinstance(obj, Mapping):
+            values = obj.values()
+        elif is_sequence_and_not_str(obj):
+            values = obj
+        else:
+            continue
+        deepest = max(deepest, depth)
+        if limit is not None and deepest > limit:
+            break
+        stack.extend((i, depth + 1) for i in values)
+    return deepest
+
+
+class Limits(object):
+    """The limits of a run & the records counted so far."""
+
+    __slots__ = ('max_bytes', 'max_depth', 'max_records', 'max_seconds',
+                 'max_memory', 'started', 'records', 'ticks', 'exceeded')
+
+    def __init__(self, max_bytes=None, max_depth=None, max_records=None,
+                 max_seconds=None, max_memory=None):
+        """Initialize the limits; None for no limit. See the module."""
+        self.max_bytes = max_bytes
+        self.max_depth = max_depth
+        self.max_records = max_records
+        self.max_seconds = max_seconds
+        self.max_memory = max_memory
+        self.started = time.monotonic()
+        self.records = self.ticks = 0
+        self.exceeded = None
+
+    def check(self, limit, value):
+        """Raise LimitExceeded if the value is over the limit."""
+        maximum = getattr(self, limit)
+        if maximum is not None and value > maximum:
+            self.exceeded = exc.LimitExceeded(limit, value, maximum)
+            raise self.exceeded
+
+    def tick(self):
+        """Check the time & memory every CHECK_EVERY calls."""
+        self.ticks += 1
+        if not self.ticks % CHECK_EVERY:
+            self.check_usage()
+
+    def check_usage(self):
+        """Raise LimitExceeded if the time or memory is over its limit."""
+        if self.max_seconds is not None:
+            seconds = round(time.monotonic() - self.started, 3)
+            self.check('max_seconds', seconds)
+        if self.max_memory is not None:
+            self.check('max_memory', resident_memory())
+
+
+def start(**limits):
+    """Start checking the limits of the run; see Limits."""
+    global active
+    active = Limits(**limits)
+    return active
+
+
+def stop():
+    """Stop checking the limits."""
+    global active
+    active = None
+
+
+def exceeded():
+    """Return the LimitExceeded raised by the run; None if there's none."""
+    return None if active is None else active.exceeded
+
+
+def check_file(filename):
+    """Check the size & nesting depth of an input file (not STDIN).
+
+    The depth is found by scanning the raw bytes; the file isn't decoded.
+    """
+    if active is None or filename == '-':
+        return
+    active.check('max_bytes', os.path.getsize(filename))
+    if active.max_depth is not None:
+        with open_buffer(filename) as buf:
+            active.check('max_depth', max_depth(buf, active.max_depth))
+
+
+def check_data(data):
+    """Check the nesting depth of decoded data (i.e. from STDIN)."""
+    if active is not None and active.max_depth is not None:
+        active.check('max_depth', document_depth(data, active.max_depth))
+
+
+def check_records(data):
+    """Check the records of a decoded document (the elements of a root
+    array) & the time & memory; i.e. for the summaries that don't cut the
+    records one by one.
+    """
+    if active is None:
+        return
+    if is_sequence_and_not_str(data):
+        active.check('max_records', len(data))
+    active.check_usage()
+
+
+def record():
+    """Count a record read; check the records, time & memory."""
+    if active is not None:
+        active.records += 1
+        active.check('max_records', active.records)
+        active.tick()
+
+
+def tick(n=0):
+    """Check record number n being cut; and the time & memory (see
+    Limits.tick).
+    """
+    if active is not None:
+        active.check('max_records', n)
+        active.tick()
+
+
+class BoundedReader(object):
+    """Read a text stream; raise LimitExceeded past max_bytes characters.
+    """
+
+    def __init__(self, file_, limit):
+        self.file = file_
+        self.limit = limit
+        self.size = 0
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = self.limit + 1 - self.size
+        text = self.file.read(size)
+        self.size += len(text)
+        active.check('max_bytes', self.size)
+        return text
+
+
+def bounded(file_):
+    """Return the input stream; bounded if there's a max_bytes limit."""
+    if active is None or active.max_bytes is None:
+        return file_
+    return BoundedReader(file_, active.max_bytes)
@@ -0,0 +1,132 @@
+"""Measure where the memory goes; --mem-stats.
+
+phases:
+    load (decode the input), items (wrap & copy the records), crawl
+    (the key catalog), cut (get, defaults & del), serialize (format the
+    JSON text) & highlight. A phase run once per record (e.g. while
+    streaming) is reported once; with the number of calls, the total
+    time & the largest peak.
+
+report:
+    peak_rss: the peak resident set size of the process (bytes).
+    traced_peak: the peak of the memory allocated by Python (bytes).
+    phases: calls, seconds, allocated (bytes still held at the end of
+        the phase) & peak (bytes above the start of the phase).
+    objects: live dicts, lists & strings at the end of the load phase
+        and of the run.
+
+Tracing allocations slows a run down and uses extra memory itself; the
+phases are only measured while recording.
+
+Examples:
+    >>> stats = start()
+    >>> with phase('load'):
+    ...     data = [{'k': str(i)} for i in range(1000)]
+    >>> report = stop()
+    >>> report['phases']['load']['peak'] > 1000 * 100
+    True
+"""
+import gc
+import sys
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+COUNTED_TYPES = (dict, list, str)
+
+# the statistics being recorded; see start
+recording = None
+
+
+def peak_rss():
+    """Return the peak resident set size of the process in bytes."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def object_counts():
+    """Count the live dicts, lists & strings.
+
+    Strings aren't tracked by the garbage collector; those referred to
+    by the tracked objects are counted.
+    """
+    gc.collect()
+    objects = gc.get_objects()
+    counts = Counter(type(i).__name__ for i in objects
+                     if type(i) in (dict, list))
+    strings = {id(i) for i in gc.get_referents(*objects) if type(i) is str}
+    del objects
+    return {'dict': counts['dict'], 'list': counts['list'],
+            'str': len(strings)}
+
+
+class MemoryStats(object):
+    """Memory used by each phase of a run."""
+
+    def __init__(self):
+        """Initialize the statistics; see start."""
+        self.phases = {}
+        self.traced_peak = 0
+
+    @contextmanager
+    def phase(self, name, objects=False):
+        """Measure a phase; count the live objects at its end if objects."""
+        current, peak = tracemalloc.get_traced_memory()
+        self.traced_peak = max(self.traced_peak, peak)
+        tracemalloc.reset_peak()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - started
+            after, peak = tracemalloc.get_traced_memory()
+            self.traced_peak = max(self.traced_peak, peak)
+            stats = self.phases.setdefault(name, {
+                'calls': 0, 'seconds': 0.0, 'allocated': 0, 'peak': 0})
+            stats['calls'] += 1
+            stats['seconds'] += seconds
+            stats['allocated'] += after - current
+            stats['peak'] = max(stats['peak'], peak - current)
+            if objects:
+                stats['objects'] = object_counts()
+
+    def report(self):
+        """Return the statistics; JSON encodable."""
+        self.traced_peak = max(self.traced_peak,
+                               tracemalloc.get_traced_memory()[1])
+        for stats in self.phases.values():
+            stats['seconds'] = round(stats['seconds'], 6)
+        return {'peak_rss': peak_rss(), 'traced_peak': self.traced_peak,
+                'phases': self.phases, 'objects': object_counts()}
+
+
+def start():
+    """Start tracing allocations & recording the phases."""
+    global recording
+    tracemalloc.start()
+    recording = MemoryStats()
+    return recording
+
+
+def stop():
+    """Stop recording; return the report (see MemoryStats.report)."""
+    global recording
+    report = recording.report()
+    tracemalloc.stop()
+    recording = None
+    return report
+
+
+def phase(name, objects=False):
+    """Measure a phase while recording; otherwise do nothing."""
+    if recording is None:
+        return nullcontext()
+    return recording.phase(name, objects)
@@ -0,0 +1,272 @@
+"""Cut many JSON files, or the parts of a large one, concurrently.
+
+The same options are applied to every file; the files are processed by
+a pool of worker processes and the results are returned in input order,
+or as they complete. A file that fails doesn't stop the others; its
+error is returned in place of the result.
+
+chunks:
+    The records of a single large file (a root array, the array of a
+    root key path, or JSON lines) are split into parts of about equal
+    size at the commas between elements (or at line breaks), found by
+    scanning a memory map of the file or read from its index sidecar.
+    Each worker maps the file, decodes & cuts its part; the results are
+    returned in order.
+
+Examples:
+    >>> expand_paths(['tests/sample_data/quakes.json'])
+    (['tests/sample_data/quakes.json'], False)
+    >>> expand_paths(['no/such/*.json'])
+    (['no/such/*.json'], True)
+"""
+import glob
+import json
+import os
+import re
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import partial
+
+from . import core
+from . import exceptions as exc
+from . import indexer
+from . import streamer
+from .passthrough import find_spans
+from .scanner import LBRACKET, Scanner, open_buffer
+from .sorter import key_fields
+
+GLOB_MAGIC_RE = re.compile(r'[*?[]')
+
+CHUNKS_PER_JOB = 4
+MIN_CHUNK = 1 << 20
+
+Result = namedtuple('Result', ['filename', 'value', 'error'])
+
+
+def expand_paths(patterns):
+    """Expand glob patterns into filenames.
+
+    Like the shell, a pattern without matches is kept as is; the file
+    is then reported as missing along with any other per-file errors.
+
+    Args:
+        patterns (iter): filenames and/or glob patterns; '**' matches
+            any number of directories.
+
+    Returns:
+        tuple: (filenames, multiple); multiple is True when more than
+        one file is given or a pattern was used.
+    """
+    filenames, multiple = [], len(patterns) > 1
+    for pattern in patterns:
+        if GLOB_MAGIC_RE.search(pattern):
+            multiple = True
+            filenames.extend(sorted(glob.glob(pattern, recursive=True))
+                             or [pattern])
+        else:
+            filenames.append(pattern)
+    return filenames, multiple
+
+
+def load_file(filename, skip=0, head=None):
+    """Load a JSON file; stream only the record range if one is given."""
+    with open(filename) as file_:
+        if skip or head is not None:
+            return streamer.read_records(file_, skip, head)
+        return json.load(file_)
+
+
+def pair_records(root, value, keylists):
+    """Pair the cut records with the key fields of their input records.
+
+    Returns:
+        List[tuple]: (key fields, output record) pairs; see
+        sorter.key_fields. The key fields are empty if the results
+        aren't the records of the root array.
+    """
+    if not isinstance(value, list):
+        return [(key_fields(root, keylists), value)]
+    if isinstance(root, list) and len(root) == len(value):
+        return [(key_fields(i, keylists), j) for i, j in zip(root, value)]
+    return [({}, i) for i in value]
+
+
+def cut_file(filename, options, skip=0, head=None, is_json=True,
+             keylists=None):
+    """Load and cut a single file; runs in a worker process.
+
+    Args:
+        filename (str): JSON file.
+        options (dict): core.cut keyword arguments.
+        skip (int): records to skip while loading.
+        head (int): records to read while loading.
+        is_json (bool): False for results made up of text lines, which
+            are collected into a list so they can be pickled.
+        keylists (List[tuple]): key paths the records are later looked
+            up by; if given, the value is a list of record pairs (see
+            pair_records), so only those fields of the input records
+            are returned.
+
+    Returns:
+        Result: the cut data, or an error message.
+    """
+    try:
+        data = load_file(filename, skip, head)
+        if keylists:
+            root = core.select_root(
+                data, options.get('rootkey'), options.get('quotechar', '"'),
+                options.get('fullscan', False), options.get('skip', 0),
+                options.get('head'))
+            value = core.cut(root, **dict(options, rootkey=None, skip=0,
+                                          head=None))
+            # a --slice root is cut as a whole, not record by record
+            value = pair_records(None if options.get('slice_') else root,
+                                 value, keylists)
+        else:
+            value = core.cut(data, **options)
+        if not is_json:
+            value = list(value or [])
+    except (EnvironmentError, ValueError, exc.JsonCutError) as e:
+        # KeyError subclasses quote their message; use it unquoted
+        mesg = e.args[0] if isinstance(e, exc.JsonCutError) else e
+        return Result(filename, None, '{}: {}'.format(type(e).__name__, mesg))
+    return Result(filename, value, None)
+
+
+def cut_files(filenames, options, skip=0, head=None, is_json=True,
+              jobs=None, ordered=True, keylists=None):
+    """Cut files concurrently.
+
+    Args:
+        filenames (list): JSON files.
+        options (dict): core.cut keyword arguments.
+        skip (int): records to skip while loading each file.
+        head (int): records to read while loading each file.
+        is_json (bool): see cut_file().
+        jobs (int): number of worker processes; None for one per CPU,
+            1 to work in this process.
+        ordered (bool): yield results in input order; otherwise as
+            they complete.
+        keylists (List[tuple]): see cut_file().
+
+    Yields:
+        Result: one per file.
+    """
+    task = partial(cut_file, options=options, skip=skip, head=head,
+                   is_json=is_json, keylists=keylists)
+    if jobs == 1 or len(filenames) < 2:
+        yield from map(task, filenames)
+        return
+    with ProcessPoolExecutor(jobs) as pool:
+        if ordered:
+            yield from pool.map(task, filenames)
+        else:
+            futures = [pool.submit(task, i) for i in filenames]
+            for future in as_completed(futures):
+                yield future.result()
+
+
+def index_chunks(index, count):
+    """Split the records of an index into count parts.
+
+    Returns:
+        List[tuple]: the (start, end) byte spans of the parts.
+    """
+    size = -(-len(index) // count)
+    return [(index.span(i)[0], index.span(min(i + size, len(index)) - 1)[1])
+            for i in range(0, len(index), size)]
+
+
+def is_json_lines(scanner, start):
+    """Return True if the values from start are JSON lines; i.e. the first
+    value is on a single line and another value follows it.
+    """
+    end = scanner.value_end(start)
+    if scanner.buf.find(b'\n', start, end) >= 0:
+        return False
+    return scanner.skip_ws(end) < scanner.size
+
+
+def split_chunks(filename, root=(), jobs=None):
+    """Split the records of a file into chunks for the workers.
+
+    Args:
+        filename (str): JSON file; a root array or JSON lines.
+        root (tuple): key path of names and/or indexes of the array.
+        jobs (int): number of worker processes; None for one per CPU.
+
+    Returns:
+        Tuple(list, bool): the (start, end) byte spans of the chunks and
+            whether they're JSON lines; None if the records aren't an
+            array or JSON lines (e.g. the document is an object.)
+    """
+    count = (jobs or os.cpu_count() or 1) * CHUNKS_PER_JOB
+    with open_buffer(filename) as buf, indexer.open_index(filename) as index:
+        scanner = Scanner(buf)
+        start = scanner.skip_ws(0)
+        if start >= len(buf):
+            return [], False
+        lines = not root and buf[start] != LBRACKET
+        if lines and not is_json_lines(scanner, start):
+            return None
+        if index and index.root == tuple(root):
+            return index_chunks(index, count), lines
+        end = len(buf)
+        if root:
+            spans = find_spans(scanner, start, root)
+            if not spans or buf[spans[-1][0]] != LBRACKET:
+                return None
+            start, end = spans[-1]
+        size = max(MIN_CHUNK, (end - start) // count)
+        if not lines:
+            return scanner.split_array(start, size), False
+        chunks = []
+        while start < len(buf):
+            end = buf.find(b'\n', start + size)
+            end = len(buf) if end < 0 else end
+            chunks.append((start, end))
+            start = end + 1
+        return chunks, True
+
+
+def cut_chunk(span, filename, options, lines=False):
+    """Decode & cut the records of a chunk; runs in a worker process.
+
+    Returns:
+        Result: the list of the cut records, or an error message.
+    """
+    try:
+        with open_buffer(filename) as buf:
+            chunk = buf[slice(*span)]
+        if lines:
+            records = [json.loads(i) for i in chunk.splitlines() if i.strip()]
+        else:
+            records = json.loads(b'[' + chunk + b']')
+        value = core.cut(records, **options)
+    except ValueError as e:
+        return Result(filename, None, exc.default_error_mesg_fmt(e))
+    except exc.JsonCutError as e:
+        return Result(filename, None, e.format_error())
+    return Result(filename, value, None)
+
+
+def cut_chunks(filename, chunks, options, lines=False, jobs=None):
+    """Cut the chunks of a file concurrently.
+
+    Args:
+        filename (str): JSON file.
+        chunks (list): see split_chunks.
+        options (dict): core.cut keyword arguments; key numbers can't be
+            used, since each chunk has its own keys.
+        lines (bool): the chunks are JSON lines.
+        jobs (int): see cut_files.
+
+    Yields:
+        Result: one per chunk, in order.
+    """
+    task = partial(cut_chunk, filename=filename, options=options, lines=lines)
+    if jobs == 1 or len(chunks) < 2:
+        yield from map(task, chunks)
+        return
+    with ProcessPoolExecutor(jobs) as pool:
+        yield from pool.map(task, chunks)
@@ -0,0 +1,184 @@
+"""Copy selected values straight from the input bytes.
+
+The records (the elements of a root array or the values of a JSON
+lines stream) are located with the scanner, and the selected values are
+found by walking the member names & indexes of their key paths; the
+bytes of a value are copied to the output without being decoded or
+re-encoded. Only the line breaks & indentation are removed (so each
+output record is a single line).
+
+The value of --root is found the same way, and only it is decoded.
+
+Values are copied verbatim; e.g. non-ASCII characters, numbers and the
+spaces between items keep their original representation.
+
+Examples:
+    >>> buf = b'[{"a": {"b": [1, 2]}, "c": "x"}, {"a": {"b": null}}]'
+    >>> list(raw_get(buf, [('a', 'b')]))
+    [b'{"b":[1, 2]}', b'{"b":null}']
+    >>> one_line(b'{\\n  "k": [\\n    1, " a b "\\n  ]\\n}')
+    b'{"k": [1, " a b "]}'
+"""
+import json
+import re
+from itertools import islice, takewhile
+
+from . import exceptions as exc
+from .scanner import LBRACE, LBRACKET, Scanner
+from .tokenizer import SLICE_RE
+
+NEWLINE_RE = re.compile(rb'[ \t]*[\n\r][ \t\n\r]*')
+
+
+def one_line(raw):
+    """Remove the line breaks & indentation of a value.
+
+    A JSON string can't contain a raw line break, so they (and the
+    whitespace around them) are always outside of the strings.
+    """
+    if b'\n' not in raw and b'\r' not in raw:
+        return raw
+    return NEWLINE_RE.sub(b'', raw)
+
+
+def iter_records(scanner, root=None):
+    """Generate the (start, end) spans of the records.
+
+    Args:
+        scanner (Scanner): scanner of the raw JSON text.
+        root (tuple): key path of the records' array; the records of the
+            root array or JSON lines if None.
+
+    Raises:
+        ScanError: the root isn't found.
+    """
+    buf = scanner.buf
+    pos = scanner.skip_ws(0)
+    if root:
+        spans = find_spans(scanner, pos, root) if pos < len(buf) else None
+        if spans is None:
+            raise exc.ScanError('Root key not found', pos)
+        pos, end = spans[-1]
+        if buf[pos] != LBRACKET:
+            yield pos, end
+            return
+    if pos < len(buf) and buf[pos] == LBRACKET:
+        yield from scanner.iter_elements(pos)
+        return
+    while pos < len(buf):
+        end = scanner.value_end(pos)
+        yield pos, end
+        pos = scanner.skip_ws(end)
+
+
+def find_spans(scanner, start, keylist):
+    """Return the spans of the values along the key path.
+
+    Like json.loads, the last of repeated member names is used.
+
+    Returns:
+        List[tuple]: the (start, end) span of each key's value; None if
+            a key isn't found by name or index.
+    """
+    spans = []
+    for key in keylist:
+        char = scanner.buf[start]
+        if char == LBRACE:
+            span = None
+            for name, i, j in scanner.iter_members(start):
+                if name == key:
+                    span = i, j
+        elif char == LBRACKET and key.isdigit():
+            index = int(key)
+            span = next(islice(scanner.iter_elements(start), index, None),
+                        None)
+        else:
+            return None
+        if span is None:
+            return None
+        spans.append(span)
+        start = span[0]
+    return spans
+
+
+def find_span(scanner, start, end, keylist):
+    """Return the span of the value at the key path; None if not found."""
+    spans = find_spans(scanner, start, keylist)
+    if not spans:
+        return (start, end) if spans == [] else None
+    return spans[-1]
+
+
+def root_skeleton(buf, keylist):
+    """Decode only the value at the key path of a document.
+
+    The siblings of the keys along the path are skipped without being
+    decoded; the value is returned inside a skeleton of the document
+    holding only the path, which the key path selects as usual.
+
+    Args:
+        buf (bytes or mmap): the raw JSON text.
+        keylist (tuple): key path of names and/or indexes; scanning stops
+            at the first slice or negative index.
+
+    Returns:
+        obj: the skeleton document; None if the path isn't found.
+
+    Example:
+        >>> root_skeleton(b'{"a": [0, {"b": {}}], "c": [1, 2]}',
+        ...               ('a', '1', 'b'))
+        {'a': [None, {'b': {}}]}
+    """
+    scanner = Scanner(buf)
+    start = scanner.skip_ws(0)
+    keylist = list(takewhile(lambda i: not SLICE_RE.match(i) or i.isdigit(),
+                             keylist))
+    if start >= len(buf) or not keylist:
+        return None
+    spans = find_spans(scanner, start, keylist)
+    if spans is None:
+        return None
+    i, j = spans[-1]
+    value = json.loads(buf[i:j])
+    starts = [start] + [i for i, _ in spans[:-1]]
+    for key, pos in reversed(list(zip(keylist, starts))):
+        if buf[pos] == LBRACE:
+            value = {key: value}
+        else:
+            value = [None] * int(key) + [value]
+    return value
+
+
+def raw_get(buf, keylists, fullpath=False, skip=0, head=None,
+            fallback=None, root=None):
+    """Generate the compact output records of --get.
+
+    Args:
+        buf (bytes or mmap): the raw JSON text.
+        keylists (List[tuple]): key paths of names and/or indexes.
+        fullpath (bool): name the output values by their full key path.
+        skip (int): number of leading records to discard.
+        head (int): maximum number of records (None for all).
+        fallback (callable): given the bytes of a record whose values
+            can't all be found, return the output record (bytes);
+            i.e. decode & cut it, raising the usual errors. By default
+            the record is skipped.
+        root (tuple): see iter_records.
+
+    Yields:
+        bytes: output records.
+    """
+    scanner = Scanner(buf)
+    names = [json.dumps('.'.join(i) if fullpath else i[-1]).encode()
+             for i in keylists]
+    stop = None if head is None else skip + head
+    for start, end in islice(iter_records(scanner, root), skip, stop):
+        spans = [find_span(scanner, start, end, i) for i in keylists]
+        if None in spans:
+            if fallback is not None:
+                yield fallback(buf[start:end])
+            continue
+        # like a dict; a repeated name keeps its position & the last value
+        members = dict(zip(names, spans))
+        yield b'{' + b','.join(name + b':' + one_line(buf[i:j])
+                               for name, (i, j) in members.items()) + b'}'
@@ -0,0 +1,572 @@
+"""Scan raw JSON bytes without building Python objects.
+
+The scanner works on any bytes-like buffer (bytes, bytearray or mmap)
+and only tracks the string/escape state and the nesting depth, so the
+values that aren't needed are skipped over without being decoded.
+
+offsets:
+    All positions are byte offsets into the buffer; a value's span is
+    the (start, end) pair where buf[start:end] is its JSON text.
+
+window:
+    Arrays & objects are skipped using a window of the buffer in which
+    the contents of the strings have been masked (using bulk bytes
+    operations) and the positions of the brackets indexed; skipping a
+    value only visits its brackets.  Memory use is bounded by the
+    window size, no matter how large the input is.
+
+Examples:
+    >>> buf = b'{"a": [1, [2, 3], {"b": []}], "c": "]\\\\"}"}'
+    >>> Scanner(buf).value_end(0) == len(buf)
+    True
+
+    >>> array_counts(buf, depth=3)
+    {'a': 3, 'a.#': 2, 'a.#.b': 0}
+"""
+import json
+import mmap
+import re
+import sys
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from . import exceptions as exc
+
+WINDOW = 1 << 20
+WALK_WINDOW = 1 << 16
+
+WHITESPACE_RE = re.compile(rb'[ \t\n\r]*')
+SCALAR_RE = re.compile(rb'[^ \t\n\r,:\]}]+')
+MEMBER_RE = re.compile(rb'[ \t\n\r]*"((?:[^"\\]|\\.)*)"[ \t\n\r]*:[ \t\n\r]*',
+                       re.DOTALL)
+BRACKET_RE = re.compile(rb'[][{}]')
+NESTED_RE = re.compile(rb'\[[^][{}]*\]|\{[^][{}]*\}')
+OPENER_RE, CLOSER_RE = re.compile(rb'[\[{]'), re.compile(rb'[\]}]')
+BLANK_BRACKETS = bytes.maketrans(b'[]{}', b'    ')
+BLANK_STRUCTURE = bytes.maketrans(b'[]{},', b'     ')
+STRUCTURE_RE = re.compile(rb'[][{},]')
+NOT_STRUCTURAL = bytes(i for i in range(256) if i not in b'[]{}",')
+NOT_MARK = bytes(i for i in range(256) if i not in b'[]{}:"')
+
+QUOTE, BACKSLASH = ord('"'), ord('\\')
+OPEN = {ord('['), ord('{')}
+LBRACKET, RBRACKET = ord('['), ord(']')
+LBRACE, RBRACE = ord('{'), ord('}')
+COMMA, COLON = ord(','), ord(':')
+
+
+@contextmanager
+def open_buffer(filename):
+    """Map a file into memory; STDIN ('-') is read into bytes.
+
+    Yields:
+        bytes or mmap: the raw JSON text.
+    """
+    if filename == '-':
+        yield sys.stdin.buffer.read()
+        return
+    with open(filename, 'rb') as file_:
+        try:
+            buf = mmap.mmap(file_.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            yield b''
+            return
+        try:
+            yield buf
+        finally:
+            buf.close()
+
+
+def blank_escapes(block):
+    """Replace escaped backslashes & quotes (keeps the same length)."""
+    if b'\\' in block:
+        block = block.replace(b'\\\\', b'__').replace(b'\\"', b'__')
+    return block
+
+
+def mask_strings(block, in_string=False, table=BLANK_BRACKETS):
+    """Blank out the brackets found inside strings.
+
+    Args:
+        block (bytes): a part of the JSON text; mustn't end inside an
+            escape sequence.
+        in_string (bool): the block starts inside a string.
+        table (bytes): translation of the chars inside strings; e.g.
+            BLANK_STRUCTURE also blanks the commas.
+
+    Returns:
+        Tuple(bytes, bool): the masked block (same length) and whether
+            the block ends inside a string.
+
+    Example:
+        >>> mask_strings(b'["a]", "\\\\"{"]')
+        (b'["a ", "__ "]', False)
+    """
+    parts = blank_escapes(block).split(b'"')
+    inside = slice(0 if in_string else 1, None, 2)
+    strings = parts[inside]
+    if strings:
+        strings = b'"'.join(strings).translate(table)
+        parts[inside] = strings.split(b'"')
+    return b'"'.join(parts), in_string ^ (len(parts) % 2 == 0)
+
+
+def outside_structure(block, in_string=False):
+    """Return the brackets & commas found outside of the strings.
+
+    Args:
+        block (bytes): see mask_strings.
+        in_string (bool): the block starts inside a string.
+
+    Returns:
+        Tuple(bytes, bool): the structural chars and whether the block
+            ends inside a string.
+
+    Example:
+        >>> outside_structure(b'[{"a": "],"}, [1, 2]]')
+        (b'[{},[,]]', False)
+    """
+    parts = blank_escapes(block).translate(None, NOT_STRUCTURAL).split(b'"')
+    outside = b''.join(parts[1 if in_string else 0::2])
+    return outside, in_string ^ (len(parts) % 2 == 0)
+
+
+def last_string_end(block):
+    """Return the end of the last complete string of a block; 0 if none.
+
+    Args:
+        block (bytes): starts outside of the strings; its escapes blanked.
+    """
+    end = block.rfind(b'"')
+    if block.count(b'"') % 2:
+        end = block.rfind(b'"', 0, end)  # the last quote opens a string
+    return end + 1
+
+
+def string_windows(buf, start=0, end=None, window=WINDOW):
+    """Split raw JSON text into its strings & the marks between them.
+
+    The text is split on the quotes with bulk bytes operations, a window
+    at a time; each window ends right after a string. The marks are the
+    brackets & colons outside of the strings; a string followed by a
+    colon is a member name.
+
+    Args:
+        buf (bytes-like): raw JSON text.
+        start (int): position of a value; not inside a string.
+        end (int): end of the text; the end of buf by default.
+        window (int): bytes split at a time; more for a longer string.
+
+    Yields:
+        Tuple(List[bytes], List[bytes]): the raw contents of the window's
+            strings, and the marks before its first string followed by
+            the marks after each string (one more than the strings.)
+
+    Example:
+        >>> list(string_windows(b'{"a": [1, "b"], "c\\\\"": {}}'))
+        [([b'a', b'b', b'c\\\\"'], [b'{', b':[', b']', b':{}}'])]
+    """
+    end = len(buf) if end is None else end
+    size = window
+    while start < end:
+        stop = min(start + size, end)
+        block = buf[start:stop]
+        blanked = blank_escapes(block)
+        if stop < end:
+            cut = last_string_end(blanked)
+            if not cut:
+                size *= 2
+                continue
+            block, blanked = block[:cut], blanked[:cut]
+        parts = blanked.split(b'"')
+        if blanked != block:
+            # the escaped quotes were blanked; cut the original strings
+            pos, original = 0, []
+            for part in parts:
+                original.append(block[pos:pos + len(part)])
+                pos += len(part) + 1
+            parts = original
+        marks = b'"'.join(parts[0::2]).translate(None, NOT_MARK)
+        yield parts[1::2], marks.split(b'"')
+        start += len(block)
+        size = window
+
+
+def reduce_nested(structure):
+    """Remove the balanced arrays & objects from the structural chars.
+
+    Example:
+        >>> reduce_nested(b',[,{,}],{},[{')
+        b',,,[{'
+    """
+    while True:
+        reduced = NESTED_RE.sub(b'', structure)
+        if len(reduced) == len(structure):
+            return reduced
+        structure = reduced
+
+
+def child_path(path, key):
+    """Append an (escaped) key name to a key path."""
+    key = key.replace('.', '\\.')
+    return '{}.{}'.format(path, key) if path else key
+
+
+class Scanner(object):
+    """Locate JSON values in a buffer of raw JSON text."""
+
+    def __init__(self, buf, window=WINDOW):
+        """Initialize the scanner.
+
+        Args:
+            buf (bytes-like): raw JSON text.
+            window (int): number of bytes masked & indexed at a time.
+        """
+        self.buf = buf
+        self.size = len(buf)
+        self.window = window
+        self.start = self.end = 0
+        self.block = b''
+        self.brackets = []
+        self.in_string = False
+
+    def window_end(self, start, size=None):
+        """Return the end of the window starting at start.
+
+        Args:
+            start (int): position of the window.
+            size (int): bytes of the window; the scanner's by default,
+                a little more to keep escape sequences together.
+        """
+        size = min(size or self.window, self.window)
+        buf, end = self.buf, min(start + size, self.size)
+        if end < self.size and buf[end - 1] == BACKSLASH:
+            # keep escape sequences together; extend past the backslashes
+            while end < self.size and buf[end] == BACKSLASH:
+                end += 1
+            end = min(end + 1, self.size)
+        return end
+
+    def load(self, start, in_string=False):
+        """Mask & index the brackets of the window starting at start."""
+        end = self.window_end(start)
+        block = self.buf[start:end]
+        self.block, self.in_string = mask_strings(block, in_string)
+        self.brackets = [i.start() for i in BRACKET_RE.finditer(self.block)]
+        self.start, self.end = start, end
+
+    def skip_ws(self, pos):
+        """Return the position of the next non-whitespace byte."""
+        return WHITESPACE_RE.match(self.buf, pos).end()
+
+    def char(self, pos):
+        """Return the byte at pos; raise ScanError at end of input."""
+        if pos >= self.size:
+            raise exc.ScanError('Unexpected end of input', pos)
+        return self.buf[pos]
+
+    def expect(self, pos, *chars):
+        """Skip whitespace; return (char, position after it)."""
+        pos = self.skip_ws(pos)
+        char = self.char(pos)
+        if char not in chars:
+            expected = ' or '.join(repr(chr(i)) for i in chars)
+            raise exc.ScanError('Expecting {}'.format(expected), pos)
+        return char, pos + 1
+
+    def string_end(self, pos):
+        """Return the end of the string starting at pos (a quote char)."""
+        buf, end = self.buf, pos
+        while True:
+            end = buf.find(b'"', end + 1)
+            if end < 0:
+                raise exc.ScanError('Unterminated string', pos)
+            escape = end - 1
+            while buf[escape] == BACKSLASH:
+                escape -= 1
+            if (end - escape) % 2:
+                return end + 1
+
+    def container_end(self, pos):
+        """Return the end of the array or object starting at pos."""
+        if not self.start <= pos < self.end:
+            self.load(pos)
+        block, brackets, depth = self.block, self.brackets, 0
+        for index in range(bisect_left(brackets, pos - self.start),
+                           len(brackets)):
+            i = brackets[index]
+            depth += 1 if block[i] in OPEN else -1
+            if not depth:
+                return self.start + i + 1
+        return self.skip_depth(self.end, self.in_string, depth, pos)
+
+    def skip_depth(self, start, in_string, depth, pos):
+        """Return the end of the bracket closing depth levels.
+
+        Like array_length, whole windows are skipped by reducing their
+        brackets; only the window of the closing bracket is walked.
+        """
+        while start < self.size:
+            end = self.window_end(start)
+            outside, ends_in_string = outside_structure(
+                self.buf[start:end], in_string)
+            reduced = reduce_nested(outside.replace(b',', b''))
+            closers = len(reduced) - len(CLOSER_RE.sub(b'', reduced))
+            if closers >= depth:
+                return self.closer_end(start, in_string, depth)
+            depth += len(reduced) - 2 * closers
+            start, in_string = end, ends_in_string
+        raise exc.ScanError('Unterminated array or object', pos)
+
+    def array_length(self, pos):
+        """Count the elements of an array without visiting each element.
+
+        Each window is reduced to the brackets & commas outside of the
+        strings, the balanced nested arrays & objects are removed, and
+        the remaining commas belong to the array.
+
+        Args:
+            pos (int): position of the opening bracket.
+
+        Returns:
+            Tuple(int, int): the element count and the end of the array.
+        """
+        start = self.skip_ws(pos + 1)
+        if self.char(start) == RBRACKET:
+            return 0, start + 1
+        commas, pending, in_string = 0, b'', False
+        while start < self.size:
+            end = self.window_end(start)
+            outside, ends_in_string = outside_structure(
+                self.buf[start:end], in_string)
+            reduced = reduce_nested(pending + outside)
+            closer = CLOSER_RE.search(reduced)
+            opener = OPENER_RE.search(reduced)
+            if closer and (not opener or closer.start() < opener.start()):
+                commas += reduced.count(b',', 0, closer.start())
+                depth = len(pending) + 1
+                return commas + 1, self.closer_end(start, in_string, depth)
+            cut = opener.start() if opener else len(reduced)
+            commas += reduced.count(b',', 0, cut)
+            pending = reduced[cut:].replace(b',', b'')
+            start, in_string = end, ends_in_string
+        raise exc.ScanError('Unterminated array or object', pos)
+
+    def split_array(self, pos, size):
+        """Split the elements of an array into parts of about size bytes.
+
+        The bytes up to the end of a part are skipped like in skip_depth;
+        from there the brackets are walked to the next comma between
+        elements.
+
+        Args:
+            pos (int): position of the opening bracket.
+            size (int): minimum number of bytes of a part.
+
+        Returns:
+            List[tuple]: the (start, end) spans of the parts; each part
+                is a comma-separated list of elements.
+
+        Example:
+            >>> Scanner(b'[[1, 2], "a,]", {}, 3]').split_array(0, 2)
+            [(1, 7), (8, 14), (15, 18), (19, 21)]
+        """
+        parts, part_start = [], pos + 1
+        start, in_string, depth = part_start, False, 1
+        while True:
+            target = part_start + size
+            while start < min(target, self.size):
+                end = self.window_end(start, target - start)
+                outside, ends_in_string = outside_structure(
+                    self.buf[start:end], in_string)
+                reduced = reduce_nested(outside.replace(b',', b''))
+                closers = len(reduced) - len(CLOSER_RE.sub(b'', reduced))
+                if closers >= depth:
+                    break  # the array ends before the target
+                depth += len(reduced) - 2 * closers
+                start, in_string = end, ends_in_string
+            end = self.next_comma(start, in_string, depth, target, pos)
+            parts.append((part_start, end))
+            if self.buf[end] != COMMA:
+                return parts
+            part_start = start = end + 1
+            in_string, depth = False, 1
+
+    def next_comma(self, start, in_string, depth, target, pos):
+        """Return the position of the first comma of depth 1 at or after
+        target (or of the bracket closing depth 1)."""
+        while start < self.size:
+            end = self.window_end(start, WALK_WINDOW)
+            masked, ends_in_string = mask_strings(
+                self.buf[start:end], in_string, BLANK_STRUCTURE)
+            for match in STRUCTURE_RE.finditer(masked):
+                char = masked[match.start()]
+                if char == COMMA:
+                    if depth == 1 and start + match.start() >= target:
+                        return start + match.start()
+                elif char in OPEN:
+                    depth += 1
+                else:
+                    depth -= 1
+                    if not depth:
+                        return start + match.start()
+            start, in_string = end, ends_in_string
+        raise exc.ScanError('Unterminated array or object', pos)
+
+    def closer_end(self, start, in_string, depth):
+        """Return the end of the bracket closing depth levels."""
+        self.load(start, in_string)
+        block = self.block
+        for i in self.brackets:
+            depth += 1 if block[i] in OPEN else -1
+            if not depth:
+                return start + i + 1
+        raise exc.ScanError('Unterminated array or object', start)
+
+    def value_end(self, pos):
+        """Return the end of the JSON value starting at pos."""
+        char = self.char(pos)
+        if char == QUOTE:
+            return self.string_end(pos)
+        if char in OPEN:
+            return self.container_end(pos)
+        match = SCALAR_RE.match(self.buf, pos)
+        if match is None:
+            raise exc.ScanError('Expecting value', pos)
+        return match.end()
+
+    def read_key(self, pos):
+        """Read an object member name; return (key, start of the value)."""
+        match = MEMBER_RE.match(self.buf, pos)
+        if match:
+            key = match.group(1)
+            if b'\\' in key:
+                return json.loads(b'"' + key + b'"'), match.end()
+            return key.decode(), match.end()
+        pos = self.skip_ws(pos)
+        if self.char(pos) != QUOTE:
+            raise exc.ScanError('Expecting property name', pos)
+        end = self.string_end(pos)
+        key = json.loads(self.buf[pos:end])
+        _, pos = self.expect(end, COLON)
+        return key, self.skip_ws(pos)
+
+    def iter_elements(self, pos):
+        """Generate the (start, end) spans of the elements of an array.
+
+        Args:
+            pos (int): position of the opening bracket.
+        """
+        pos = self.skip_ws(pos + 1)
+        if self.char(pos) == RBRACKET:
+            return
+        while True:
+            start = self.skip_ws(pos)
+            end = self.value_end(start)
+            yield start, end
+            char, pos = self.expect(end, COMMA, RBRACKET)
+            if char == RBRACKET:
+                return
+
+    def iter_members(self, pos):
+        """Generate (key, start, end) for the members of an object.
+
+        Args:
+            pos (int): position of the opening brace.
+        """
+        pos = self.skip_ws(pos + 1)
+        if self.char(pos) == RBRACE:
+            return
+        while True:
+            key, start = self.read_key(pos)
+            end = self.value_end(start)
+            yield key, start, end
+            char, pos = self.expect(end, COMMA, RBRACE)
+            if char == RBRACE:
+                return
+
+
+def max_depth(buf, limit=None):
+    """Return the deepest nesting level of the arrays & objects.
+
+    Args:
+        buf (bytes-like): raw JSON text.
+        limit (int): stop scanning as soon as the depth is over limit.
+
+    Example:
+        >>> max_depth(b'{"a": [1, {"b": "[[["}], "c": []}')
+        3
+    """
+    scanner = Scanner(buf)
+    depth = deepest = start = 0
+    in_string = False
+    while start < scanner.size:
+        end = scanner.window_end(start)
+        outside, in_string = outside_structure(buf[start:end], in_string)
+        for char in outside.replace(b',', b''):
+            if char not in OPEN:
+                depth -= 1
+                continue
+            depth += 1
+            if depth > deepest:
+                deepest = depth
+                if limit is not None and deepest > limit:
+                    return deepest
+        start = end
+    return deepest
+
+
+def array_counts(buf, depth=1, array_char='#'):
+    """Count the elements of every array nested up to depth.
+
+    Only the arrays & objects at levels lower than depth are walked;
+    everything else is skipped over without being decoded.
+
+    Args:
+        buf (bytes-like): raw JSON text.
+        depth (int): maximum nesting level of the counted arrays; the
+            root is level 0, top-level members are level 1.
+        array_char (str): wildcard used for array indexes.
+
+    Returns:
+        dict: total element counts by key path ('' is the root.)
+    """
+    scanner, counts = Scanner(buf), {}
+
+    def walk(pos, path, level):
+        """Walk the value at pos; return its end."""
+        char = scanner.char(pos)
+        if char == LBRACKET and level >= depth:
+            count, pos = scanner.array_length(pos)
+            counts[path] = counts.get(path, 0) + count
+            return pos
+        if char == LBRACKET:
+            counts.setdefault(path, 0)
+            count, pos = 0, scanner.skip_ws(pos + 1)
+            if scanner.char(pos) == RBRACKET:
+                pos += 1
+            else:
+                items = child_path(path, array_char)
+                while True:
+                    count += 1
+                    pos = walk(pos, items, level + 1)
+                    char, pos = scanner.expect(pos, COMMA, RBRACKET)
+                    if char == RBRACKET:
+                        break
+                    pos = scanner.skip_ws(pos)
+            counts[path] += count
+            return pos
+        if char == LBRACE and level < depth:
+            pos = scanner.skip_ws(pos + 1)
+            if scanner.char(pos) == RBRACE:
+                return pos + 1
+            while True:
+                key, pos = scanner.read_key(pos)
+                pos = walk(pos, child_path(path, key), level + 1)
+                char, pos = scanner.expect(pos, COMMA, RBRACE)
+                if char == RBRACE:
+                    return pos
+        return scanner.value_end(pos)
+
+    walk(scanner.skip_ws(0), '', 0)
+    return counts
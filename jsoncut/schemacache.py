@@ -0,0 +1,289 @@
+"""Keep the --list & --inspect summaries of growing JSON lines files.
+
+cache:
+    FILE.jcs holds the summary of the records of FILE (the key paths for
+    --list, the per key path types & sketches for --inspect) and the byte
+    offset following the last line it covers. The next run reads only
+    the lines appended after that offset and adds them to the summary, so
+    keeping the report current costs time proportional to the new data.
+
+    Only complete lines are summarized; a partially written last line is
+    read by a later run. The file is summarized again from the start if
+    it was replaced (a different inode), truncated, or its first bytes
+    changed, or if the summary was made with different options.
+
+    The cache is plain JSON (the sketch registers base64 encoded); an
+    unreadable or malformed cache is ignored & rewritten.
+
+Examples:
+    >>> import os, tempfile
+    >>> filename = os.path.join(tempfile.mkdtemp(), 'events.ndjson')
+    >>> with open(filename, 'w') as file_:
+    ...     _ = file_.write('{"a": 1}\\n{"b": {"c": 2}}\\n')
+    >>> update(filename, KeySummary(fullscan=True)).result()
+    ['a', 'b', 'b.c']
+    >>> with open(filename, 'a') as file_:
+    ...     _ = file_.write('{"d": []}\\n{"e"')
+    >>> summary = update(filename, KeySummary(fullscan=True))
+    >>> summary.result(), summary.records
+    (['a', 'b', 'b.c', 'd'], 3)
+"""
+import base64
+import json
+import os
+import sys
+
+from .inspector import PathStats
+from .treecrawler import KeyNode, crawl_keys, key_paths
+
+SUFFIX = '.jcs'
+VERSION = 3
+HEAD_SIZE = 1 << 12
+BATCH_SIZE = 10000
+
+
+def cache_path(filename):
+    """Return the path of the summary cache of a file."""
+    return filename + SUFFIX
+
+
+class KeySummary(object):
+    """The key paths of the records; see core.list_keys.
+
+    Without fullscan only the first record is crawled, so the summary
+    doesn't change once it has a record.
+    """
+
+    def __init__(self, fullscan=False):
+        self.fullscan = fullscan
+        self.root = KeyNode()
+        self.records = 0
+
+    def options(self):
+        """Return the options the summary depends on."""
+        return ['list', self.fullscan]
+
+    def add(self, records):
+        """Add a batch of records."""
+        if self.fullscan or not self.records:
+            crawl_keys(records, self.fullscan, self.root)
+        self.records += len(records)
+
+    def result(self):
+        """Return the sorted key paths."""
+        return sorted(key_paths(self.root))
+
+    def dump(self):
+        """Return the summary as JSON encodable data."""
+        return {'records': self.records, 'keys': dump_keys(self.root)}
+
+    def restore(self, state):
+        """Restore the summary from the data of dump."""
+        root = load_keys(state['keys'])
+        self.root, self.records = root, int(state['records'])
+
+
+class TypeSummary(object):
+    """The types (& value sketches) of every key path; see inspector."""
+
+    def __init__(self, sketch=None, array_char='#'):
+        """Initialize the summary.
+
+        Args:
+            sketch (PathSketch): gather value statistics (--stats) with
+                this memory budget.
+            array_char (str): wildcard used for array indexes.
+        """
+        self.root = PathStats('', sketch)
+        self.array_char = array_char
+        self.records = 0
+
+    def options(self):
+        """Return the options the summary depends on."""
+        sketch = self.root.sketch
+        budget = None if sketch is None else [sketch.precision,
+                                              sketch.capacity]
+        return ['inspect', budget, self.array_char]
+
+    def add(self, records):
+        """Add a batch of records; the elements of the root array."""
+        item = self.root.item(self.array_char)
+        for record in records:
+            item.add_value(record, self.array_char)
+        self.records += len(records)
+
+    def dump(self):
+        """Return the summary as JSON encodable data."""
+        return {'records': self.records, 'stats': dump_stats(self.root)}
+
+    def restore(self, state):
+        """Restore the summary from the data of dump."""
+        root = load_stats(state['stats'], self.root.sketch)
+        self.root, self.records = root, int(state['records'])
+
+
+def dump_keys(node):
+    """Return a trie of key paths as [name, {key: child}] lists."""
+    return [node.name, {k: dump_keys(v) for k, v in node.children.items()}]
+
+
+def load_keys(state):
+    """Rebuild a trie of key paths; see dump_keys."""
+    name, children = state
+    node = KeyNode(sys.intern(name))
+    node.children = {k: load_keys(v) for k, v in children.items()}
+    return node
+
+
+def dump_histogram(histogram):
+    """Return the [sign, exponent, count] of each bucket."""
+    return [[sign, exponent, count]
+            for (sign, exponent), count in histogram.counts.items()]
+
+
+def dump_sketch(sketch):
+    """Return a PathSketch as JSON encodable data."""
+    return {'count': sketch.count, 'nulls': sketch.nulls,
+            'objects': sketch.objects,
+            'distinct': base64.b64encode(sketch.distinct.registers).decode(),
+            'frequent': sketch.frequent.counters,
+            'numbers': dump_histogram(sketch.numbers),
+            'lengths': dump_histogram(sketch.lengths)}
+
+
+def load_sketch(state, template):
+    """Rebuild a PathSketch with the memory budget of the template; see
+    dump_sketch.
+    """
+    sketch = template.spawn()
+    sketch.count, sketch.nulls, sketch.objects = \
+        state['count'], state['nulls'], state['objects']
+    registers = base64.b64decode(state['distinct'], validate=True)
+    if len(registers) != len(sketch.distinct.registers):
+        raise ValueError('HyperLogLog registers of the wrong size')
+    sketch.distinct.registers[:] = registers
+    sketch.frequent.counters = dict(state['frequent'])
+    for histogram, buckets in ((sketch.numbers, state['numbers']),
+                               (sketch.lengths, state['lengths'])):
+        histogram.counts = {(sign, exponent): count
+                            for sign, exponent, count in buckets}
+    return sketch
+
+
+def dump_stats(stats):
+    """Return a trie of PathStats as JSON encodable data."""
+    return {'path': stats.path, 'types': stats.types,
+            'members': {k: dump_stats(v) for k, v in stats.members.items()},
+            'items': None if stats.items is None else dump_stats(stats.items),
+            'sketch': None if stats.sketch is None else
+            dump_sketch(stats.sketch)}
+
+
+def load_stats(state, sketch=None):
+    """Rebuild a trie of PathStats; see dump_stats.
+
+    Args:
+        state (dict): the data of dump_stats.
+        sketch (PathSketch): the sketch of the root of the summary; the
+            template of the sketches restored.
+    """
+    if (state['sketch'] is None) != (sketch is None):
+        raise ValueError('the sketches differ from the summary')
+    stats = PathStats(state['path'], None if sketch is None else
+                      load_sketch(state['sketch'], sketch))
+    stats.types = dict(state['types'])
+    stats.members = {k: load_stats(v, sketch)
+                     for k, v in state['members'].items()}
+    if state['items'] is not None:
+        stats.items = load_stats(state['items'], sketch)
+    return stats
+
+
+def load(path):
+    """Return the cached state; None if there's none or it's unreadable."""
+    try:
+        with open(path, 'rb') as file_:
+            state = json.load(file_)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(state, dict) or state.get('version') != VERSION:
+        return None
+    return state
+
+
+def save(path, state):
+    """Atomically replace the cached state."""
+    temp = '{}.{}.tmp'.format(path, os.getpid())
+    with open(temp, 'w') as file_:
+        json.dump(state, file_, separators=(',', ':'))
+    os.replace(temp, path)
+
+
+def restore(state, summary, stat, head):
+    """Restore the summary from the cached state if it can be continued.
+
+    Returns:
+        int: the offset following the lines summarized; None if the
+            state isn't current or is malformed (summary is left empty).
+    """
+    try:
+        offset = state['offset']
+        if (state['options'] != summary.options() or
+                state['inode'] != stat.st_ino or
+                type(offset) is not int or
+                not 0 <= offset <= stat.st_size or
+                not head.startswith(base64.b64decode(state['head']))):
+            return None
+        summary.restore(state['summary'])
+    except (KeyError, IndexError, TypeError, ValueError, AttributeError):
+        return None
+    return offset
+
+
+def read_batches(file_, size=BATCH_SIZE):
+    """Generate (records, end offset) batches of the complete lines."""
+    records, offset = [], file_.tell()
+    for line in file_:
+        if not line.endswith(b'\n'):
+            break
+        offset += len(line)
+        if line.strip():
+            records.append(json.loads(line))
+        if len(records) >= size:
+            yield records, offset
+            records = []
+    yield records, offset
+
+
+def update(filename, summary):
+    """Add the records appended since the last run to the cached summary.
+
+    Args:
+        filename (str): the JSON lines file.
+        summary (KeySummary or TypeSummary): an empty summary; used if
+            there's no usable cache.
+
+    Returns:
+        the up to date summary; it's saved in the cache.
+
+    Raises:
+        JSONDecodeError: a line isn't valid JSON; the cache isn't updated.
+    """
+    path = cache_path(filename)
+    state = load(path)
+    with open(filename, 'rb') as file_:
+        stat = os.fstat(file_.fileno())
+        head = file_.read(HEAD_SIZE)
+        start = None if state is None else \
+            restore(state, summary, stat, head)
+        if start is None:
+            state, start = None, 0
+        file_.seek(start)
+        for records, offset in read_batches(file_):
+            summary.add(records)
+    if state is None or offset != start:
+        save(path, {'version': VERSION, 'options': summary.options(),
+                    'inode': stat.st_ino, 'offset': offset,
+                    'head': base64.b64encode(head[:offset]).decode(),
+                    'summary': summary.dump()})
+    return summary
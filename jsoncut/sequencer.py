@@ -21,7 +21,6 @@ Examples:
     ['ITEM1', 'ITEM2']
 """
 from collections.abc import Sequence
-from copy import deepcopy
 
 
 def is_sequence_and_not_str(obj):
@@ -40,7 +39,7 @@ class Items(object):
 
     def __init__(self, obj):
         """Wrap a string or non-Sequence in a list."""
-        self.items = deepcopy(obj)
+        self.items = obj
         self.is_str_or_not_sequence = not is_sequence_and_not_str(obj)
         if self.is_str_or_not_sequence:
             self.items = [self.items]
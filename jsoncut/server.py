@@ -0,0 +1,172 @@
+"""Serve jsoncut requests from a warm process over a Unix socket.
+
+Requests are run one at a time in the server process, so the imports,
+the parsed key specs (see tokenizer) and the key catalogs of input files
+are reused between requests. See client for the protocol.
+
+key catalog:
+    The list of key paths that key numbers refer to; it's cached per
+    input file and root options until the file changes.
+"""
+import io
+import json
+import os
+import socket
+import socketserver
+import sys
+import traceback
+from collections import OrderedDict
+
+from . import cli
+from . import core
+from .client import EXIT, FRAME, STDERR, STDOUT, socket_path
+
+CATALOG_CACHE_SIZE = 64
+CATALOG_OPTIONS = ('rootkey', 'quotechar', 'fullscan', 'skip', 'head',
+                   'slice_')
+
+
+class KeyCatalogCache(object):
+    """Least recently used key catalogs of input files."""
+
+    def __init__(self, size=CATALOG_CACHE_SIZE):
+        """Initialize an empty cache holding up to size catalogs."""
+        self.size = size
+        self.catalogs = OrderedDict()
+
+    def get(self, filename, kwds, options, data):
+        """Return the key catalog of the (loaded) input file.
+
+        Args:
+            filename (str): input file; '-' for STDIN, which isn't cached.
+            kwds (dict): command-line options.
+            options (dict): core.cut keyword arguments.
+            data (obj): JSON document loaded from the file.
+
+        Returns:
+            List[str]: see core.key_catalog; None if not cached.
+        """
+        if filename in (None, '-'):
+            return None
+        try:
+            stat = os.stat(filename)
+        except OSError:
+            return None
+        key = (os.path.realpath(filename), stat.st_mtime_ns, stat.st_size)
+        key += tuple(kwds[i] for i in CATALOG_OPTIONS)
+        keys = self.catalogs.get(key)
+        if keys is None:
+            root = core.select_root(
+                data, options['rootkey'], options['quotechar'],
+                options['fullscan'], options['skip'], options['head'])
+            keys = core.key_catalog(root, options['fullscan'],
+                                    options['slice_'])
+            self.catalogs[key] = keys
+            if len(self.catalogs) > self.size:
+                self.catalogs.popitem(last=False)
+        else:
+            self.catalogs.move_to_end(key)
+        return keys
+
+
+class FrameWriter(io.RawIOBase):
+    """Send the bytes written as frames of a channel."""
+
+    def __init__(self, wfile, channel):
+        """Initialize the writer of a response channel."""
+        self.wfile = wfile
+        self.channel = channel
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        """Send a frame."""
+        self.wfile.write(FRAME.pack(self.channel, len(data)) + data)
+        self.wfile.flush()
+        return len(data)
+
+
+class TextStream(io.TextIOWrapper):
+    """Text stream reporting if the client's stream is a terminal."""
+
+    def __init__(self, buffer, tty=False):
+        """Wrap a binary stream."""
+        super(TextStream, self).__init__(buffer, encoding='utf-8',
+                                         write_through=True)
+        self.tty = tty
+
+    def isatty(self):
+        return self.tty
+
+
+def run(argv, cwd, stdin, stdout, stderr):
+    """Run jsoncut with the given arguments & standard streams.
+
+    Returns:
+        int: exit status.
+    """
+    saved = sys.argv, sys.stdin, sys.stdout, sys.stderr
+    saved_cwd = os.getcwd()
+    sys.argv = ['jsoncut'] + argv
+    sys.stdin, sys.stdout, sys.stderr = stdin, stdout, stderr
+    try:
+        os.chdir(cwd)
+        cli.main.main(args=argv, prog_name='jsoncut')
+        status = 0
+    except SystemExit as e:
+        status = e.code
+        if isinstance(status, str):
+            print(status, file=sys.stderr)
+            status = 1
+    except Exception:
+        traceback.print_exc()
+        status = 1
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        sys.argv, sys.stdin, sys.stdout, sys.stderr = saved
+        os.chdir(saved_cwd)
+    return status or 0
+
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    """Run a jsoncut request."""
+
+    def handle(self):
+        header = json.loads(self.rfile.readline().decode())
+        stdout = TextStream(io.BufferedWriter(
+            FrameWriter(self.wfile, STDOUT)), header['stdout_tty'])
+        stderr = TextStream(FrameWriter(self.wfile, STDERR))
+        stdin = TextStream(self.rfile, header['stdin_tty'])
+        status = run(header['argv'], header['cwd'], stdin, stdout, stderr)
+        self.wfile.write(FRAME.pack(EXIT, len(str(status))) +
+                         str(status).encode())
+
+
+def serve(path=None):
+    """Serve requests on a Unix socket until interrupted.
+
+    Args:
+        path (str): socket path; see client.socket_path.
+
+    Raises:
+        OSError: a server is already listening on the socket.
+    """
+    path = path or socket_path()
+    if os.path.exists(path):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            if sock.connect_ex(path) == 0:
+                raise OSError('jsoncut is already serving on ' + path)
+        os.remove(path)
+    cli.key_catalogs = KeyCatalogCache()
+    umask = os.umask(0o177)
+    try:
+        server = socketserver.UnixStreamServer(path, RequestHandler)
+    finally:
+        os.umask(umask)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        os.remove(path)
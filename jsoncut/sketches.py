@@ -0,0 +1,286 @@
+"""Bounded-memory value statistics.
+
+Every sketch uses a fixed amount of memory no matter how many values
+are added, so statistics can be gathered for every key path of very
+large documents.
+
+HyperLogLog:
+    Approximate distinct count; 2 ** precision one-byte registers, the
+    standard error is about 1.04 / sqrt(2 ** precision).
+
+TopK:
+    Space-Saving heavy hitters; a fixed number of counters, the counts
+    of frequent values are overestimated by at most N / capacity.
+
+Histogram:
+    Counts per power-of-two bucket; at most 259 buckets.
+
+BloomFilter:
+    Approximate set membership in a fixed number of bits; no false
+    negatives, the false positive rate grows with the number of items.
+
+Examples:
+    >>> hll = HyperLogLog()
+    >>> for i in range(1000):
+    ...     hll.add(i % 100)
+    >>> 95 < hll.estimate() < 105
+    True
+
+    >>> top = TopK(capacity=3)
+    >>> for i in 'aaaabbbccd':
+    ...     top.add(i)
+    >>> top.top(2)
+    [('a', 4), ('b', 3)]
+
+    >>> hist = Histogram()
+    >>> for i in (-3, 0, 0.75, 1, 2, 3.5, 4):
+    ...     hist.add(i)
+    >>> hist.buckets()  # doctest: +NORMALIZE_WHITESPACE
+    [('(-4, -2]', 1), ('0', 1), ('[0.5, 1)', 1), ('[1, 2)', 1),
+     ('[2, 4)', 2), ('[4, 8)', 1)]
+
+    >>> bloom = BloomFilter(size=1024, error_rate=0.01)
+    >>> bloom.add('a'), bloom.add('b'), bloom.add('a')
+    (False, False, True)
+"""
+import json
+import math
+from hashlib import blake2b
+
+PRECISION = 10
+TOPK_CAPACITY = 16
+TOPK_REPORTED = 5
+MAX_EXPONENT = 64
+BLOOM_ERROR_RATE = 0.001
+
+
+def canonical(obj):
+    """Return the canonical JSON text of a value.
+
+    The text keeps apart the values Python takes as equal or that print
+    alike, e.g. true, 1, 1.0 & "1".
+    """
+    return json.dumps(obj, sort_keys=True)
+
+
+def hash64(obj):
+    """Return a 64-bit hash of a JSON value; stable across processes."""
+    data = canonical(obj).encode()
+    return int.from_bytes(blake2b(data, digest_size=8).digest(), 'big')
+
+
+class HyperLogLog(object):
+    """Approximate distinct value counter."""
+
+    __slots__ = ('precision', 'registers')
+
+    def __init__(self, precision=PRECISION):
+        """Initialize 2 ** precision registers."""
+        self.precision = precision
+        self.registers = bytearray(1 << precision)
+
+    def add(self, obj):
+        """Add a (hashable) JSON scalar."""
+        h = hash64(obj)
+        bits = 64 - self.precision
+        rest = h & ((1 << bits) - 1)
+        rank = bits - rest.bit_length() + 1
+        index = h >> bits
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def estimate(self):
+        """Return the estimated number of distinct values."""
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -i for i in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+
+class TopK(object):
+    """Space-Saving most frequent values.
+
+    Attributes:
+        counters (dict): the counts by the canonical text of the values.
+    """
+
+    __slots__ = ('capacity', 'counters')
+
+    def __init__(self, capacity=TOPK_CAPACITY):
+        """Initialize with a fixed number of counters."""
+        self.capacity = capacity
+        self.counters = {}
+
+    def add(self, obj):
+        """Count a value; replace the least frequent when full."""
+        counters = self.counters
+        key = canonical(obj)
+        if key in counters:
+            counters[key] += 1
+        elif len(counters) < self.capacity:
+            counters[key] = 1
+        else:
+            victim = min(counters, key=counters.get)
+            counters[key] = counters.pop(victim) + 1
+
+    def top(self, n=TOPK_REPORTED):
+        """Return the n most frequent (value, count) pairs."""
+        items = sorted(self.counters.items(), key=lambda i: -i[1])
+        return [(json.loads(k), v) for k, v in items[:n]]
+
+
+class Histogram(object):
+    """Count numbers in power-of-two buckets."""
+
+    __slots__ = ('counts',)
+
+    def __init__(self):
+        """Initialize an empty histogram."""
+        self.counts = {}
+
+    def add(self, number):
+        """Count a number in its (sign, binary exponent) bucket."""
+        if number:
+            # ints may be beyond the range of floats (e.g. 10 ** 400)
+            exponent = abs(number).bit_length() \
+                if isinstance(number, int) else math.frexp(number)[1]
+            bucket = (1 if number > 0 else -1,
+                      max(-MAX_EXPONENT, min(MAX_EXPONENT, exponent)))
+        else:
+            bucket = (0, 0)
+        self.counts[bucket] = self.counts.get(bucket, 0) + 1
+
+    @staticmethod
+    def label(bucket):
+        """Return the range of values in the bucket."""
+        sign, exponent = bucket
+        low, high = 2.0 ** (exponent - 1), 2.0 ** exponent
+        if sign > 0:
+            return '[{:g}, {:g})'.format(low, high)
+        if sign < 0:
+            return '(-{:g}, -{:g}]'.format(high, low)
+        return '0'
+
+    def buckets(self):
+        """Return the (label, count) pairs in ascending order."""
+        order = sorted(self.counts, key=lambda i: (i[0], i[0] * i[1]))
+        return [(self.label(i), self.counts[i]) for i in order]
+
+
+class BloomFilter(object):
+    """Approximate set of strings in a fixed number of bits.
+
+    The number of hash functions is chosen for the target error rate;
+    the rate holds until about size * 8 * ln(2) ** 2 / -ln(error_rate)
+    items were added (e.g. ~580k items per megabyte at 0.1%).
+    """
+
+    __slots__ = ('bits', 'size', 'hashes', 'count')
+
+    def __init__(self, size, error_rate=BLOOM_ERROR_RATE):
+        """Initialize the filter.
+
+        Args:
+            size (int): number of bytes of bits.
+            error_rate (float): target false positive rate.
+        """
+        self.bits = bytearray(size)
+        self.size = size * 8
+        self.hashes = max(1, int(round(-math.log2(error_rate))))
+        self.count = 0
+
+    def positions(self, item):
+        """Return the bit positions of an item; double hashing."""
+        digest = blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'big')
+        h2 = int.from_bytes(digest[8:], 'big') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, item):
+        """Add an item; return True if it (probably) was already added."""
+        found = True
+        for i in self.positions(item):
+            byte, bit = divmod(i, 8)
+            if not self.bits[byte] & (1 << bit):
+                found = False
+                self.bits[byte] |= 1 << bit
+        self.count += not found
+        return found
+
+    def __contains__(self, item):
+        return all(self.bits[i >> 3] & (1 << (i & 7))
+                   for i in self.positions(item))
+
+
+class PathSketch(object):
+    """Value statistics for a single key path.
+
+    Attributes:
+        count (int): number of values found.
+        nulls (int): number of null values.
+        objects (int): number of object values; used to compute how
+            often the members of the objects are missing.
+    """
+
+    __slots__ = ('count', 'nulls', 'objects', 'distinct', 'frequent',
+                 'numbers', 'lengths', 'precision', 'capacity')
+
+    def __init__(self, precision=PRECISION, capacity=TOPK_CAPACITY):
+        """Initialize the sketches for a key path."""
+        self.count = self.nulls = self.objects = 0
+        self.precision, self.capacity = precision, capacity
+        self.distinct = HyperLogLog(precision)
+        self.frequent = TopK(capacity)
+        self.numbers = Histogram()
+        self.lengths = Histogram()
+
+    def spawn(self):
+        """Return an empty sketch with the same memory budget."""
+        return PathSketch(self.precision, self.capacity)
+
+    def add(self, type_, obj):
+        """Add a value of the given JSON type."""
+        self.count += 1
+        if type_ == 'null':
+            self.nulls += 1
+        elif type_ == 'object':
+            self.objects += 1
+        elif type_ == 'text':
+            self.distinct.add(obj)
+            self.frequent.add(obj)
+            self.lengths.add(len(obj))
+        elif type_ == 'number':
+            self.distinct.add(obj)
+            self.frequent.add(obj)
+            self.numbers.add(obj)
+        elif type_ in ('true', 'false'):
+            self.distinct.add(obj)
+
+    def report(self, expected=None):
+        """Summarize the statistics.
+
+        Args:
+            expected (int): number of times the key path could have been
+                found (i.e. the parent object count); None for array
+                elements and the root.
+
+        Returns:
+            dict: JSON encodable statistics.
+        """
+        null_rate = round(self.nulls / self.count, 4) if self.count else 0.0
+        result = {'count': self.count, 'null_rate': null_rate}
+        if expected:
+            missing = max(expected - self.count, 0)
+            result['missing_rate'] = round(missing / expected, 4)
+        result['distinct'] = self.distinct.estimate()
+        top = self.frequent.top()
+        if top:
+            result['top'] = [list(i) for i in top]
+        if self.numbers.counts:
+            result['numbers'] = self.numbers.buckets()
+        if self.lengths.counts:
+            result['lengths'] = self.lengths.buckets()
+        return result
@@ -0,0 +1,223 @@
+"""Sort records by key paths using a bounded amount of memory.
+
+Records are sorted in memory until they exceed the memory budget, then
+each sorted buffer is spilled to a temporary file (a run) and the runs
+are merged when the records are read back; i.e. an external merge sort.
+The sort is stable.
+
+sort key:
+    A tuple with a (rank, value) pair per key path; the ranks order
+    values of different JSON types: missing & null, booleans, numbers,
+    strings, then arrays & objects (compared by their JSON text).
+
+pairs:
+    The records may be given as (input record, output record) pairs; a
+    key path is then found in the output record, else in the input
+    record it was cut from, so the records can be sorted by fields that
+    weren't selected. Only the output records are kept & returned.
+
+Examples:
+    >>> records = [{'n': 2, 'k': 'b'}, {'n': 1}, {'n': 2, 'k': 'a'}]
+    >>> list(sort_records(records, [('n',), ('k',)]))
+    [{'n': 1}, {'n': 2, 'k': 'a'}, {'n': 2, 'k': 'b'}]
+    >>> list(sort_records(records, [('k',)], reverse=True))
+    [{'n': 2, 'k': 'b'}, {'n': 2, 'k': 'a'}, {'n': 1}]
+    >>> pairs = [({'k': 'b', 'n': 1}, {'n': 1}), ({'k': 'a'}, {'n': 2})]
+    >>> list(sort_records(pairs, [('k',)], pairs=True))
+    [{'n': 2}, {'n': 1}]
+"""
+import heapq
+import json
+import tempfile
+from collections.abc import Mapping, Sequence
+from operator import itemgetter
+
+MEMORY_BUDGET = 256 << 20
+MERGE_WIDTH = 64
+SAMPLE_EVERY = 100
+# approximate size of decoded records relative to their JSON text
+OBJECT_OVERHEAD = 4
+
+MISSING = object()
+
+
+def lookup(record, keylist):
+    """Return the value at the key path; MISSING if it's not found."""
+    for key in keylist:
+        try:
+            if isinstance(record, Mapping):
+                record = record[key]
+            elif isinstance(record, Sequence) and not isinstance(record, str):
+                record = record[int(key)]
+            else:
+                return MISSING
+        except (KeyError, IndexError, ValueError):
+            return MISSING
+    return record
+
+
+def lookup_pair(pair, keylist):
+    """Return the value at the key path of an (input, output) record pair;
+    found in the output record, else in the input record.
+    """
+    value = lookup(pair[1], keylist)
+    return lookup(pair[0], keylist) if value is MISSING else value
+
+
+def key_fields(record, keylists):
+    """Return the values of the key paths found in a record, nested as in
+    the record; i.e. the part of an input record that's looked up.
+
+    Example:
+        >>> key_fields({'a': {'b': 1, 'c': 2}, 'd': 3}, [('a', 'b'), ('x',)])
+        {'a': {'b': 1}}
+    """
+    fields = {}
+    # a shorter key path holds the values of the longer ones it prefixes
+    for keylist in sorted(keylists, key=len, reverse=True):
+        value = lookup(record, keylist)
+        if value is not MISSING:
+            node = fields
+            for key in keylist[:-1]:
+                node = node.setdefault(key, {})
+            node[keylist[-1]] = value
+    return fields
+
+
+def rank(value):
+    """Return a (rank, value) pair comparable across JSON types."""
+    if value is MISSING or value is None:
+        return (0, 0)
+    if isinstance(value, bool):
+        return (1, value)
+    if isinstance(value, (int, float)):
+        return (2, value)
+    if isinstance(value, str):
+        return (3, value)
+    return (4, json.dumps(value, sort_keys=True))
+
+
+def sort_key(record, keylists, find=lookup):
+    """Return the sort key of a record; see module docs.
+
+    Args:
+        find (function): lookup, or lookup_pair for a record pair.
+    """
+    return tuple(rank(find(record, i)) for i in keylists)
+
+
+def read_run(file_):
+    """Yield the (sort key, record) pairs of a spilled run."""
+    file_.seek(0)
+    for line in file_:
+        key, record = json.loads(line)
+        yield tuple(map(tuple, key)), record
+
+
+class ExternalSorter(object):
+    """Stable sort of records spilling sorted runs to disk.
+
+    Attributes:
+        runs (list): temporary files holding sorted runs.
+    """
+
+    def __init__(self, keylists, reverse=False, memory=MEMORY_BUDGET,
+                 tempdir=None):
+        """Initialize the sorter.
+
+        Args:
+            keylists (List[tuple]): key paths to sort by, in priority order.
+            reverse (bool): sort in descending order.
+            memory (int): approximate number of bytes of records to hold
+                in memory.
+            tempdir (str): directory for the runs; the system default if
+                None.
+        """
+        self.keylists = keylists
+        self.reverse = reverse
+        self.memory = memory
+        self.tempdir = tempdir
+        self.buffer = []
+        self.size = 0
+        self.record_size = 0
+        self.runs = []
+
+    def add(self, record, key=None):
+        """Add a record; spill the buffer if it's over budget.
+
+        Args:
+            record (obj): JSON record.
+            key (tuple): its sort key; found in the record if None.
+        """
+        if len(self.buffer) % SAMPLE_EVERY == 0:
+            self.record_size = len(json.dumps(record)) * OBJECT_OVERHEAD
+        if key is None:
+            key = sort_key(record, self.keylists)
+        self.buffer.append((key, record))
+        self.size += self.record_size
+        if self.size > self.memory:
+            self.runs.append(self.spill(self.sorted_buffer()))
+
+    def sorted_buffer(self):
+        """Sort & empty the buffer; return the sorted pairs."""
+        pairs = sorted(self.buffer, key=itemgetter(0), reverse=self.reverse)
+        self.buffer, self.size = [], 0
+        return pairs
+
+    def spill(self, pairs):
+        """Write sorted pairs to a new run."""
+        file_ = tempfile.TemporaryFile('w+', dir=self.tempdir)
+        for pair in pairs:
+            file_.write(json.dumps(pair))
+            file_.write('\n')
+        return file_
+
+    def merge(self, runs):
+        """Merge sorted iterables of pairs."""
+        return heapq.merge(*runs, key=itemgetter(0), reverse=self.reverse)
+
+    def __iter__(self):
+        """Yield the records in order."""
+        pairs = self.sorted_buffer()
+        if not self.runs:
+            yield from map(itemgetter(1), pairs)
+            return
+        try:
+            while len(self.runs) >= MERGE_WIDTH:
+                # limit the open files; merge the oldest runs into one
+                runs, self.runs = self.runs[:MERGE_WIDTH], \
+                    self.runs[MERGE_WIDTH:]
+                merged = self.spill(self.merge(map(read_run, runs)))
+                for file_ in runs:
+                    file_.close()
+                self.runs.insert(0, merged)
+            runs = [read_run(i) for i in self.runs] + [pairs]
+            yield from map(itemgetter(1), self.merge(runs))
+        finally:
+            for file_ in self.runs:
+                file_.close()
+            self.runs = []
+
+
+def sort_records(records, keylists, reverse=False, memory=MEMORY_BUDGET,
+                 tempdir=None, pairs=False):
+    """Sort records by key paths; see ExternalSorter.
+
+    Args:
+        records (iter): JSON records; or record pairs, see module docs.
+        keylists (List[tuple]): key paths to sort by.
+        reverse (bool): sort in descending order.
+        memory (int): approximate memory budget in bytes.
+        tempdir (str): directory for spilled runs.
+        pairs (bool): the records are (input, output) record pairs.
+
+    Yields:
+        obj: the (output) records in order.
+    """
+    sorter = ExternalSorter(keylists, reverse, memory, tempdir)
+    for record in records:
+        if pairs:
+            sorter.add(record[1], sort_key(record, keylists, lookup_pair))
+        else:
+            sorter.add(record)
+    yield from sorter
@@ -0,0 +1,249 @@
+"""Run many queries over one parse of the input; --spec.
+
+spec:
+    A JSON object of named queries. Each query is an object with an
+    "output" file & any of "root", "get", "getdefault" & "del" (as on
+    the command-line; get & del are a key string or a list of them,
+    getdefault a list of [key string, default value] pairs), plus the
+    "lines" & "compact" output formats. E.g.
+
+        {"ids": {"root": "features", "get": "id", "output": "ids.json"},
+         "quakes": {"root": "features", "del": "geometry",
+                    "output": "quakes.json.gz", "lines": true}}
+
+The input is parsed once. The queries sharing a root are planned up
+front (see core.Projection) and evaluated in the same pass over the
+root's records; each result is written to its query's output as soon
+as it's cut. Without roots (or key numbers) the records of a root array
+or JSON lines file are streamed, so the input is never held in memory;
+any other document is decoded whole. Each output is written to a
+temporary file, renamed to the output only when all the queries succeed.
+
+Examples:
+    >>> queries = parse_spec({'a': {'get': 'k', 'output': '-'}})
+    >>> queries[0].name, queries[0].getkeys, queries[0].rootkey
+    ('a', 'k', None)
+"""
+import json
+import os
+
+from . import compressor
+from . import core
+from . import exceptions as exc
+from . import limits
+from .highlighter import format_json, format_json_array
+from .sequencer import is_sequence_and_not_str
+from .streamer import open_records
+
+FIELDS = ('root', 'get', 'getdefault', 'del', 'output', 'lines', 'compact')
+
+
+class Query(object):
+    """A named query of a spec."""
+
+    __slots__ = ('name', 'rootkey', 'getkeys', 'getdefaults', 'delkeys',
+                 'output', 'lines', 'compact')
+
+    def __init__(self, name, output, rootkey=None, getkeys=None,
+                 getdefaults=(), delkeys=None, lines=False, compact=False):
+        """Initialize the query; see core.cut for the keys."""
+        self.name = name
+        self.output = output
+        self.rootkey = rootkey
+        self.getkeys = getkeys
+        self.getdefaults = getdefaults
+        self.delkeys = delkeys
+        self.lines = lines
+        self.compact = compact
+
+    def keystrs(self):
+        """Return the key strings of the get, getdefault & del keys."""
+        return [self.getkeys, self.delkeys] + \
+            [i for i, _ in self.getdefaults]
+
+
+def keystr(value):
+    """Join a list of key strings."""
+    return ','.join(value) if isinstance(value, list) else value
+
+
+def parse_spec(spec, path='spec'):
+    """Parse the decoded spec into a list of Queries.
+
+    Raises:
+        InvalidSpec
+    """
+    if not isinstance(spec, dict) or not spec:
+        raise exc.InvalidSpec(path, 'expected an object of named queries')
+    queries = []
+    for name, query in spec.items():
+        if not isinstance(query, dict):
+            raise exc.InvalidSpec(path, '{}: expected an object'.format(name))
+        unknown = set(query) - set(FIELDS)
+        if unknown:
+            raise exc.InvalidSpec(path, '{}: unknown {}'.format(
+                name, ', '.join(sorted(unknown))))
+        if not query.get('output'):
+            raise exc.InvalidSpec(path, '{}: missing output'.format(name))
+        defaults = query.get('getdefault', [])
+        if not all(isinstance(i, list) and len(i) == 2 for i in defaults):
+            raise exc.InvalidSpec(path, '{}: getdefault expects [key, '
+                                  'default] pairs'.format(name))
+        queries.append(Query(
+            name, query['output'], query.get('root'),
+            keystr(query.get('get')), [tuple(i) for i in defaults],
+            keystr(query.get('del')), bool(query.get('lines')),
+            bool(query.get('compact'))))
+    outputs = [i.output for i in queries]
+    if len(set(outputs)) < len(outputs):
+        raise exc.InvalidSpec(path, 'queries share an output file')
+    return queries
+
+
+def load_spec(path):
+    """Read & parse a spec file; see parse_spec."""
+    try:
+        with open(path) as file_:
+            spec = json.load(file_)
+    except json.JSONDecodeError as e:
+        raise exc.InvalidSpec(path, e)
+    return parse_spec(spec, path)
+
+
+class QueryOutput(object):
+    """Write the results of a query as they're cut."""
+
+    def __init__(self, query):
+        self.path = query.output
+        self.temp = None
+        if self.path != '-':
+            self.temp = '{}.{}.tmp'.format(self.path, os.getpid())
+        self.file = compressor.open_output(self.path, self.temp)
+        self.lines = query.lines
+        self.compact = query.compact
+        self.started = False
+
+    def add(self, record):
+        """Write a record of the output array (or line)."""
+        if self.lines:
+            text = format_json(record, True, None) + '\n'
+        else:
+            text = next(format_json_array(
+                (record,), self.compact, 2, self.started))
+        self.file.write(text)
+        self.started = True
+
+    def value(self, value):
+        """Write the result of a root that isn't an array."""
+        if self.lines:
+            self.add(value)
+        else:
+            self.file.write(format_json(value, self.compact, 2) + '\n')
+            self.lines = True  # nothing left to close
+
+    def close(self):
+        """Close the output array & the file; rename it to the output."""
+        if not self.lines:
+            self.file.write(next(format_json_array(
+                (), self.compact, 2, self.started)) + '\n')
+        self.file.close()
+        if self.temp:
+            os.replace(self.temp, self.path)
+
+    def discard(self):
+        """Close & remove the file, leaving the output untouched."""
+        self.file.close()
+        if self.temp:
+            os.remove(self.temp)
+
+
+def evaluate(records, routes):
+    """Cut each record by every query in a single pass.
+
+    Args:
+        records (Iterable): the records.
+        routes (List[tuple]): (Projection, QueryOutput) of each query.
+    """
+    for n, record in enumerate(records, 1):
+        limits.tick(n)
+        for projection, output in routes:
+            output.add(projection(record, n))
+
+
+def uses_key_numbers(queries, quotechar='"'):
+    """Return True if a query uses key numbers."""
+    return any(core.uses_key_numbers(*i.keystrs(), quotechar=quotechar)
+               for i in queries)
+
+
+def is_streamed(queries, quotechar='"'):
+    """Return True if the records can be streamed; see the module."""
+    return not any(i.rootkey for i in queries) and \
+        not uses_key_numbers(queries, quotechar)
+
+
+def run(queries, file_=None, data=None, quotechar='"', fullpath=False,
+        fullscan=False, any=False):
+    """Run the queries; write their results to their outputs.
+
+    Args:
+        queries (List[Query]): the queries.
+        file_ (TextIO): the input; the records of a root array or JSON
+            lines are streamed (see is_streamed), any other document is
+            decoded whole.
+        data (obj): or the decoded input document.
+        quotechar (str): the quote character used around JSON Keys.
+        fullpath (bool): name the fields by their full key path.
+        fullscan (bool): crawl all records for the key numbers.
+        any (bool): skip the keys that aren't found; see core.cut.
+    """
+    outputs = []
+    try:
+        for query in queries:
+            outputs.append(QueryOutput(query))
+        records = None
+        if file_ is not None:
+            records, data = open_records(file_)
+        if records is not None:
+            evaluate(records, [
+                (core.plan_cut(i.getkeys, i.getdefaults, i.delkeys,
+                               quotechar=quotechar, fullpath=fullpath,
+                               any=any, decoded=True), j)
+                for i, j in zip(queries, outputs)])
+        else:
+            cut_roots(data, queries, outputs, quotechar, fullpath, fullscan,
+                      any)
+    except BaseException:
+        for output in outputs:
+            output.discard()
+        raise
+    for output in outputs:
+        output.close()
+
+
+def cut_roots(data, queries, outputs, quotechar, fullpath, fullscan, any):
+    """Cut the document by the queries, evaluating those sharing a root
+    together.
+
+    Args:
+        data (obj): the decoded document.
+        outputs (List[QueryOutput]): the output of each query.
+        See run for the other arguments.
+    """
+    groups = {}
+    for query, output in zip(queries, outputs):
+        groups.setdefault(query.rootkey, []).append((query, output))
+    for rootkey, group in groups.items():
+        root = core.select_root(data, rootkey, quotechar, fullscan)
+        keys = None
+        if uses_key_numbers([i for i, _ in group], quotechar):
+            keys = core.key_catalog(root, fullscan)
+        routes = [(core.plan_cut(i.getkeys, i.getdefaults, i.delkeys,
+                                 keys, quotechar, fullpath, any,
+                                 decoded=True), j)
+                  for i, j in group]
+        if is_sequence_and_not_str(root):
+            evaluate(root, routes)
+        else:
+            for projection, output in routes:
+                output.value(projection(root))
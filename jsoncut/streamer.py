@@ -0,0 +1,203 @@
+"""Stream records from JSON arrays and line-delimited JSON.
+
+records:
+    The elements of a root-level JSON array, or the values of a
+    line-delimited (NDJSON) or concatenated JSON stream.
+
+The input is read in chunks and decoded one record at a time, so a
+consumer that stops early (i.e. --head) never reads or parses the
+remainder of the input.
+
+Examples:
+    >>> import io
+    >>> list(RecordReader(io.StringIO('[{"k": 1}, {"k": 2}]')))
+    [{'k': 1}, {'k': 2}]
+
+    >>> list(RecordReader(io.StringIO('{"k": 1}\\n{"k": 2}\\n')))
+    [{'k': 1}, {'k': 2}]
+
+    >>> read_records(io.StringIO('[1, 2, 3, 4, 5]'), skip=1, head=2)
+    [2, 3]
+    >>> read_records(io.StringIO('{"k": [1, 2]}'), head=1)
+    {'k': [1, 2]}
+"""
+import json
+import re
+from itertools import chain, islice
+
+from . import exceptions as exc
+from . import limits
+
+CHUNK_SIZE = 1 << 16
+WHITESPACE_RE = re.compile(r'[ \t\n\r]*')
+
+
+class RecordReader(object):
+    """Iterate over the records in a JSON text stream."""
+
+    def __init__(self, file_, chunk_size=CHUNK_SIZE, is_array=None,
+                 offset=0, encoding=None):
+        """Initialize the reader.
+
+        Args:
+            file_ (TextIO): JSON text stream.
+            chunk_size (int): minimum number of characters per read.
+            is_array (bool): None at the start of the input; True or
+                False to continue reading right after a record of an
+                array or a stream (see tell).
+            offset (int): input position of the file's current position.
+            encoding (str): count positions in bytes of this encoding;
+                by default positions are counted in characters.
+        """
+        self.file = file_
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+        self.is_array = is_array
+        self.offset = offset
+        self.encoding = encoding
+
+    def size(self, text):
+        """Return the length of text in the units of the positions."""
+        return len(text.encode(self.encoding)) if self.encoding else len(text)
+
+    def tell(self):
+        """Return the input position following the last read record."""
+        return self.offset + self.size(self.buf[:self.pos])
+
+    def fill(self):
+        """Read more input and discard the consumed part of the buffer.
+
+        The read size grows with the pending buffer, so decoding a
+        record larger than the chunk size stays linear.
+
+        Returns:
+            bool: False at end of input.
+        """
+        size = max(self.chunk_size, len(self.buf) - self.pos)
+        chunk = self.file.read(size)
+        self.offset += self.size(self.buf[:self.pos])
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        self.eof = not chunk
+        return not self.eof
+
+    def peek(self):
+        """Skip whitespace; return the next character ('' at EOF)."""
+        while True:
+            self.pos = WHITESPACE_RE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                return ''
+
+    def decode(self):
+        """Decode the JSON value starting at the current position."""
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self.fill():
+                    raise
+                continue
+            # a number or literal ending the buffer may continue
+            if end < len(self.buf) or self.eof:
+                self.pos = end
+                return value
+            self.fill()
+
+    def __iter__(self):
+        """Yield records; array elements or stream values."""
+        started = self.is_array is not None
+        if not started:
+            self.is_array = self.peek() == '['
+            if self.is_array:
+                self.pos += 1
+        if not self.is_array:
+            while self.peek():
+                value = self.decode()
+                limits.record()
+                yield value
+            return
+        if not started and self.peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            if started:
+                delimiter = self.peek()
+                self.pos += 1
+                if delimiter == ']':
+                    return
+                if delimiter != ',':
+                    raise json.JSONDecodeError(
+                        "Expecting ',' delimiter", self.buf, self.pos - 1)
+            started = True
+            self.peek()
+            value = self.decode()
+            limits.record()
+            yield value
+
+
+def open_records(file_):
+    """Start reading the records of a root array or JSON lines.
+
+    Only a root array or JSON lines have records; any other document
+    (e.g. an object) is decoded whole.
+
+    Args:
+        file_ (TextIO): JSON text stream.
+
+    Returns:
+        Tuple[Iterator, obj]: the records & None; or None & the document.
+
+    Examples:
+        >>> import io
+        >>> records, _ = open_records(io.StringIO('1\\n2\\n'))
+        >>> list(records)
+        [1, 2]
+        >>> open_records(io.StringIO('{"k": 1}'))
+        (None, {'k': 1})
+    """
+    reader = RecordReader(file_)
+    char = reader.peek()
+    if char == '[':
+        return iter(reader), None
+    if not char:
+        raise json.JSONDecodeError('Expecting value', reader.buf, reader.pos)
+    first = reader.decode()
+    if not reader.peek():
+        return None, first
+    limits.record()
+    reader.is_array = False  # JSON lines
+    return chain((first,), reader), None
+
+
+def read_records(file_, skip=0, head=None):
+    """Read a range of records; stop reading as soon as it's complete.
+
+    Args:
+        file_ (TextIO): JSON text stream.
+        skip (int): number of leading records to discard.
+        head (int): maximum number of records to return (None for all)
+
+    Returns:
+        list: the selected records; or the document, if it has no
+            records (see open_records).
+
+    Raises:
+        LimitExceeded: holding the records selected so far.
+    """
+    stop = None if head is None else skip + head
+    records, document = open_records(file_)
+    if records is None:
+        return document
+    selected = []
+    try:
+        for record in islice(records, skip, stop):
+            selected.append(record)
+    except exc.LimitExceeded as e:
+        e.partial = selected
+        raise
+    return selected
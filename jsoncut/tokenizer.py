@@ -15,6 +15,7 @@ import ast
 import csv
 import io
 import re
+from functools import lru_cache
 
 from . import exceptions as exc
 from .treecrawler import find_keys
@@ -23,6 +24,8 @@ SLICE_RE = re.compile(r'[-\d:]+$')
 UNESCAPED_DOT_RE = re.compile(r'(?<!\\)\.')
 NUMBER_RANGE_RE = re.compile(r'[-\d]+$')
 
+KEY_CACHE_SIZE = 1024
+
 csv.register_dialect('JsonKeys', delimiter=',', strict=False,
                      quoting=csv.QUOTE_MINIMAL, doublequote=False,
                      escapechar='\\', skipinitialspace=True)
@@ -57,9 +60,17 @@ def parse_csv(s, quotechar='"'):
         >>> parse_csv("key1.key2, 'w/ non-alphanums', key3", quotechar="'")
         ['key1.key2', 'w/ non-alphanums', 'key3']
     """
-    return next(csv.reader(io.StringIO(s), 'JsonKeys', quotechar=quotechar))
+    return list(_parse_csv(s, quotechar))
+
+
+@lru_cache(maxsize=KEY_CACHE_SIZE)
+def _parse_csv(s, quotechar):
+    """Parse & cache; the same keys are often parsed repeatedly."""
+    return tuple(next(csv.reader(io.StringIO(s), 'JsonKeys',
+                                 quotechar=quotechar)))
 
 
+@lru_cache(maxsize=KEY_CACHE_SIZE)
 def parse_key_name(key):
     r"""Parse Key Path.
 
@@ -128,7 +139,6 @@ def parse_defaults(keystr, value, **kwds):
     """Parse defaults."""
     def parse_value(v):
         try:
-            print(v)
             return ast.literal_eval(v)
         except (ValueError, SyntaxError):
             return v
@@ -5,62 +5,237 @@ fullscan/revisit:
     of the document crawling through every object in the sequence.
     If False then only crawl through the first object in the sequence.
 
-indexes:
-    If True then scans each array index for new objects/keys.
+trie:
+    The key paths found are kept in a trie of KeyNodes; one node per
+    unique key path, holding its (interned) escaped key name. Crawling
+    another object with the same key paths only walks the existing
+    nodes, and the key path names are built once, when listed.
+
+raw:
+    scan_keys finds the key paths in the raw JSON text; only the
+    member names are decoded, the values are skipped over without
+    building Python objects (see scan_keys).
 
 note:
-    Different nodes can have the same key-path name since sequence
-    index numbers are all replaced with a '#' which serves as a
-    wildcard character for unique key-path name representation.
-    This function searches for unique key-paths not unique index
-    numbers.
+    Only objects are crawled through (and the elements of a root-level
+    Sequence); nested arrays are not, so every key path is made of key
+    names. Dots in key names are escaped with a backslash.
 """
-import re
-from collections import deque, namedtuple
+import json
+import sys
 from collections.abc import Mapping
+from itertools import chain, compress, islice
 
+from . import exceptions as exc
+from .scanner import (COLON, COMMA, LBRACE, LBRACKET, RBRACE,
+                      string_windows)
 from .sequencer import is_sequence_and_not_str
 
-Node = namedtuple('Node', ['path', 'obj'])
-KEY_HEADER = re.compile(r'^(\.#\.|\.#|\.)')
-
-
-def get_children(parent, visited, revisit, is_array=False, array_char='#'):
-    """Return a list of child nodes."""
-    path, obj = parent
-    if isinstance(obj, Mapping):
-        children = obj.items()
-    elif is_array:
-        children = [(array_char, i) for i in obj]
-    else:
-        return []
-    children = [Node('{}.{}'.format(path, k.replace('.', '\\.')), v)
-                for k, v in children]
-    if revisit:
-        return children
-    return [i for i in children if i.path not in visited]
-
-
-def key_crawler(d, nodes=None, revisit=True, array_char='#'):
-    """Return sorted set of unique key-paths from a Mapping."""
-    visited = set()
-    to_crawl = deque([Node('', d)] if nodes is None else nodes)
-    while to_crawl:
-        current = to_crawl.popleft()
-        if revisit or current.path not in visited:
-            if current.path and current.path not in visited:
-                visited.add(current.path)
-            children = get_children(
-                current, visited, revisit,
-                is_array=False, array_char=array_char
-            )
-            to_crawl.extend(children)
-    return visited
+
+class KeyNode(object):
+    """A key path of the trie.
+
+    Attributes:
+        name (str): the escaped key name; interned.
+        children (dict): child nodes by (unescaped) key name.
+    """
+
+    __slots__ = ('name', 'children')
+
+    def __init__(self, name=''):
+        self.name = name
+        self.children = {}
+
+
+def is_mapping(obj):
+    """Return True if obj is a Mapping; dicts are checked quickly."""
+    return type(obj) is dict or isinstance(obj, Mapping)
+
+
+def add_keys(root, obj):
+    """Add the key paths of an object to the trie.
+
+    Returns:
+        KeyNode: root
+    """
+    if not is_mapping(obj):
+        return root
+    stack = [(root, obj)]
+    while stack:
+        node, obj = stack.pop()
+        children = node.children
+        for key, value in obj.items():
+            child = children.get(key)
+            if child is None:
+                child = children[key] = KeyNode(
+                    sys.intern(key.replace('.', '\\.')))
+            if is_mapping(value):
+                stack.append((child, value))
+    return root
+
+
+def raw_name(raw):
+    """Decode the raw contents of a member name."""
+    return json.loads(b'"' + raw + b'"') if b'\\' in raw else raw.decode()
+
+
+def child_node(node, name):
+    """Return the child of a node by key name; added if it's new."""
+    child = node.children.get(name)
+    if child is None:
+        child = node.children[name] = KeyNode(
+            sys.intern(name.replace('.', '\\.')))
+    return child
+
+
+def add_raw_keys(root, scanner, pos):
+    """Add the key paths of the raw JSON object at pos to the trie.
+
+    The member names are read one by one and the values other than
+    objects are skipped over by the scanner; e.g. a large array is
+    skipped by its brackets.
+
+    Args:
+        root (KeyNode): the trie.
+        scanner (Scanner): scanner of the raw JSON text.
+        pos (int): position of the object's opening brace.
+
+    Returns:
+        int: the end of the object.
+
+    Raises:
+        ScanError: the JSON is malformed.
+    """
+    pos = scanner.skip_ws(pos + 1)
+    if scanner.char(pos) == RBRACE:
+        return pos + 1
+    node, stack = root, []
+    while True:
+        key, start = scanner.read_key(pos)
+        child = child_node(node, key)
+        if scanner.char(start) == LBRACE:
+            pos = scanner.skip_ws(start + 1)
+            if scanner.char(pos) != RBRACE:
+                stack.append(node)
+                node = child
+                continue
+            end = pos + 1
+        else:
+            end = scanner.value_end(start)
+        while True:
+            char, pos = scanner.expect(end, COMMA, RBRACE)
+            if char == COMMA:
+                break
+            if not stack:
+                return pos
+            node, end = stack.pop(), pos
+
+
+def scan_keys(buf, start=0, end=None, root=None):
+    """Add the key paths of raw JSON text to a trie; see crawl_keys.
+
+    Only the member names & brackets are walked (see
+    scanner.string_windows); the arrays other than a root array of
+    records are skipped. The values aren't validated. Faster than
+    add_raw_keys for many small records.
+
+    Args:
+        buf (bytes-like): raw JSON text.
+        start (int): position of the value; the root or a record.
+        end (int): end of the value; the end of buf by default.
+        root (KeyNode): the trie; a new one if None.
+
+    Returns:
+        KeyNode: the root of the trie.
+
+    Raises:
+        ScanError: the brackets aren't balanced.
+
+    Example:
+        >>> buf = b'[{"a": {"b.c": "}"}, "d": [{"e": 1}]}, {"f": {}}]'
+        >>> sorted(key_paths(scan_keys(buf)))
+        ['a', 'a.b\\\\.c', 'd', 'f']
+    """
+    root = KeyNode() if root is None else root
+    node = last = pending = table = None
+    stack, tables, skip, records = [], {}, 0, False
+    for strings, marks in string_windows(buf, start, end):
+        # the strings followed by marks; the others are values
+        for raw, mark in compress(zip(chain((pending,), strings), marks),
+                                  marks):
+            if mark == b':':  # a member name, not followed by a bracket
+                if skip or node is None:
+                    continue
+                last = table.get(raw)
+                if last is not None:
+                    continue
+            for char in mark:
+                if skip:
+                    if char == LBRACE or char == LBRACKET:
+                        skip += 1
+                    elif char != COLON:
+                        skip -= 1
+                elif char == COLON:
+                    if node is None:
+                        continue
+                    last = table.get(raw)
+                    if last is None:
+                        last = table[raw] = child_node(node, raw_name(raw))
+                elif char == LBRACE:
+                    stack.append(node)
+                    node = root if node is None else last
+                    table = tables.setdefault(node, {})
+                elif char == RBRACE:
+                    if not stack:
+                        raise exc.ScanError('Unbalanced brackets', start)
+                    node = stack.pop()
+                    table = None if node is None else tables[node]
+                elif char == LBRACKET:
+                    if node is None and not records:
+                        records = True  # the root array
+                    else:
+                        skip = 1
+                else:
+                    records = False
+        if strings:
+            pending = strings[-1]
+    return root
+
+
+def key_paths(root):
+    """Generate the key path names of the trie (unordered)."""
+    stack = [(root, '')]
+    while stack:
+        node, prefix = stack.pop()
+        for child in node.children.values():
+            path = prefix + child.name
+            yield path
+            if child.children:
+                stack.append((child, path + '.'))
+
+
+def crawl_keys(d, fullscan=False, root=None):
+    """Add the key paths of a JSON document to a trie; see find_keys.
+
+    Returns:
+        KeyNode: the root of the trie; a new one if root is None.
+    """
+    root = KeyNode() if root is None else root
+    if not is_sequence_and_not_str(d):
+        return add_keys(root, d)
+    for obj in d if fullscan else islice(d, 1):
+        add_keys(root, obj)
+    return root
 
 
 def find_keys(d, fullscan=False):
-    """Return a sorted list of keys from a JSON document."""
-    seq = is_sequence_and_not_str(d)
-    nodes = get_children(('', d), set(), True, True) if seq else None
-    result = (KEY_HEADER.sub('', i) for i in key_crawler(d, nodes, fullscan))
-    return sorted(i for i in result if i)
+    """Return a sorted list of keys from a JSON document.
+
+    Examples:
+        >>> d = [{'a': {'b': 1}, 'c.d': [{'e': 1}]}, {'a': {'f': None}}]
+        >>> find_keys(d)
+        ['a', 'a.b', 'c\\\\.d']
+        >>> find_keys(d, fullscan=True)
+        ['a', 'a.b', 'a.f', 'c\\\\.d']
+    """
+    return sorted(key_paths(crawl_keys(d, fullscan)))
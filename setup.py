@@ -15,6 +15,7 @@ setup(
     ],
     install_requires=['click', 'colorama', 'pygments'],
     entry_points={
-        'console_scripts': ['jsoncut=jsoncut.cli:main']
+        'console_scripts': ['jsoncut=jsoncut.cli:main',
+                            'jsoncut-client=jsoncut.client:main']
     }
 )
@@ -0,0 +1,64 @@
+"""Test aggregating records by group."""
+import json
+
+import pytest
+from click.testing import CliRunner
+
+from jsoncut import cli
+from jsoncut import exceptions as exc
+from jsoncut.aggregator import group_records, parse_aggregates
+
+RECORDS = [
+    {'status': 'subscribed', 'stats': {'rate': 0.5}, 'loc': {'cc': 'US'}},
+    {'status': 'cleaned', 'stats': {'rate': None}, 'loc': {'cc': 'US'}},
+    {'status': 'subscribed', 'stats': {'rate': 0.25}, 'loc': {'cc': 'FR'}},
+    {'status': 'subscribed', 'stats': {}, 'loc': {'cc': 'US'}},
+]
+
+
+def test_group_by_multiple_key_paths():
+    aggregates = parse_aggregates(['count', 'count:stats.rate',
+                                   'sum:stats.rate', 'min:stats.rate',
+                                   'first:loc.cc'])
+    groups = list(group_records(RECORDS, [('status',)], aggregates))
+    assert groups == [
+        {'status': 'subscribed', 'count': 3, 'count(stats.rate)': 2,
+         'sum(stats.rate)': 0.75, 'min(stats.rate)': 0.25,
+         'first(loc.cc)': 'US'},
+        {'status': 'cleaned', 'count': 1, 'count(stats.rate)': 0,
+         'sum(stats.rate)': 0, 'min(stats.rate)': None,
+         'first(loc.cc)': 'US'}]
+    groups = group_records(RECORDS, [('loc', 'cc'), ('missing',)],
+                           parse_aggregates(['mean:stats.rate']))
+    assert list(groups) == [
+        {'loc.cc': 'US', 'missing': None, 'mean(stats.rate)': 0.5},
+        {'loc.cc': 'FR', 'missing': None, 'mean(stats.rate)': 0.25}]
+
+
+@pytest.mark.parametrize('spec', ['avg:x', 'sum', 'max:'])
+def test_invalid_aggregate(spec):
+    with pytest.raises(exc.InvalidAggregate):
+        parse_aggregates([spec])
+
+
+def test_group_values_by_json_type():
+    records = [{'f': True}, {'f': 1}, {'f': 1}, {'f': 1.0}, {'f': '1'},
+               {'f': None}, {}]
+    groups = group_records(records, [('f',)], parse_aggregates(['count']))
+    assert [(i['f'], i['count']) for i in groups] == [
+        (True, 1), (1, 2), (1.0, 1), ('1', 1), (None, 2)]
+    assert [type(i['f']) for i in group_records(
+        records[:5], [('f',)], parse_aggregates([]))] == \
+        [bool, int, float, str]
+
+
+def test_group_by_keys_not_selected(tmpdir):
+    path = tmpdir.join('members.json')
+    path.write(json.dumps(RECORDS))
+    result = CliRunner().invoke(cli.main, [
+        '-n', '--lines', '-g', 'status', '--group-by', 'loc.cc',
+        '-a', 'count', '-a', 'sum:stats.rate', str(path)])
+    assert result.exit_code == 0, result.output
+    assert [json.loads(i) for i in result.output.splitlines()] == [
+        {'loc.cc': 'US', 'count': 3, 'sum(stats.rate)': 0.5},
+        {'loc.cc': 'FR', 'count': 1, 'sum(stats.rate)': 0.25}]
@@ -0,0 +1,38 @@
+"""Test resumable batch runs."""
+import json
+
+import pytest
+
+from jsoncut import batch, core
+
+OPTIONS = {'getkeys': 'id,name'}
+
+
+@pytest.mark.parametrize('lines', [False, True])
+def test_resumed_run_same_as_uninterrupted(tmpdir, monkeypatch, lines):
+    records = [{'id': i, 'name': 'ü' * (i % 4), 'x': i} for i in range(100)]
+    source = tmpdir.join('in.json')
+    source.write_text(json.dumps(records, indent=1, ensure_ascii=False),
+                      'utf-8')
+    expected, output = tmpdir.join('expected'), tmpdir.join('out')
+    ckpt = str(tmpdir.join('ckpt'))
+    batch.run(str(source), str(expected), OPTIONS, ckpt, lines=lines)
+
+    calls = []
+
+    def crashing_cut(data, **kwds):
+        calls.append(data)
+        if len(calls) > 55:
+            raise KeyboardInterrupt
+        return core.cut(data, **kwds)
+
+    monkeypatch.setattr(batch.core, 'cut', crashing_cut)
+    with pytest.raises(KeyboardInterrupt):
+        batch.run(str(source), str(output), OPTIONS, ckpt, lines=lines,
+                  every=10)
+    output.write('partial garbage', mode='a')
+    monkeypatch.undo()
+    assert batch.run(str(source), str(output), OPTIONS, ckpt, resume=True,
+                     lines=lines, every=10) == 100
+    assert output.read_binary() == expected.read_binary()
+    assert not tmpdir.join('ckpt').exists()
@@ -0,0 +1,48 @@
+"""Test extracting typed columns."""
+import math
+
+import pytest
+
+from jsoncut import columnar, core, exceptions as exc
+
+DATA = {'members': [
+    {'member_rating': 2, 'stats': {'avg_open_rate': 0.5}},
+    {'member_rating': 4, 'stats': {'avg_open_rate': 1}},
+    {'member_rating': None, 'stats': {}},
+    {'member_rating': 3, 'stats': {'avg_open_rate': 0.25}},
+]}
+
+
+@pytest.fixture(params=['array', 'numpy'])
+def backend(request, monkeypatch):
+    if request.param == 'numpy':
+        pytest.importorskip('numpy')
+    else:
+        monkeypatch.setattr(columnar, 'numpy', None)
+    return request.param
+
+
+def test_columns(backend):
+    columns = core.columns(DATA, 'member_rating, stats.avg_open_rate',
+                           rootkey='members', fullpath=True)
+    rating, rate = columns['member_rating'], columns['stats.avg_open_rate']
+    assert list(rating.valid) == [True, True, False, True]
+    assert rating.tolist() == [2, 4, None, 3]
+    assert rate.tolist() == [0.5, 1.0, None, 0.25]
+    assert math.isnan(rate.values[2]) and rating.values[2] == 0
+    assert rating.summary() == {'count': 3, 'missing': 1, 'sum': 9, 'min': 2,
+                                'max': 4, 'mean': 3.0,
+                                'std': pytest.approx(math.sqrt(2 / 3))}
+    assert rate.summary()['mean'] == pytest.approx(1.75 / 3)
+
+
+def test_column_promotion_and_errors(backend):
+    columns = columnar.extract([{'n': None}, {'n': 1}, {'n': 2 ** 64}],
+                               [('n',)])
+    assert columns['n'].tolist() == [None, 1.0, float(2 ** 64)]
+    assert columns['n'].summary()['count'] == 2
+    empty = columnar.extract([{}], [('n',)])['n'].summary()
+    assert empty['count'] == 0 and empty['mean'] is None
+    with pytest.raises(exc.ColumnTypeError) as error:
+        columnar.extract([{'n': 1}, {'n': 'x'}], [('n',)])
+    assert error.value.item_number == 2
@@ -0,0 +1,48 @@
+"""Test the block-compressed output."""
+import bz2
+import gzip
+import json
+import lzma
+
+import pytest
+from click.testing import CliRunner
+
+from jsoncut import cli, compressor
+
+DECOMPRESS = {'.gz': gzip.decompress, '.bz2': bz2.decompress,
+              '.xz': lzma.decompress}
+
+
+@pytest.mark.parametrize('suffix', sorted(DECOMPRESS))
+def test_blocks_compressed_in_order(tmpdir, suffix):
+    path = str(tmpdir.join('out.json' + suffix))
+    lines = ['{{"n": {}, "s": "été"}}\n'.format(i)
+             for i in range(2000)]
+    writer = compressor.BlockWriter(path, compressor.compressor(path),
+                                    block_size=1000, threads=3)
+    with writer:
+        for line in lines:
+            writer.write(line)
+    assert writer.blocks > 10
+    with open(path, 'rb') as file_:
+        assert DECOMPRESS[suffix](file_.read()).decode() == ''.join(lines)
+
+
+def test_empty_and_plain_output(tmpdir):
+    path = str(tmpdir.join('empty.json.gz'))
+    compressor.open_output(path).close()
+    with gzip.open(path) as file_:
+        assert file_.read() == b''
+    assert compressor.compressor('out.json') is None
+
+
+@pytest.mark.parametrize('suffix', ['.gz', '.xz'])
+def test_raw_output_compressed(tmpdir, suffix):
+    path, output = tmpdir.join('in.json'), tmpdir.join('r.json' + suffix)
+    path.write(json.dumps([{'id': i, 'x': [i]} for i in range(5)]))
+    result = CliRunner().invoke(cli.main, [
+        '--raw', '-g', 'id', '-o', str(output), str(path)])
+    assert result.exit_code == 0, result.output
+    text = DECOMPRESS[suffix](output.read_binary()).decode()
+    assert [json.loads(i) for i in text.splitlines()] == \
+        [{'id': i} for i in range(5)]
@@ -1,4 +1,8 @@
-from jsoncut import core
+from copy import deepcopy
+
+import pytest
+
+from jsoncut import core, exceptions as exc
 
 """Test JSON Cut main functions."""
 TEST_DATA = {
@@ -45,3 +49,46 @@ def test_cut():
     result = core.cut(TEST_DATA, rootkey=rootkey, getkeys=getkeys,
                               delkeys=delkeys)
     assert result == PRUNED_TEST_DATA
+
+
+def test_cut_single_pass():
+    """Test get, getdefault & del without changing the input data."""
+    original = deepcopy(TEST_DATA)
+    result = core.cut(TEST_DATA, rootkey='results', getkeys='via.source',
+                      getdefaults=[('via.channel, missing', '"n/a"')],
+                      delkeys='source.from.name, channel')
+    assert result == [
+        {'source': {'from': {}}, 'missing': 'n/a'},
+        {'source': {'from': {}}, 'missing': 'n/a'}
+    ]
+    assert TEST_DATA == original
+    result = core.cut(TEST_DATA, rootkey='results', delkeys='via.source')
+    assert result == [{'id': 1719, 'via': {'channel': 'email'}},
+                      {'id': 1720, 'via': {'channel': 'email'}}]
+    assert TEST_DATA == original
+
+
+def test_projection_plan():
+    """Test removing the redundant operations of a cut."""
+    projection = core.Projection([('a',), ('b',)], [(('c',), 0)],
+                                 [('c',), ('a', 'x'), ('a', 'x', 'y'),
+                                  ('z',), ('a', 'x')], any=True)
+    assert projection.gets == [('a',), ('b',)]
+    assert projection.defaults == []
+    assert projection.dels == [('a', 'x')]
+
+
+@pytest.mark.parametrize('getkeys, delkeys, valid', [
+    ('id,nokey', 'nokey', ('id,via', 'via')),
+    (None, 'via,via.nokey', (None, 'via,via.channel')),
+    ('id,via', 'via,via.nokey', ('id,via', 'via,via.channel')),
+])
+def test_keys_planned_away_are_checked(getkeys, delkeys, valid):
+    """A mistyped key isn't hidden by removing the redundant operations."""
+    record = {'id': 1, 'via': {'channel': 'email'}}
+    with pytest.raises(exc.KeyNotFound):
+        core.cut(record, getkeys=getkeys, delkeys=delkeys)
+    assert core.cut(record, getkeys=getkeys, delkeys=delkeys, any=True) == \
+        {'id': 1}
+    getkeys, delkeys = valid
+    assert core.cut(record, getkeys=getkeys, delkeys=delkeys) == {'id': 1}
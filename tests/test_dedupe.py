@@ -0,0 +1,45 @@
+"""Test dropping repeated records."""
+import json
+
+import pytest
+from click.testing import CliRunner
+
+from jsoncut import cli
+from jsoncut.dedupe import unique_records
+from jsoncut.sketches import BloomFilter
+
+RECORDS = [{'id': i % 50, 'email': 'u{}@x'.format(i % 30)} for i in range(200)]
+
+
+def test_unique_by_exact_set():
+    unique = list(unique_records(RECORDS, [('id',)]))
+    assert [i['id'] for i in unique] == list(range(50))
+    unique = list(unique_records(RECORDS, [('id',), ('email',)]))
+    assert len(unique) == 150
+
+
+def test_unique_by_bloom_filter():
+    unique = list(unique_records(RECORDS, [('email',)], 1024, 0.001))
+    assert len(unique) == 30
+
+
+def test_bloom_filter_error_rate():
+    bloom = BloomFilter(size=8192, error_rate=0.01)
+    repeats = sum(bloom.add(str(i)) for i in range(5000))
+    assert repeats < 100 and all(str(i) in bloom for i in range(5000))
+    false_positives = sum(str(-i) in bloom for i in range(1, 10001))
+    assert false_positives < 200
+
+
+@pytest.mark.parametrize('files', [1, 2])
+def test_unique_by_keys_not_selected(tmpdir, files):
+    filenames = []
+    for i in range(files):
+        path = tmpdir.join('members-{}.json'.format(i))
+        path.write(json.dumps([dict(j, n=i) for j in RECORDS]))
+        filenames.append(str(path))
+    result = CliRunner().invoke(cli.main, [
+        '-n', '--lines', '-j', '1', '-g', 'n', '--unique-by', 'id'] +
+        filenames)
+    assert result.exit_code == 0, result.output
+    assert result.output == '{"n":0}\n' * 50
@@ -0,0 +1,43 @@
+"""Test tailing JSON lines files."""
+from jsoncut import follow
+from jsoncut.follow import Follower
+
+
+def test_follow_rotation_and_truncation(tmpdir):
+    log = tmpdir.join('app.log')
+    log.write('{"n": 1}\n')
+    follower = Follower(str(log))
+    assert [i for i, _ in follower.poll()] == [b'{"n": 1}']
+    log.write('{"n": 2}\n', mode='a')
+    log.rename(tmpdir.join('app.log.1'))
+    log.write('{"n": 3}\n')
+    assert [i for i, _ in follower.poll()] == [b'{"n": 2}']
+    assert [i for i, _ in follower.poll()] == [b'{"n": 3}']
+    log.write('{"n":6}\n', mode='w')
+    assert follower.poll() == [(b'{"n":6}', 8)]
+
+
+def test_resume_from_checkpoint(tmpdir):
+    log = tmpdir.join('app.log')
+    log.write('{"n": 1}\n{"n": 2}\n')
+    follower = Follower(str(log))
+    follower.poll()
+    state = follower.state()
+    follower.close()
+    log.write('{"n": 3}\n', mode='a')
+    resumed = Follower.resume(str(log), state)
+    assert resumed.poll() == [(b'{"n": 3}', 27)]
+
+
+def test_read_in_blocks(tmpdir, monkeypatch):
+    monkeypatch.setattr(follow, 'BLOCK_SIZE', 16)
+    log = tmpdir.join('app.log')
+    lines = ['{"n": %d}' % i for i in range(5)]
+    lines.append('{"long": "%s"}' % ('x' * 40))
+    log.write('\n\n'.join(lines) + '\n')
+    follower = Follower(str(log))
+    batches = list(iter(follower.poll, []))
+    assert all(len(i) <= 2 for i in batches)
+    assert [i for batch in batches for i, _ in batch] == \
+        [i.encode() for i in lines]
+    assert follower.offset == log.size()
@@ -0,0 +1,42 @@
+"""Test the index sidecar of record offsets."""
+import json
+import os
+
+import pytest
+from click.testing import CliRunner
+
+from jsoncut import cli, indexer
+
+
+def test_index_seeks_records(tmpdir):
+    records = [{'n': i, 's': ' ]}"\\' * (i % 3)} for i in range(50)]
+    filename = str(tmpdir.join('doc.json'))
+    with open(filename, 'w') as file_:
+        json.dump({'meta': records, 'results': [{'rows': records}]},
+                  file_, indent=2)
+    assert indexer.build(filename, ('results', '0', 'rows')) == 50
+    positions = range(50)[10:40:7]
+    assert indexer.load_records(filename, positions) == \
+        [records[i] for i in positions]
+    # a changed file isn't served from the stale index
+    stat = os.stat(filename)
+    os.utime(filename, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    with indexer.open_index(filename) as index:
+        assert index is None
+
+
+@pytest.mark.parametrize('size', [0, 10, -4, -8])
+def test_truncated_index_is_ignored(tmpdir, size):
+    filename = str(tmpdir.join('doc.json'))
+    with open(filename, 'w') as file_:
+        json.dump([{'n': i} for i in range(5)], file_)
+    indexer.build(filename)
+    path = indexer.index_path(filename)
+    with open(path, 'r+b') as file_:
+        file_.truncate(size if size >= 0 else os.path.getsize(path) + size)
+    with indexer.open_index(filename) as index:
+        assert index is None
+    result = CliRunner().invoke(cli.main, ['-n', '--lines', '--skip', '3',
+                                           filename])
+    assert result.exit_code == 0, result.output
+    assert result.output == '{"n":3}\n{"n":4}\n'
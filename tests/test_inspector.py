@@ -0,0 +1,48 @@
+"""Test JSON inspection."""
+import json
+
+from jsoncut import scanner
+from jsoncut.inspector import count_arrays, crawl, inspect_json, inspect_stats
+
+TEST_DATA = [
+    {'id': 1, 'tags': ['a', 'bc'], 'via': None},
+    {'id': 20, 'tags': [], 'via': {'channel': 'email'}},
+]
+
+
+def test_inspect_json():
+    result = list(inspect_json(TEST_DATA, nocolor=True))
+    assert result == [
+        '#             :object(keys=3)',
+        '#.id          :number(minval=1, maxval=20)',
+        '#.tags        :array(mincount=0, maxcount=2)',
+        '#.tags.#      :text(minlen=1, maxlen=2)',
+        '#.via         :null | object(keys=1)',
+        '#.via.channel :text(len=5)',
+    ]
+
+
+def test_crawl_allocates_stats_per_unique_path():
+    root = crawl([{'k': [i, str(i)]} for i in range(1000)])
+    assert sorted(i.path for i in root.walk()) == ['.#', '.#.k', '.#.k.#']
+    stats = root.items.members['k'].items
+    assert stats.types == {'number': [0, 999], 'text': [1, 3]}
+
+
+def test_inspect_stats():
+    data = [{'status': 'a' if i % 4 else None, 'n': i} for i in range(100)]
+    data.append({'n': 100})
+    result = inspect_stats(data)
+    status = result['#.status']
+    assert status['types'] == 'null | text(len=1)'
+    assert status['null_rate'] == 0.25
+    assert status['missing_rate'] == round(1 / 101, 4)
+    assert status['top'] == [['a', 75]]
+    assert 95 <= result['#.n']['distinct'] <= 107
+
+
+def test_count_root_array_of_arrays():
+    data = [[1, 2], [3], {'d': []}]
+    assert list(count_arrays(data, nocolor=True)) == ['* : 3', '# : 3']
+    assert scanner.array_counts(json.dumps(data).encode()) == \
+        {'': 3, '#': 3}
@@ -0,0 +1,30 @@
+"""Test enriching records from a lookup file."""
+import io
+
+import pytest
+
+from jsoncut import exceptions as exc
+from jsoncut.joiner import build_index, join_records, parse_join
+
+LISTS = '{"id": 1, "name": "News", "size": 10}\n{"id": 2, "name": "Ads"}\n'
+
+
+def test_hash_join_selected_fields():
+    filename, left, right = parse_join('data/lists.json:list.id=id')
+    assert (filename, left, right) == ('data/lists.json', ('list', 'id'),
+                                       ('id',))
+    index = build_index(io.StringIO(LISTS), right, 'name')
+    members = [{'email': 'a@x', 'list': {'id': 2}},
+               {'email': 'b@x', 'list': {'id': 3}},
+               {'email': 'c@x', 'list': {'id': 1}, 'name': 'C'}]
+    pairs = ((i, {k: v for k, v in i.items() if k != 'list'})
+             for i in members)
+    assert [i for _, i in join_records(pairs, index, left)] == [
+        {'email': 'a@x', 'name': 'Ads'},
+        {'email': 'b@x'},
+        {'email': 'c@x', 'name': 'C'}]
+
+
+def test_invalid_join():
+    with pytest.raises(exc.InvalidJoin):
+        parse_join('lists.json:id')
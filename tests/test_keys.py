@@ -1,6 +1,10 @@
-from jsoncut.core import cut
+import json
+
+import pytest
+
+from jsoncut.core import cut, find_raw_keys
 from jsoncut.tokenizer import parse_key_name
-from jsoncut.treecrawler import find_keys
+from jsoncut.treecrawler import crawl_keys, find_keys
 from .sample_data import keys_with_dots
 
 TEST_DATA_WITH_DOTS_IN_KEY_NAME = {"dots.in.key.name": {"k1": True}}
@@ -28,3 +32,39 @@ def test_cut_key_number_containing_dots_in_name():
 def test_cut_key_number_containing_dots_in_name_with_fullpath():
     result = cut(keys_with_dots.TEST_DATA, getkeys='4', fullpath=True)
     assert result == [{'State.Name': 'running'}, {'State.Name': 'running'}]
+
+
+def test_key_trie_one_node_per_key_path():
+    records = [{'a': {'b': i, 'c': [{'d': 1}]}, '#': {'x': None}}
+               for i in range(3)]
+    root = crawl_keys(records, fullscan=True)
+    assert list(root.children) == ['a', '#']
+    assert root.children['a'].children['b'].name == 'b'
+    assert find_keys(records, fullscan=True) == ['#', '#.x', 'a', 'a.b',
+                                                 'a.c']
+
+
+RAW_RECORDS = [{'a': {'b.c': '}", "x": {', 'd': [{'e': 1}]}, 'f': 1},
+               {'a': {'g': {'h': None}}, 'i\\"': {}}, [{'j': 2}], 'k']
+
+
+@pytest.mark.parametrize('indent', [None, 2])
+@pytest.mark.parametrize('fullscan', [False, True])
+def test_raw_keys_match_decoded_keys(indent, fullscan):
+    buf = json.dumps(RAW_RECORDS, indent=indent).encode()
+    assert find_raw_keys(buf, fullscan=fullscan) == \
+        find_keys(RAW_RECORDS, fullscan)
+    document = {'meta': {'n': 4}, 'records': RAW_RECORDS}
+    buf = json.dumps(document, indent=indent).encode()
+    assert find_raw_keys(buf, fullscan=fullscan) == \
+        find_keys(document, fullscan)
+    assert find_raw_keys(buf, ('records',), fullscan) == \
+        find_keys(RAW_RECORDS, fullscan)
+
+
+def test_raw_keys_of_json_lines():
+    records = RAW_RECORDS[:2]
+    buf = '\n'.join(json.dumps(i) for i in records).encode()
+    assert find_raw_keys(buf) == find_keys(records)
+    assert find_raw_keys(buf, fullscan=True) == \
+        find_keys(records, fullscan=True)
@@ -0,0 +1,71 @@
+"""Test the resource limits of a run."""
+import io
+import json
+
+import pytest
+from click.testing import CliRunner
+
+from jsoncut import cli, core, exceptions as exc, limits, streamer
+
+RECORDS = [{'id': i, 'x': {'y': [i]}} for i in range(10)]
+
+
+@pytest.fixture
+def start_limits():
+    yield limits.start
+    limits.stop()
+
+
+def test_records_cut_before_the_limit(start_limits):
+    start_limits(max_records=4)
+    with pytest.raises(exc.LimitExceeded) as error:
+        core.cut(RECORDS, getkeys='id')
+    assert error.value.limit == 'max_records'
+    assert error.value.partial == [{'id': i} for i in range(4)]
+    assert limits.exceeded() is error.value
+
+
+def test_streamed_records_and_input_size(start_limits):
+    text = '\n'.join(json.dumps(i) for i in RECORDS)
+    start_limits(max_records=5)
+    with pytest.raises(exc.LimitExceeded):
+        list(streamer.RecordReader(io.StringIO(text)))
+    start_limits(max_bytes=len(text) - 1)
+    with pytest.raises(exc.LimitExceeded) as error:
+        json.load(limits.bounded(io.StringIO(text)))
+    assert error.value.limit == 'max_bytes'
+
+
+def test_nesting_depth(start_limits, tmpdir):
+    path = tmpdir.join('deep.json')
+    path.write(json.dumps(RECORDS))
+    start_limits(max_depth=4)
+    limits.check_file(str(path))
+    limits.check_data(RECORDS)
+    start_limits(max_depth=3)
+    with pytest.raises(exc.LimitExceeded):
+        limits.check_file(str(path))
+    with pytest.raises(exc.LimitExceeded):
+        limits.check_data(RECORDS)
+
+
+@pytest.mark.parametrize('options', [['-c'], ['-l'], ['-i']])
+def test_summaries_check_the_records(options, tmpdir):
+    path = tmpdir.join('records.json')
+    path.write(json.dumps(RECORDS))
+    result = CliRunner().invoke(
+        cli.main, ['-n', '--max-records', '5'] + options + [str(path)])
+    assert result.exit_code == 1
+    assert result.output.startswith('LimitExceeded: --max-records')
+
+
+def test_partial_records_of_a_range(tmpdir):
+    path = tmpdir.join('records.json')
+    path.write(json.dumps(RECORDS))
+    result = CliRunner().invoke(cli.main, [
+        '-n', '--max-records', '5', '--partial', '--head', '10', '-g', 'id',
+        '--lines', str(path)])
+    assert result.exit_code == 1
+    error, *lines = result.output.splitlines()
+    assert error.startswith('LimitExceeded: --max-records')
+    assert [json.loads(i) for i in lines] == [{'id': i} for i in range(5)]
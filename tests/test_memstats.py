@@ -0,0 +1,42 @@
+"""Memory regression benchmark of the phases of a cut."""
+import json
+
+import pytest
+
+from jsoncut import core, memstats
+
+RECORDS = [{'id': i, 'name': 'user {}'.format(i), 'tags': ['a{}'.format(i)],
+            'address': {'city': 'c{}'.format(i), 'zip': '{:05}'.format(i)}}
+           for i in range(5000)]
+
+# peak bytes of each phase relative to the decoded document; the records
+# aren't copied & the key catalog (crawl) holds each key path once
+BUDGETS = {'items': 0.01, 'crawl': 0.01, 'cut': 0.5}
+
+
+def measure(getkeys):
+    text = json.dumps(RECORDS)
+    memstats.start()
+    try:
+        with memstats.phase('load', objects=True):
+            data = json.loads(text)
+        core.cut(data, getkeys=getkeys)
+    finally:
+        report = memstats.stop()
+    return report
+
+
+# key names don't need the key catalog; key numbers crawl the records
+@pytest.mark.parametrize('getkeys, phases', [
+    ('id,address.city', ['cut', 'items']),
+    ('1,4', ['crawl', 'cut', 'items']),
+])
+def test_cut_memory_budget(getkeys, phases):
+    report = measure(getkeys)
+    document = report['phases'].pop('load')
+    assert document['objects']['dict'] >= 2 * len(RECORDS)
+    assert sorted(report['phases']) == phases
+    for name, stats in report['phases'].items():
+        assert stats['calls'] == 1
+        assert stats['peak'] <= BUDGETS[name] * document['allocated'], name
+    assert report['traced_peak'] >= document['allocated']
@@ -0,0 +1,83 @@
+"""Test cutting multiple files in parallel."""
+import json
+
+import pytest
+from click.testing import CliRunner
+
+from jsoncut import cli, parallel
+from jsoncut.parallel import cut_chunks, cut_files, expand_paths, split_chunks
+
+OPTIONS = {'rootkey': 'results', 'getkeys': 'id'}
+
+
+def write_files(tmpdir, count):
+    for i in range(count):
+        data = {'results': [{'id': i * 10 + j, 'x': j} for j in range(3)]}
+        tmpdir.join('part-{}.json'.format(i)).write(json.dumps(data))
+
+
+def test_expand_glob_patterns(tmpdir):
+    write_files(tmpdir.mkdir('sub'), 2)
+    filenames, multiple = expand_paths([str(tmpdir.join('**', '*.json'))])
+    assert multiple
+    assert [i.rsplit('/', 1)[-1] for i in filenames] == [
+        'part-0.json', 'part-1.json']
+
+
+def test_cut_files_ordered_with_errors(tmpdir):
+    write_files(tmpdir, 4)
+    tmpdir.join('part-2.json').write('{"results": [')
+    filenames, _ = expand_paths([str(tmpdir.join('*.json'))])
+    results = list(cut_files(filenames, OPTIONS, jobs=2))
+    assert [r.filename for r in results] == filenames
+    assert results[2].error.startswith('JSONDecodeError')
+    assert results[3].value == [{'id': 30}, {'id': 31}, {'id': 32}]
+
+
+def test_cut_files_unordered(tmpdir):
+    write_files(tmpdir, 3)
+    filenames, _ = expand_paths([str(tmpdir.join('*.json'))])
+    results = cut_files(filenames, OPTIONS, jobs=2, ordered=False)
+    assert sorted(r.value[0]['id'] for r in results) == [0, 10, 20]
+
+
+@pytest.mark.parametrize('lines', [False, True])
+def test_cut_chunks_of_one_file(tmpdir, monkeypatch, lines):
+    monkeypatch.setattr(parallel, 'MIN_CHUNK', 1)
+    records = [{'id': i, 's': '],{"' * (i % 3)} for i in range(100)]
+    path = tmpdir.join('big.json')
+    if lines:
+        path.write('\n'.join(json.dumps(i) for i in records) + '\n')
+    else:
+        path.write(json.dumps({'meta': records, 'results': records}))
+    root = () if lines else ('results',)
+    chunks, is_lines = split_chunks(str(path), root, jobs=2)
+    assert len(chunks) == 8 and is_lines == lines
+    results = cut_chunks(str(path), chunks, {'getkeys': 's'}, lines, jobs=2)
+    assert [j for i in results for j in i.value] == \
+        [{'s': i['s']} for i in records]
+
+
+@pytest.mark.parametrize('indent', [None, 2])
+def test_object_document_isnt_split(tmpdir, indent):
+    document = {'meta': {'n': 1}, 'results': [{'id': 1}]}
+    path = tmpdir.join('doc.json')
+    path.write(json.dumps(document, indent=indent))
+    assert split_chunks(str(path), jobs=2) is None
+    result = CliRunner().invoke(cli.main, ['-j', '2', '-n', '-g', 'meta',
+                                           str(path)])
+    assert result.exit_code == 0
+    assert json.loads(result.output) == {'meta': {'n': 1}}
+
+
+def test_whole_document_options_arent_chunked(tmpdir, monkeypatch):
+    monkeypatch.setattr(parallel, 'MIN_CHUNK', 1)
+    path = tmpdir.join('records.json')
+    path.write(json.dumps([{'id': i, 'x': i % 3} for i in range(100)]))
+    for options in (['-i', '--stats'], ['-c'], ['-g', 'id', '--partial',
+                                                '--max-records', '5']):
+        serial, chunked = (CliRunner().invoke(
+            cli.main, ['-n', '-j', jobs] + options + [str(path)])
+            for jobs in ('1', '2'))
+        assert chunked.output == serial.output
+        assert chunked.exit_code == serial.exit_code
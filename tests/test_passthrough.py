@@ -0,0 +1,48 @@
+"""Test copying the selected values from the raw input bytes."""
+import json
+
+import pytest
+
+from jsoncut import core
+from jsoncut import exceptions as exc
+from jsoncut.passthrough import raw_get, root_skeleton
+
+RECORDS = [{'id': i, 'name': 'né "{}"'.format(i),
+            'links': [{'href': '/a/{}'.format(i)}, {'href': '/b'}]}
+           for i in range(5)]
+
+
+def decode(record):
+    record = json.loads(record.decode())
+    result = core.cut(record, getkeys='id,links.1.href', fullpath=True)
+    return json.dumps(result).encode()
+
+
+def test_raw_get_matches_cut():
+    records = RECORDS + [{'id': 5, 'links': []}]
+    buf = json.dumps(records, indent=2, ensure_ascii=False).encode()
+    keylists = [('id',), ('links', '1', 'href')]
+    results = raw_get(buf, keylists, True, 1, 10, decode)
+    expected = [core.cut(i, getkeys='id,links.1.href', fullpath=True)
+                for i in records[1:5]]
+    assert [json.loads(next(results)) for _ in expected] == expected
+    with pytest.raises(exc.IndexOutOfRange):
+        next(results)  # decoded by the fallback
+
+
+def test_raw_get_json_lines():
+    buf = b'\n'.join(json.dumps(i).encode() for i in RECORDS)
+    results = list(raw_get(buf, [('links',)], head=2))
+    assert results[1] == b'{"links":[{"href": "/a/1"}, {"href": "/b"}]}'
+
+
+def test_root_skeleton():
+    doc = {'meta': RECORDS, 'results': [{}, {'rows': RECORDS}], 'tail': 1}
+    buf = json.dumps(doc, indent=2, ensure_ascii=False).encode()
+    skeleton = root_skeleton(buf, ('results', '1', 'rows', '-1'))
+    assert skeleton == {'results': [None, {'rows': RECORDS}]}
+    assert core.get_rootkey(skeleton, 'results', '1', 'rows', '-1') == \
+        RECORDS[-1]
+    assert root_skeleton(buf, ('results', '2')) is None
+    records = raw_get(buf, [('id',)], root=('results', '1', 'rows'))
+    assert list(records) == [b'{"id":%d}' % i for i in range(5)]
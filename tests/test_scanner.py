@@ -0,0 +1,39 @@
+"""Test scanning the raw JSON bytes."""
+import json
+
+import pytest
+
+from jsoncut import exceptions as exc
+from jsoncut.inspector import array_counts
+from jsoncut.scanner import Scanner, array_counts as scan_array_counts
+
+TEST_DATA = {
+    'info': 'brackets [{ & escapes \\" in "strings"',
+    'results': [
+        {'id': 1, 'tags': ['a]', 'b'], 'via': {'path': ['x', '\\']}},
+        {'id': 2, 'tags': [], 'via': {'path': []}},
+        {'id': 3, 'tags': ['{c'], 'via': {}},
+    ]
+}
+
+
+@pytest.mark.parametrize('depth', [0, 1, 2, 3, 4])
+@pytest.mark.parametrize('indent', [None, 2])
+def test_scan_array_counts_same_as_decoded(depth, indent):
+    buf = json.dumps(TEST_DATA, indent=indent).encode()
+    assert scan_array_counts(buf, depth) == array_counts(TEST_DATA, depth)
+
+
+@pytest.mark.parametrize('window', [1, 2, 3, 7, 64])
+def test_values_spanning_windows(window):
+    buf = json.dumps(TEST_DATA['results']).encode()
+    scanner = Scanner(buf, window=window)
+    assert scanner.value_end(0) == len(buf)
+    assert scanner.array_length(0) == (3, len(buf))
+    spans = list(scanner.iter_elements(0))
+    assert [json.loads(buf[i:j]) for i, j in spans] == TEST_DATA['results']
+
+
+def test_scan_malformed_json():
+    with pytest.raises(exc.ScanError):
+        scan_array_counts(b'{"results": [1, 2', 1)
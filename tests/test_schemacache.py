@@ -0,0 +1,60 @@
+"""Test the incrementally updated --list & --inspect summaries."""
+import json
+import os
+
+import pytest
+
+from jsoncut import inspector, schemacache, sketches, treecrawler
+
+RECORDS = [{'id': i, 'tags': ['t'] * (i % 3), 'extra' + str(i % 4): None}
+           for i in range(40)]
+
+
+def write(path, records, mode='w'):
+    with open(path, mode) as file_:
+        file_.write(''.join(json.dumps(i) + '\n' for i in records))
+
+
+def test_appended_records(tmpdir):
+    path = str(tmpdir.join('events.ndjson'))
+    write(path, RECORDS[:25])
+    schemacache.update(path, schemacache.KeySummary(fullscan=True))
+    write(path, RECORDS[25:], 'a')
+    keys = schemacache.update(path, schemacache.KeySummary(fullscan=True))
+    assert keys.records == len(RECORDS)
+    assert keys.result() == treecrawler.find_keys(RECORDS, fullscan=True)
+
+    def new_types():
+        return schemacache.TypeSummary(sketches.PathSketch())
+
+    write(path, RECORDS[:25])
+    schemacache.update(path, new_types())
+    write(path, RECORDS[25:], 'a')
+    types = schemacache.update(path, new_types())
+    assert inspector.stats_report(types.root) == \
+        inspector.inspect_stats(RECORDS)
+
+
+def test_rewritten_file(tmpdir):
+    path = str(tmpdir.join('events.ndjson'))
+    write(path, RECORDS)
+    schemacache.update(path, schemacache.KeySummary(fullscan=True))
+    write(path, [{'other': 1}] * 50)
+    keys = schemacache.update(path, schemacache.KeySummary(fullscan=True))
+    assert keys.result() == ['other'] and keys.records == 50
+
+
+@pytest.mark.parametrize('cache', [
+    b'\x80\x04K\x01.',  # a pickle
+    b'[1, 2]',
+    b'{"version": 3}',
+    b'{"version": 3, "options": ["list", true], "inode": 0, "offset": -1}',
+])
+def test_malformed_cache_is_rebuilt(cache, tmpdir):
+    path = str(tmpdir.join('events.ndjson'))
+    write(path, RECORDS)
+    tmpdir.join('events.ndjson.jcs').write_binary(cache)
+    keys = schemacache.update(path, schemacache.KeySummary(fullscan=True))
+    assert keys.records == len(RECORDS)
+    assert schemacache.load(schemacache.cache_path(path))['offset'] == \
+        os.path.getsize(path)
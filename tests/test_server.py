@@ -0,0 +1,61 @@
+"""Test serving requests from a warm process."""
+import io
+import json
+import os
+import socket
+import threading
+import time
+
+import pytest
+
+from jsoncut import cli, client, server
+
+
+def connect(path):
+    for _ in range(100):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(path)
+            return sock
+        except OSError:
+            sock.close()
+            time.sleep(0.02)
+    raise TimeoutError(path)
+
+
+@pytest.fixture
+def reset_catalogs():
+    yield
+    cli.key_catalogs = None
+
+
+def test_client_request(tmpdir, reset_catalogs):
+    path = str(tmpdir.join('jsoncut.sock'))
+    tmpdir.join('doc.json').write(json.dumps({'a': {'b': [1, 2]}, 'c': 3}))
+    threading.Thread(target=server.serve, args=(path,), daemon=True).start()
+
+    def request(*argv, stdin=b''):
+        stdout, stderr = io.BytesIO(), io.BytesIO()
+        with connect(path) as sock:
+            status = client.request(
+                sock, ['-n', '--lines'] + list(argv), io.BytesIO(stdin),
+                stdout, stderr)
+        return status, stdout.getvalue(), stderr.getvalue()
+
+    doc = str(tmpdir.join('doc.json'))
+    assert request('-g', 'a.b', doc) == (0, b'{"b":[1,2]}\n', b'')
+    assert request('-g', '3', doc) == (0, b'{"c":3}\n', b'')
+    assert len(cli.key_catalogs.catalogs) == 1
+    assert request('-g', 'c', stdin=b'{"c": 4}') == (0, b'{"c":4}\n', b'')
+    status, _, stderr = request('-g', 'x', doc)
+    assert status == 1 and b'KeyNotFound' in stderr
+
+
+def test_run_restores_the_working_directory(tmpdir):
+    tmpdir.join('doc.json').write(json.dumps({'c': 3}))
+    cwd = os.getcwd()
+    stdout = io.StringIO()
+    status = server.run(['-n', '--lines', '-g', 'c', 'doc.json'],
+                        str(tmpdir), io.StringIO(), stdout, io.StringIO())
+    assert (status, stdout.getvalue()) == (0, '{"c":3}\n')
+    assert os.getcwd() == cwd
@@ -0,0 +1,36 @@
+"""Test bounded-memory sketches."""
+from jsoncut.sketches import MAX_EXPONENT, Histogram, HyperLogLog, TopK
+
+
+def test_hyperloglog_estimate_within_error_bounds():
+    hll = HyperLogLog(precision=12)
+    for i in range(100000):
+        hll.add('user-%d' % (i % 50000))
+    assert abs(hll.estimate() - 50000) < 50000 * 0.05
+    assert len(hll.registers) == 4096
+
+
+def test_topk_memory_is_bounded():
+    top = TopK(capacity=8)
+    for i in range(10000):
+        top.add('frequent' if i % 2 else i)
+    assert len(top.counters) == 8
+    assert top.top(1)[0][0] == 'frequent'
+
+
+def test_values_of_different_json_types_are_distinct():
+    hll, top = HyperLogLog(), TopK()
+    for value in ('1', 1, 1.0, True):
+        hll.add(value)
+        top.add(value)
+    assert hll.estimate() == 4
+    assert sorted(top.top(), key=repr) == \
+        [('1', 1), (1, 1), (1.0, 1), (True, 1)]
+
+
+def test_histogram_of_huge_integers():
+    hist = Histogram()
+    for number in (10 ** 400, -10 ** 400, 2 ** 10):
+        hist.add(number)
+    assert hist.counts == {(1, MAX_EXPONENT): 1, (-1, MAX_EXPONENT): 1,
+                           (1, 11): 1}
@@ -0,0 +1,45 @@
+"""Test sorting records with spilled runs."""
+import json
+import random
+
+import pytest
+from click.testing import CliRunner
+
+from jsoncut import cli, sorter
+
+RECORDS = [{'id': 1, 'x': {'y': 2}}, {'id': 2, 'x': {'y': 5}},
+           {'id': 3, 'x': {'y': 1}}]
+
+
+def test_external_sort_same_as_in_memory(tmpdir, monkeypatch):
+    monkeypatch.setattr(sorter, 'MERGE_WIDTH', 3)
+    rand = random.Random(7)
+    values = [None, False, 1, 2.5, 'a', 'b', [1], {'k': 1}]
+    records = [{'v': rand.choice(values), 'n': rand.randint(0, 9), 'i': i}
+               for i in range(600)]
+    records.append({'i': 'missing keys'})
+    keylists = [('v',), ('n',)]
+    for reverse in (False, True):
+        expected = sorted(records, reverse=reverse,
+                          key=lambda r: sorter.sort_key(r, keylists))
+        sorted_ = sorter.ExternalSorter(keylists, reverse, memory=2000,
+                                        tempdir=str(tmpdir))
+        for record in records:
+            sorted_.add(record)
+        assert len(sorted_.runs) > sorter.MERGE_WIDTH
+        assert list(sorted_) == expected
+
+
+@pytest.mark.parametrize('files, ids', [(1, [2, 1, 3]),
+                                        (2, [2, 2, 1, 1, 3, 3])])
+def test_sort_by_keys_not_selected(tmpdir, files, ids):
+    filenames = []
+    for i in range(files):
+        path = tmpdir.join('records-{}.json'.format(i))
+        path.write(json.dumps({'results': RECORDS}))
+        filenames.append(str(path))
+    result = CliRunner().invoke(cli.main, [
+        '-n', '--lines', '-j', '1', '-r', 'results', '-g', 'id',
+        '--sort-by', 'x.y', '--reverse'] + filenames)
+    assert result.exit_code == 0, result.output
+    assert result.output == ''.join('{{"id":{}}}\n'.format(i) for i in ids)
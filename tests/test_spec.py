@@ -0,0 +1,93 @@
+"""Test running the queries of a --spec over one parse of the input."""
+import gzip
+import io
+import json
+
+import pytest
+
+from jsoncut import core, exceptions as exc, spec
+
+DOCUMENT = {
+    'meta': {'count': 3},
+    'items': [{'id': i, 'x': {'y': i * 2, 'z': 'z'}} for i in range(3)],
+}
+
+
+def read_json(path):
+    with open(path) as file_:
+        return json.load(file_)
+
+
+def test_queries_share_a_root(tmpdir):
+    ids, nested = tmpdir.join('ids.json'), tmpdir.join('x.json.gz')
+    queries = spec.parse_spec({
+        'ids': {'root': 'items', 'get': 'id', 'output': str(ids)},
+        'x': {'root': 'items', 'get': ['id', 'x.y'], 'output': str(nested),
+              'lines': True},
+        'meta': {'root': 'meta', 'output': str(tmpdir.join('meta.json'))},
+    })
+    spec.run(queries, data=DOCUMENT)
+    assert read_json(str(ids)) == core.cut(DOCUMENT, 'items', getkeys='id')
+    lines = gzip.decompress(nested.read_binary()).decode().splitlines()
+    assert [json.loads(i) for i in lines] == \
+        [{'id': i, 'y': i * 2} for i in range(3)]
+    assert read_json(str(tmpdir.join('meta.json'))) == {'count': 3}
+
+
+def test_streamed_records(tmpdir):
+    text = '\n'.join(json.dumps(i) for i in DOCUMENT['items'])
+    queries = spec.parse_spec({
+        'ids': {'get': 'id', 'output': str(tmpdir.join('ids.json'))},
+        'x': {'del': 'id', 'output': str(tmpdir.join('x.json'))},
+    })
+    assert spec.is_streamed(queries)
+    spec.run(queries, file_=io.StringIO(text))
+    assert read_json(str(tmpdir.join('ids.json'))) == \
+        [{'id': i} for i in range(3)]
+    assert read_json(str(tmpdir.join('x.json'))) == \
+        [{'x': {'y': i * 2, 'z': 'z'}} for i in range(3)]
+
+
+@pytest.mark.parametrize('queries', [
+    [],
+    {'a': {'get': 'id'}},
+    {'a': {'get': 'id', 'output': 'a.json', 'root_key': 'items'}},
+    {'a': {'getdefault': ['id', 0], 'output': 'a.json'}},
+    {'a': {'output': 'a.json'}, 'b': {'output': 'a.json'}},
+])
+def test_invalid_spec(queries):
+    with pytest.raises(exc.InvalidSpec):
+        spec.parse_spec(queries)
+
+
+def test_object_document_isnt_streamed(tmpdir):
+    queries = spec.parse_spec({
+        'meta': {'get': 'meta.count', 'output': str(tmpdir.join('a.json'))},
+    })
+    spec.run(queries, file_=io.StringIO(json.dumps(DOCUMENT, indent=2)))
+    assert read_json(str(tmpdir.join('a.json'))) == {'count': 3}
+
+
+def test_defaults_keep_their_json_type(tmpdir):
+    queries = spec.parse_spec({
+        'a': {'getdefault': [['a', '7'], ['b', 7], ['c', [1]], ['d', None]],
+              'output': str(tmpdir.join('a.json')), 'lines': True},
+    })
+    spec.run(queries, file_=io.StringIO('{"b": 1}\n{"d": 2}\n'))
+    assert [json.loads(i) for i in tmpdir.join('a.json').readlines()] == [
+        {'a': '7', 'b': 1, 'c': [1], 'd': None},
+        {'a': '7', 'b': 7, 'c': [1], 'd': 2},
+    ]
+
+
+def test_failed_run_leaves_outputs_untouched(tmpdir):
+    tmpdir.join('ids.json').write('old')
+    queries = spec.parse_spec({
+        'ids': {'get': 'id', 'output': str(tmpdir.join('ids.json'))},
+        'x': {'get': 'x', 'output': str(tmpdir.join('x.json'))},
+    })
+    text = '\n'.join(json.dumps(i) for i in [{'id': 1, 'x': 1}, {'id': 2}])
+    with pytest.raises(exc.KeyNotFound):
+        spec.run(queries, file_=io.StringIO(text))
+    assert tmpdir.listdir() == [tmpdir.join('ids.json')]
+    assert tmpdir.join('ids.json').read() == 'old'
@@ -0,0 +1,60 @@
+"""Test streaming records from JSON arrays & JSON lines."""
+import io
+import json
+
+import pytest
+from click.testing import CliRunner
+
+from jsoncut import cli, core
+from jsoncut.streamer import RecordReader, read_records
+
+
+class CountingReader(io.StringIO):
+    """StringIO that tracks how many characters have been read."""
+
+    chars_read = 0
+
+    def read(self, size=-1):
+        chunk = super(CountingReader, self).read(size)
+        self.chars_read += len(chunk)
+        return chunk
+
+
+def test_records_from_array_spanning_chunks():
+    text = '[{"k": 1}, {"k": 22}, 333, "a, string", [], null]'
+    records = list(RecordReader(io.StringIO(text), chunk_size=3))
+    assert records == [{'k': 1}, {'k': 22}, 333, 'a, string', [], None]
+
+
+def test_records_from_json_lines():
+    text = '{"k": 1}\n\n{"k": 2}\n12\n'
+    reader = RecordReader(io.StringIO(text), chunk_size=4)
+    assert list(reader) == [{'k': 1}, {'k': 2}, 12]
+    assert not reader.is_array
+
+
+def test_head_stops_reading_early():
+    text = '[' + ', '.join('{"n": %d}' % i for i in range(100000)) + ']'
+    file_ = CountingReader(text)
+    assert read_records(file_, skip=2, head=2) == [{'n': 2}, {'n': 3}]
+    assert file_.chars_read < len(text) // 10
+
+
+def test_cut_skip_and_head_after_root():
+    data = {'results': [{'id': i} for i in range(5)]}
+    result = core.cut(data, rootkey='results', getkeys='id', skip=1, head=2)
+    assert result == [{'id': 1}, {'id': 2}]
+
+
+@pytest.mark.parametrize('indent', [None, 2])
+def test_head_of_an_object_document(tmpdir, indent):
+    document = {'meta': {'n': 1}, 'results': [{'id': 1}, {'id': 2}]}
+    path = tmpdir.join('doc.json')
+    path.write(json.dumps(document, indent=indent))
+    result = CliRunner().invoke(cli.main, ['-n', '--head', '1', str(path)])
+    assert result.exit_code == 0
+    assert json.loads(result.output) == document
+    path.write('{"id": 1}\n{"id": 2}\n{"id": 3}\n')
+    result = CliRunner().invoke(cli.main, ['-n', '--skip', '1', '--head',
+                                           '1', str(path)])
+    assert json.loads(result.output) == [{'id': 2}]